@@ -0,0 +1,221 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Audit Log
+# Append-only assessment trail, batched into SQLite by a writer thread
+# ============================================================
+"""Record every assessment without ever blocking the script thread.
+
+    python audit.py query --since 2026-10-01 --until 2026-10-02 > day.csv
+    python audit.py stats
+
+``AuditLog.record`` only builds a tuple and puts it on an in-memory queue.
+One background thread takes whatever is queued (up to ``BATCH_SIZE`` rows,
+or what arrived within ``FLUSH_SECONDS``) and inserts it in a single
+transaction into ``$HRIP_AUDIT_DB`` (default ``audit.db``), a SQLite file in
+WAL mode so readers never block the writer.  Each row holds the timestamp,
+session, source, model hash, verdict, probability and one column per input
+feature; ``ts`` is indexed, so ``query`` by time range is a B-tree range
+scan, never a full table scan.
+
+``close`` (registered with ``atexit``) drains the queue before the process
+exits.  If the queue ever fills up (``QUEUE_MAX`` pending rows, i.e. the
+disk has stalled for a long time) records are counted in ``dropped`` and
+logged rather than blocking a user's rerun.
+"""
+
+import argparse
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import schema
+
+log = logging.getLogger(__name__)
+
+AUDIT_DB      = os.environ.get("HRIP_AUDIT_DB", "audit.db")
+BATCH_SIZE    = 512
+FLUSH_SECONDS = 1.0
+QUEUE_MAX     = 100_000
+
+COLUMNS = ["ts", "session", "source", "model", "prediction", "probability"] + schema.FEATURE_NAMES
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS audit (
+    id          INTEGER PRIMARY KEY,
+    ts          REAL NOT NULL,
+    session     TEXT,
+    source      TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    prediction  INTEGER,
+    probability REAL NOT NULL,
+    {", ".join(f"{name} REAL" for name in schema.FEATURE_NAMES)}
+);
+CREATE INDEX IF NOT EXISTS audit_ts ON audit (ts);
+"""
+_INSERT = f"INSERT INTO audit ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def connect(path=AUDIT_DB):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class AuditLog:
+    """Queue in front of a single SQLite writer thread."""
+
+    def __init__(self, path=AUDIT_DB, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS,
+                 queue_max=QUEUE_MAX):
+        self.path          = path
+        self.batch_size    = batch_size
+        self.flush_seconds = flush_seconds
+        self.dropped       = 0
+        self.written       = 0
+        self._queue        = queue.Queue(maxsize=queue_max)
+        self._stop         = threading.Event()
+        self._thread       = None
+
+    # ── Producer side (script threads) ──
+    def record(self, features, probability, prediction, model, session=None, source="ui", ts=None):
+        """Queue one assessment; never waits."""
+        row = (time.time() if ts is None else ts, session, source, model,
+               None if prediction is None else int(prediction), float(probability),
+               *(float(v) for v in features))
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                log.error("audit queue full, %d records dropped", self.dropped)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    # ── Lifecycle ──
+    def start(self):
+        if self._thread is None:
+            connect(self.path).close()          # fail fast on a bad path
+            self._thread = threading.Thread(target=self._run, name="hrip-audit", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is on disk (tests, CLI, shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout=10.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ── Writer thread ──
+    def _run(self):
+        conn = connect(self.path)
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._take()
+                if batch:
+                    self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _take(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(_INSERT, batch)
+            self.written += len(batch)
+        except sqlite3.Error:
+            log.exception("audit write of %d records failed", len(batch))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+# ============================================================
+# READING
+# ============================================================
+def query(start=None, end=None, path=AUDIT_DB, limit=None):
+    """Rows with ``start <= ts < end`` (epoch seconds) as a DataFrame, via the ts index."""
+    import pandas as pd
+
+    sql = f"SELECT {', '.join(COLUMNS)} FROM audit WHERE ts >= ? AND ts < ? ORDER BY ts"
+    params = [float("-inf") if start is None else start, float("inf") if end is None else end]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def query_plan(path=AUDIT_DB):
+    """SQLite's plan for the time-range query; should read ``USING INDEX audit_ts``."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM audit WHERE ts >= ? AND ts < ? ORDER BY ts",
+                            (0, 1)).fetchall()
+        return "; ".join(r[-1] for r in rows)
+    finally:
+        conn.close()
+
+
+def _timestamp(text):
+    return datetime.fromisoformat(text).timestamp() if text else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read the HRIP audit log.")
+    parser.add_argument("--db", default=AUDIT_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    q = sub.add_parser("query", help="rows in a time range as CSV")
+    q.add_argument("--since", help="ISO date/time, inclusive")
+    q.add_argument("--until", help="ISO date/time, exclusive")
+    q.add_argument("--limit", type=int)
+    sub.add_parser("stats", help="row count, time span and query plan")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "query":
+        df = query(_timestamp(args.since), _timestamp(args.until), path=args.db, limit=args.limit)
+        df.to_csv(sys.stdout, index=False)
+    else:
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        n, lo, hi = conn.execute("SELECT COUNT(*), MIN(ts), MAX(ts) FROM audit").fetchone()
+        conn.close()
+        span = f"{datetime.fromtimestamp(lo)} .. {datetime.fromtimestamp(hi)}" if n else "-"
+        print(f"{n:,} records, {span}")
+        print(query_plan(args.db))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Background Jobs
+# Bounded, deduplicated worker pool with progressive rendering
+# ============================================================
+"""Run heavy sections off the script thread and fill them in when ready.
+
+``JobPool`` is created once per server (``st.cache_resource``).  Jobs are
+identified by a caller-chosen key, so every session asking for the same key
+shares one future.  Each session "holds" the keys it asked for during its
+latest completed run; when a session reruns without asking for a key again,
+or disconnects, its hold is dropped.  A job nobody holds is cancelled if it
+has not started yet and signalled through its ``cancel`` event if it has.
+Finished results stay in a small LRU so reruns and other sessions reuse them.
+A failed job is kept for ``FAIL_SECONDS`` so its error is shown instead of
+being resubmitted by the rerun that reports it; ``retry()`` (the section's
+Retry button) drops it early.
+
+``progressive()`` is the Streamlit side: it renders the result right away
+when the job is done, otherwise draws a placeholder inside a polling
+fragment that triggers a full rerun once the result lands.
+"""
+
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+MAX_WORKERS  = int(os.environ.get("HRIP_JOB_WORKERS", min(4, os.cpu_count() or 1)))
+KEEP_RESULTS = 64
+REAP_SECONDS = 15.0
+FAIL_SECONDS = 60.0
+
+
+def _session_alive(session_id):
+    from streamlit.runtime import Runtime
+
+    # Outside a real server (AppTest, scripts) there is nobody to disconnect
+    if not Runtime.exists():
+        return True
+    return Runtime.instance().is_active_session(session_id)
+
+
+class _Job:
+    __slots__ = ("key", "future", "cancel", "holders")
+
+    def __init__(self, key, future, cancel):
+        self.key     = key
+        self.future  = future
+        self.cancel  = cancel
+        self.holders = set()
+
+
+class JobPool:
+    """Keyed, deduplicating ``ThreadPoolExecutor`` with per-session holds."""
+
+    def __init__(self, max_workers=MAX_WORKERS, keep_results=KEEP_RESULTS,
+                 reap_seconds=REAP_SECONDS, is_alive=_session_alive, fail_seconds=FAIL_SECONDS):
+        self._executor     = ThreadPoolExecutor(max_workers, thread_name_prefix="hrip-job")
+        self._keep_results = keep_results
+        self._fail_seconds = fail_seconds
+        self._is_alive     = is_alive
+        self._jobs         = {}             # key -> _Job still held or running
+        self._results      = OrderedDict()  # key -> finished future (LRU)
+        self._failures     = {}             # key -> (failed future, monotonic expiry)
+        self._sessions     = {}             # session_id -> [generation, {key: generation}]
+        self._lock         = threading.RLock()
+        if reap_seconds:
+            threading.Thread(target=self._reaper, args=(reap_seconds,),
+                             name="hrip-job-reaper", daemon=True).start()
+
+    # ── Session lifecycle ──
+    def begin_run(self, session_id):
+        with self._lock:
+            self._sessions.setdefault(session_id, [0, {}])[0] += 1
+
+    def end_run(self, session_id):
+        """Drop holds on keys the session did not ask for in this run."""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return
+            gen, held = state
+            for key in [k for k, g in held.items() if g < gen]:
+                del held[key]
+                self._release(session_id, key)
+
+    def forget(self, session_id):
+        with self._lock:
+            state = self._sessions.pop(session_id, None)
+            for key in (state[1] if state else ()):
+                self._release(session_id, key)
+
+    # ── Jobs ──
+    def submit(self, key, fn, *args, session_id=None, **kwargs):
+        """Return the future for ``key``, starting ``fn(*args, **kwargs)`` if needed.
+
+        ``fn`` may accept a ``cancel`` keyword: a ``threading.Event`` set once no
+        session holds the job any more.
+        """
+        with self._lock:
+            if session_id is not None:
+                state = self._sessions.setdefault(session_id, [0, {}])
+                state[1][key] = state[0]
+
+            done = self._results.get(key)
+            if done is not None:
+                self._results.move_to_end(key)
+                return done
+            failed = self._failed(key)
+            if failed is not None:
+                return failed
+
+            job = self._jobs.get(key)
+            if job is None or job.cancel.is_set():
+                cancel = threading.Event()
+                if "cancel" in inspect.signature(fn).parameters:
+                    kwargs["cancel"] = cancel
+                future = self._executor.submit(fn, *args, **kwargs)
+                job = self._jobs[key] = _Job(key, future, cancel)
+                future.add_done_callback(lambda f, k=key: self._finished(k, f))
+            if session_id is not None:
+                job.holders.add(session_id)
+            return job.future
+
+    def peek(self, key):
+        with self._lock:
+            done = self._results.get(key) or self._failed(key)
+            if done is not None:
+                return done
+            job = self._jobs.get(key)
+            return job.future if job else None
+
+    def retry(self, key):
+        """Forget a failure of ``key`` so the next ``submit`` runs it again."""
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ── Internals ──
+    def _finished(self, key, future):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.future is not future:
+                return
+            del self._jobs[key]
+            if future.cancelled() or job.cancel.is_set():
+                return
+            if future.exception() is not None:
+                now = time.monotonic()
+                for k in [k for k, (_, until) in self._failures.items() if until <= now]:
+                    del self._failures[k]
+                self._failures[key] = (future, now + self._fail_seconds)
+                return
+            self._results[key] = future
+            self._results.move_to_end(key)
+            while len(self._results) > self._keep_results:
+                self._results.popitem(last=False)
+
+    def _failed(self, key):
+        entry = self._failures.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[1]:
+            del self._failures[key]
+            return None
+        return entry[0]
+
+    def _release(self, session_id, key):
+        job = self._jobs.get(key)
+        if job is None:
+            return
+        job.holders.discard(session_id)
+        if not job.holders and not job.future.done():
+            job.cancel.set()
+            if job.future.cancel():
+                self._jobs.pop(key, None)
+            log.debug("job %r cancelled", key)
+
+    def _reaper(self, interval):
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                gone = [sid for sid in self._sessions if not self._is_alive(sid)]
+            for sid in gone:
+                self.forget(sid)
+
+
+# ============================================================
+# STREAMLIT HELPERS
+# ============================================================
+def current_session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def progressive(pool, key, fn, *args, render, placeholder, poll_seconds=0.5, **kwargs):
+    """Render ``render(result)`` now if ``key`` is ready, else a placeholder that fills in."""
+    import streamlit as st
+
+    future = pool.submit(key, fn, *args, session_id=current_session_id(), **kwargs)
+    if future.done():
+        _render_result(pool, key, future, render)
+        return
+
+    @st.fragment(run_every=poll_seconds)
+    def _poll():
+        if future.done():
+            st.rerun()   # full rerun renders the cached result in place
+        st.markdown(placeholder, unsafe_allow_html=True)
+
+    _poll()
+
+
+def _render_result(pool, key, future, render):
+    import streamlit as st
+
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        st.error(f"Computation failed: {exc}")
+        if st.button("Retry", key=f"retry_{key!r}"):
+            pool.retry(key)
+            st.rerun()
+        return
+    render(future.result())
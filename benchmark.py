@@ -0,0 +1,277 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Benchmark Suite
+# Scoring, analytics, payload sizes and full-script reruns
+# ============================================================
+"""Repeatable performance benchmarks with a stored baseline.
+
+    python benchmark.py                      # run, compare with benchmark_baseline.json
+    python benchmark.py --save-baseline      # run and store as the new baseline
+    python benchmark.py --tolerance 0.10 --out results.json
+
+Each metric is the median of several repeats and declares whether lower or
+higher is better.  A metric regresses when it is worse than the baseline by
+more than ``--tolerance`` (relative); any regression makes the exit code 1.
+Reruns are driven headlessly through ``streamlit.testing.v1.AppTest``
+against a scratch audit log, profile store and drift inbox (``scratch_state``)
+so synthetic clicks never reach the real ones.  Baselines are
+machine-specific: regenerate one on the machine that runs CI.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+import schema
+import charts
+from insights import render_tree_png, tree_layout, tree_path
+from model_registry import ModelRegistry
+from scoring import partial_dependence, score_batch
+
+APP_PATH      = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+BATCH_ROWS    = 100_000
+
+# Plotly charts in page order once a prediction exists
+FIGURES = ["gauge", "probability_bar", "radar", "pdp", "tree", "importance", "history_trend"]
+
+
+def _median_time(fn, repeats, number=1):
+    """Median seconds per call of ``fn`` over ``repeats`` timed loops of ``number`` calls."""
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return statistics.median(times)
+
+
+def _metric(value, unit, better):
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+# ============================================================
+# COMPONENT BENCHMARKS
+# ============================================================
+def bench_scoring(mv, repeats):
+    row = schema.DEFAULTS.reshape(1, -1)
+    single = _median_time(lambda: mv.model.predict_proba(row), repeats, number=200)
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(schema.LOWER, schema.UPPER, size=(BATCH_ROWS, schema.N_FEATURES))
+    X[:, schema.INTEGRAL] = np.round(X[:, schema.INTEGRAL])
+    batch = _median_time(lambda: score_batch(mv.model, X, mv.pos_index), repeats)
+    return {
+        "score_single_us": _metric(single * 1e6, "us", "lower"),
+        "score_batch_rows_per_s": _metric(BATCH_ROWS / batch, "rows/s", "higher"),
+    }
+
+
+def bench_pdp(mv, repeats):
+    base = schema.DEFAULTS
+
+    def all_features():
+        for i, name in enumerate(schema.FEATURE_NAMES):
+            partial_dependence(mv.model, base, name, schema.pdp_grid(name, base[i]), mv.pos_index)
+
+    return {"pdp_all_features_ms": _metric(_median_time(all_features, repeats) * 1e3, "ms", "lower")}
+
+
+def bench_tree(mv, repeats):
+    seconds = _median_time(lambda: render_tree_png(mv.model, schema.FEATURE_NAMES), max(3, repeats // 3))
+    png = render_tree_png(mv.model, schema.FEATURE_NAMES)
+    def explorer():
+        layout = tree_layout(mv.model, schema.FEATURE_NAMES)
+        leaf = int(np.flatnonzero(layout["is_leaf"])[-1])
+        return charts.tree_explorer(layout, tree_path(layout, leaf))
+
+    explorer_seconds = _median_time(explorer, repeats)
+    return {
+        "tree_render_ms": _metric(seconds * 1e3, "ms", "lower"),
+        "tree_png_bytes": _metric(len(png), "bytes", "lower"),
+        "tree_explorer_build_ms": _metric(explorer_seconds * 1e3, "ms", "lower"),
+        "tree_explorer_json_bytes": _metric(len(explorer().to_json()), "bytes", "lower"),
+    }
+
+
+# ============================================================
+# FULL-SCRIPT RERUNS
+# ============================================================
+# Files the app writes, by the variable that points at them
+STATE_FILES = {
+    "HRIP_AUDIT_DB":        "audit.db",
+    "HRIP_PROFILES_DB":     "profiles.db",
+    "HRIP_DRIFT_INBOX":     "drift_inbox",
+    "HRIP_DRIFT_REFERENCE": "drift_reference.npz",
+}
+
+
+@contextlib.contextmanager
+def scratch_state():
+    """Point the app's audit log, profiles and drift files at a temporary directory.
+
+    The modules read these paths when first imported, so enter this before
+    any ``AppTest`` runs (child processes inherit it).  An existing drift
+    reference is copied in so the first run does not rebuild it.
+    """
+    if any(m in sys.modules for m in ("audit", "profiles", "drift")):
+        raise RuntimeError("scratch_state() must be entered before the app modules are imported")
+    tmp = tempfile.mkdtemp(prefix="hrip-bench-")
+    saved = {var: os.environ.get(var) for var in STATE_FILES}
+    reference = saved["HRIP_DRIFT_REFERENCE"] or STATE_FILES["HRIP_DRIFT_REFERENCE"]
+    if os.path.exists(reference):
+        shutil.copy(reference, os.path.join(tmp, STATE_FILES["HRIP_DRIFT_REFERENCE"]))
+    os.environ.update({var: os.path.join(tmp, name) for var, name in STATE_FILES.items()})
+    try:
+        yield tmp
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _chart_payloads(at):
+    """Bytes of every Plotly spec in the rendered page, by chart name."""
+    sizes = [len(node.proto.spec) for node in at.main.get("plotly_chart")]
+    names = FIGURES if len(sizes) == len(FIGURES) else [str(i) for i in range(len(sizes))]
+    return dict(zip(names, sizes))
+
+
+def bench_reruns(repeats):
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    def new_app():
+        return AppTest.from_file(APP_PATH, default_timeout=120)
+
+    # First run in this process also fills every st.cache_resource
+    t0 = time.perf_counter()
+    at = new_app().run()
+    cold_start = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    session_load, predict, pdp_change = [], [], []
+    payload = None
+    for _ in range(repeats):
+        at = new_app()
+        t0 = time.perf_counter()
+        at.run()
+        session_load.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        at.button(key="predict").click().run()
+        predict.append(time.perf_counter() - t0)
+        payload = _chart_payloads(at)
+
+        t0 = time.perf_counter()
+        at.selectbox(key="pdp_feature").select("bmi").run()
+        pdp_change.append(time.perf_counter() - t0)
+
+    metrics = {
+        "rerun_cold_start_ms": _metric(cold_start * 1e3, "ms", "lower"),
+        "rerun_session_load_ms": _metric(statistics.median(session_load) * 1e3, "ms", "lower"),
+        "rerun_predict_click_ms": _metric(statistics.median(predict) * 1e3, "ms", "lower"),
+        "rerun_pdp_change_ms": _metric(statistics.median(pdp_change) * 1e3, "ms", "lower"),
+        "figure_json_bytes_total": _metric(sum(payload.values()), "bytes", "lower"),
+    }
+    for name, size in payload.items():
+        metrics[f"figure_json_bytes_{name}"] = _metric(size, "bytes", "lower")
+    return metrics
+
+
+# ============================================================
+# BASELINE COMPARISON
+# ============================================================
+def compare(results, baseline, tolerance):
+    """Return ``[(name, current, base, change)]`` for metrics worse than tolerance allows."""
+    regressions = []
+    for name, cur in results["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if base is None or base["value"] == 0:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        worse = change > tolerance if cur["better"] == "lower" else change < -tolerance
+        if worse:
+            regressions.append((name, cur["value"], base["value"], change))
+    return regressions
+
+
+def run(repeats, skip_reruns=False):
+    warnings.filterwarnings("ignore")
+    mv = ModelRegistry(poll_seconds=0).start().active()
+    metrics = {}
+    metrics.update(bench_scoring(mv, repeats))
+    metrics.update(bench_pdp(mv, repeats))
+    metrics.update(bench_tree(mv, repeats))
+    if not skip_reruns:
+        metrics.update(bench_reruns(repeats))
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "model": mv.short,
+            "repeats": repeats,
+        },
+        "metrics": metrics,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the HRIP benchmark suite.")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="allowed relative regression before failing (default 0.20)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--skip-reruns", action="store_true", help="component benchmarks only")
+    args = parser.parse_args(argv)
+
+    with scratch_state():
+        results = run(args.repeats, args.skip_reruns)
+    for name, m in results["metrics"].items():
+        print(f"{name:<32} {m['value']:>14,.2f} {m['unit']}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against (run with --save-baseline)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for name, cur, base, change in regressions:
+        print(f"REGRESSION {name}: {cur:,.2f} vs baseline {base:,.2f} ({change:+.1%})")
+    if not regressions:
+        print(f"no regressions beyond {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Chart Layer
+# Precompiled layouts, typed-array data, compact theme template
+# ============================================================
+"""Plotly figures for the app, built from layouts compiled once at import.
+
+Three things keep the per-rerun payload small:
+
+* ``TEMPLATE`` is a compact cyberpunk template that replaces the default
+  ``streamlit`` template Plotly would otherwise inline into every figure
+  (about 3.6 kB of colour scales for trace types we never draw).
+* Layouts are ``go.Layout`` objects validated once here; a figure build only
+  validates its traces.
+* Numeric data goes in as ``float32`` numpy arrays, which Plotly serialises
+  as base64 typed arrays (``{"dtype": "f4", "bdata": ...}``) instead of
+  decimal JSON lists.  Hover templates format the values, so the reduced
+  precision never shows.
+
+``shared_figure`` caches the built figures per process, keyed by their
+inputs, so sessions showing the same thing share one figure.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+CYAN    = "#00d4ff"
+GREEN   = "#00ff9f"
+RED     = "#ff3864"
+PURPLE  = "#7b2ff7"
+GRID    = "rgba(0,212,255,0.08)"
+AXIS    = "rgba(0,212,255,0.7)"
+
+TEMPLATE = go.layout.Template(
+    layout=dict(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,212,255,0.03)",
+        font=dict(color=CYAN),
+        xaxis=dict(gridcolor=GRID, color=AXIS),
+        yaxis=dict(gridcolor=GRID, color=AXIS),
+        showlegend=False,
+    )
+)
+
+
+def _layout(**kwargs):
+    return go.Layout(template=TEMPLATE, **kwargs)
+
+
+def _f4(values):
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+
+# ============================================================
+# PRECOMPILED LAYOUTS
+# ============================================================
+GAUGE_LAYOUT = _layout(height=320, margin=dict(l=30, r=30, t=60, b=30))
+
+BAR_LAYOUT = _layout(
+    font=dict(family="Rajdhani"),
+    yaxis=dict(tickformat=".0%"),
+    height=340,
+    margin=dict(l=20, r=20, t=30, b=20),
+)
+
+RADAR_LAYOUT = _layout(
+    polar=dict(
+        bgcolor="rgba(0,0,0,0)",
+        radialaxis=dict(gridcolor="rgba(0,212,255,0.1)", color="rgba(0,212,255,0.5)", range=[0, 100]),
+        angularaxis=dict(gridcolor="rgba(0,212,255,0.1)", color=AXIS),
+    ),
+    font=dict(family="Share Tech Mono", size=11),
+    height=400,
+    margin=dict(l=40, r=40, t=40, b=40),
+)
+
+THRESHOLD_LINE = dict(type="line", xref="paper", x0=0, x1=1, y0=50, y1=50,
+                      line=dict(color=RED, width=1.5, dash="dash"))
+
+PDP_LAYOUT = _layout(
+    font=dict(family="Rajdhani"),
+    yaxis=dict(title="Risk Probability (%)"),
+    height=380,
+    margin=dict(l=20, r=20, t=20, b=20),
+    shapes=[THRESHOLD_LINE],
+    annotations=[dict(text="50% Threshold", xref="paper", x=1, y=50, xanchor="right",
+                      yanchor="bottom", showarrow=False, font=dict(color=RED))],
+)
+
+HISTORY_LAYOUT = _layout(
+    font=dict(family="Rajdhani"),
+    xaxis=dict(type="date", title="Assessment Time"),
+    yaxis=dict(title="Risk Probability (%)", range=[0, 100]),
+    height=340,
+    margin=dict(l=20, r=20, t=20, b=20),
+    shapes=[THRESHOLD_LINE],
+)
+
+IMPORTANCE_LAYOUT = _layout(
+    font=dict(family="Rajdhani"),
+    xaxis=dict(title="Importance Score"),
+    yaxis=dict(color="rgba(0,212,255,0.9)"),
+    height=420,
+    margin=dict(l=20, r=80, t=20, b=40),
+)
+
+PERMUTATION_LAYOUT = _layout(
+    font=dict(family="Rajdhani"),
+    yaxis=dict(color="rgba(0,212,255,0.9)"),
+    height=420,
+    margin=dict(l=20, r=20, t=20, b=40),
+)
+
+_HIDDEN_AXIS = dict(visible=False, fixedrange=False)
+TREE_LAYOUT = _layout(
+    font=dict(family="Share Tech Mono", size=11),
+    xaxis=_HIDDEN_AXIS,
+    yaxis=_HIDDEN_AXIS,
+    plot_bgcolor="rgba(0,0,0,0)",
+    hovermode="closest",
+    dragmode="pan",
+    margin=dict(l=10, r=10, t=30, b=10),
+)
+TREE_LABEL_DEPTH = 4           # deeper nodes keep their hover text but drop the label
+TREE_COLORSCALE  = [[0, GREEN], [0.5, "#ffb000"], [1, RED]]
+
+FIGURE_CACHE_ENTRIES = 512     # process-wide; figures are keyed by their inputs
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def shared_figure(name, key, _build):
+    """Figure ``name`` for inputs ``key``, built once per process and shared by every session.
+
+    ``_build`` is not part of the key.  Nothing is kept in session state;
+    callers must not mutate the figure.
+    """
+    return _build()
+
+
+# ============================================================
+# FIGURES
+# ============================================================
+def gauge(risk_pct):
+    return go.Figure(
+        go.Indicator(
+            mode="gauge+number+delta",
+            value=risk_pct,
+            number={"suffix": "%", "font": {"family": "Orbitron", "size": 36, "color": CYAN}},
+            title={"text": "RISK PROBABILITY", "font": {"family": "Orbitron", "size": 13, "color": CYAN}},
+            delta={"reference": 50, "increasing": {"color": RED}, "decreasing": {"color": GREEN}},
+            gauge={
+                "axis": {"range": [0, 100], "tickcolor": CYAN, "tickfont": {"family": "Share Tech Mono"}},
+                "bar": {"color": CYAN, "thickness": 0.25},
+                "bgcolor": "rgba(0,0,0,0)",
+                "borderwidth": 0,
+                "steps": [
+                    {"range": [0, 40],   "color": "rgba(0,255,159,0.15)"},
+                    {"range": [40, 70],  "color": "rgba(255,159,0,0.15)"},
+                    {"range": [70, 100], "color": "rgba(255,56,100,0.20)"},
+                ],
+                "threshold": {"line": {"color": RED, "width": 3}, "thickness": 0.75, "value": 70},
+            },
+        ),
+        layout=GAUGE_LAYOUT,
+    )
+
+
+def probability_bar(probs):
+    """Bars for ``[P(no risk), P(risk)]``."""
+    return go.Figure(
+        go.Bar(
+            x=["No Risk", "Risk"],
+            y=_f4(probs),
+            marker=dict(
+                color=["rgba(0,255,159,0.7)", "rgba(255,56,100,0.7)"],
+                line=dict(color=[GREEN, RED], width=2),
+            ),
+            text=[f"{p * 100:.1f}%" for p in probs],
+            textposition="outside",
+            textfont=dict(family="Orbitron", size=14, color="white"),
+            hovertemplate="%{x}: %{y:.1%}<extra></extra>",
+        ),
+        layout=BAR_LAYOUT,
+    )
+
+
+def radar(values, names):
+    """Closed polygon of 0-100 ``values`` over the axes ``names``."""
+    values = _f4(values)
+    return go.Figure(
+        go.Scatterpolar(
+            r=np.append(values, values[:1]),
+            theta=list(names) + [names[0]],
+            fill="toself",
+            fillcolor="rgba(0,212,255,0.1)",
+            line=dict(color=CYAN, width=2),
+            name="Patient Profile",
+            hovertemplate="%{theta}: %{r:.1f}<extra></extra>",
+        ),
+        layout=RADAR_LAYOUT,
+    )
+
+
+def pdp(values, risk, feature):
+    """Risk (%) against the swept ``values`` of ``feature``."""
+    fig = go.Figure(
+        go.Scatter(
+            x=_f4(values),
+            y=_f4(risk),
+            mode="lines+markers",
+            line=dict(color=CYAN, width=3, shape="spline"),
+            marker=dict(color=PURPLE, size=7, line=dict(color=CYAN, width=2)),
+            fill="tozeroy",
+            fillcolor="rgba(0,212,255,0.06)",
+            name="Risk %",
+            hovertemplate=f"{feature} %{{x:.4g}}: %{{y:.1f}}%<extra></extra>",
+        ),
+        layout=PDP_LAYOUT,
+    )
+    fig.layout.xaxis.title = feature
+    return fig
+
+
+def history_trend(seq, ts, risk):
+    """Risk (%) of each stored assessment against its time; red at or above 50%."""
+    risk_pct = _f4(risk) * 100
+    return go.Figure(
+        go.Scatter(
+            x=np.asarray(ts, dtype=np.float64) * 1000,     # epoch ms on a date axis
+            y=risk_pct,
+            customdata=np.asarray(seq, dtype=np.uint32),
+            mode="lines+markers",
+            line=dict(color=CYAN, width=2),
+            marker=dict(color=np.where(risk_pct >= 50, RED, GREEN).tolist(), size=9,
+                        line=dict(color=CYAN, width=1)),
+            hovertemplate="#%{customdata} · %{x|%H:%M:%S}: %{y:.1f}%<extra></extra>",
+        ),
+        layout=HISTORY_LAYOUT,
+    )
+
+
+def importance(names, scores):
+    """Horizontal bars, coloured from orange (low) to cyan (high); ``scores`` ascending."""
+    scores = np.asarray(scores, dtype=np.float64)
+    top = float(scores.max()) if len(scores) else 0.0
+    norm = scores / top if top > 0 else np.zeros_like(scores)
+    colors = [f"rgba({int(255 * (1 - v))},{int(100 + 155 * v)},{int(255 * v)},0.85)" for v in norm]
+    return go.Figure(
+        go.Bar(
+            x=_f4(scores),
+            y=list(names),
+            orientation="h",
+            marker=dict(color=colors, line=dict(color="rgba(0,212,255,0.3)", width=1)),
+            text=[f"{v:.4f}" for v in scores],
+            textposition="outside",
+            textfont=dict(family="Share Tech Mono", size=11, color="rgba(0,212,255,0.8)"),
+            hovertemplate="%{y}: %{x:.4f}<extra></extra>",
+        ),
+        layout=IMPORTANCE_LAYOUT,
+    )
+
+
+def permutation_importance(names, mean, low, high, metric):
+    """Mean holdout ``metric`` drop per feature with its confidence interval; ``mean`` ascending."""
+    mean = np.asarray(mean, dtype=np.float64)
+    fig = go.Figure(
+        go.Bar(
+            x=_f4(mean),
+            y=list(names),
+            orientation="h",
+            marker=dict(color="rgba(123,47,247,0.7)", line=dict(color=PURPLE, width=1)),
+            error_x=dict(type="data", symmetric=False, array=_f4(np.asarray(high) - mean),
+                         arrayminus=_f4(mean - np.asarray(low)), color=CYAN, thickness=1.5, width=4),
+            hovertemplate="%{y}: %{x:.4f}<extra></extra>",
+        ),
+        layout=PERMUTATION_LAYOUT,
+    )
+    fig.layout.xaxis.title = f"Holdout {metric} drop (95% CI)"
+    return fig
+
+
+def tree_explorer(layout, path=None):
+    """Interactive decision tree from ``insights.tree_layout``; ``path`` (node ids) is highlighted.
+
+    Marker area is proportional to the node's share of training patients and
+    colour follows its risk.  The tree is two traces whatever its size (one
+    line trace for all edges, one marker trace for all nodes) plus a small
+    trace for the path.
+    """
+    x, y, parent = layout["x"], layout["y"], layout["parent"]
+    child = layout["edges"]
+    gap = np.full(len(child), np.nan)
+    edge_x = np.column_stack([x[parent[child]], x[child], gap]).ravel()
+    edge_y = np.column_stack([y[parent[child]], y[child], gap]).ravel()
+    shown = -y <= TREE_LABEL_DEPTH
+    labels = [label if show else "" for label, show in zip(layout["label"], shown)]
+
+    traces = [
+        go.Scatter(x=_f4(edge_x), y=_f4(edge_y), mode="lines", hoverinfo="skip",
+                   line=dict(color="rgba(0,212,255,0.25)", width=1.5)),
+        go.Scatter(
+            x=_f4(x), y=_f4(y),
+            mode="markers+text",
+            text=labels,
+            textposition=["bottom center" if leaf else "top center" for leaf in layout["is_leaf"]],
+            textfont=dict(color="rgba(0,212,255,0.85)"),
+            hovertext=layout["hover"],
+            hovertemplate="%{hovertext}<extra></extra>",
+            marker=dict(size=_f4(10 + 40 * np.sqrt(layout["share"])), color=_f4(layout["risk"]),
+                        colorscale=TREE_COLORSCALE, cmin=0, cmax=1, opacity=0.85,
+                        line=dict(color=CYAN, width=1)),
+        ),
+    ]
+    if path:
+        traces.append(go.Scatter(
+            x=_f4(x[path]), y=_f4(y[path]), mode="lines+markers", hoverinfo="skip",
+            line=dict(color=PURPLE, width=5),
+            marker=dict(size=10, color=PURPLE, line=dict(color="#ffffff", width=1.5)),
+        ))
+    fig = go.Figure(traces, layout=TREE_LAYOUT)
+    fig.layout.height = 140 + 110 * int(-y.min())
+    fig.layout.yaxis.range = [float(y.min()) - 0.5, 0.5]
+    return fig
@@ -0,0 +1,327 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Input Drift Monitor
+# Reference histograms vs. incrementally counted live traffic
+# ============================================================
+"""Watch whether the inputs the model sees still look like its training data.
+
+    python drift.py build --csv health_lifestyle_dataset.csv    # once per dataset
+
+``build`` bins every feature of the training CSV once (deciles for numeric
+features, one bin per code for categorical ones) and stores the bin edges
+and reference counts in ``$HRIP_DRIFT_REFERENCE`` (``drift_reference.npz``,
+a few kB).  The CSV is never read again.
+
+``DriftMonitor`` keeps live counts on exactly those bins: an assessment adds
+one to 14 counters, a scored batch adds one histogram.  No raw inputs are
+kept.  Counts sit in a ring of ``SLOTS`` time slots of ``SLOT_SECONDS``
+(an hour each, a week in total, about 200 kB), so a report can cover the
+last hour, day or week.  ``report`` compares a window with the reference on
+demand and returns per-feature PSI and KS:
+
+* PSI (population stability index): < 0.10 stable, 0.10-0.25 moderate,
+  > 0.25 major shift.
+* KS is measured on the binned CDFs, so it is a lower bound of the exact
+  two-sample statistic; its p-value uses the asymptotic distribution.
+
+Batch jobs running in other processes (``scoring.py``) ``export`` their
+counts into ``$HRIP_DRIFT_INBOX``; the app ``absorb``\\ s and deletes those
+files before reporting.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+
+import schema
+
+log = logging.getLogger(__name__)
+
+REFERENCE_PATH = os.environ.get("HRIP_DRIFT_REFERENCE", "drift_reference.npz")
+INBOX_DIR      = os.environ.get("HRIP_DRIFT_INBOX", "drift_inbox")
+DATASET_CSV    = "health_lifestyle_dataset.csv"
+N_BINS         = 10
+SLOT_SECONDS   = 3600
+SLOTS          = 7 * 24
+ABSORB_SECONDS = 5.0
+MIN_LIVE       = 50          # fewer live inputs than this: no verdict
+PSI_MODERATE   = 0.10
+PSI_MAJOR      = 0.25
+EPS            = 1e-4        # floor for empty-bin proportions in PSI
+
+
+# ============================================================
+# REFERENCE
+# ============================================================
+class Reference:
+    """Per-feature bin edges and the training data's counts in those bins.
+
+    ``edges`` is ``(N_FEATURES, MAX_BINS - 1)``, padded with ``+inf``; a
+    value's bin is the number of edges at or below it.
+    """
+
+    def __init__(self, edges, counts):
+        self.edges   = np.asarray(edges, dtype=np.float64)
+        self.counts  = np.asarray(counts, dtype=np.int64)
+        self.n_bins  = np.isfinite(self.edges).sum(axis=1) + 1
+        self.n       = int(self.counts[0].sum())
+        self.digest  = hashlib.sha256(self.edges.tobytes()).hexdigest()[:12]
+        self._offset = np.arange(schema.N_FEATURES) * self.counts.shape[1]
+
+    @property
+    def max_bins(self):
+        return self.counts.shape[1]
+
+    @classmethod
+    def from_matrix(cls, X, n_bins=N_BINS):
+        X = np.asarray(X, dtype=np.float64)
+        X = X[schema.validate(X) == 0]
+        cuts = []
+        for j, feat in enumerate(schema.FEATURES):
+            col = X[:, j]
+            if feat.categorical:
+                e = np.array(sorted(code for _, code in feat.choices)[1:], dtype=np.float64)
+            else:
+                e = np.unique(np.quantile(col, np.linspace(0, 1, n_bins + 1)[1:-1]))
+                e = e[e > col.min()]          # no bin that can only hold values below the minimum
+            cuts.append(e)
+        width = max(len(e) for e in cuts)
+        edges = np.full((schema.N_FEATURES, width), np.inf)
+        for j, e in enumerate(cuts):
+            edges[j, :len(e)] = e
+        ref = cls(edges, np.zeros((schema.N_FEATURES, width + 1), dtype=np.int64))
+        ref.counts = ref.histogram(X)
+        ref.n = len(X)
+        return ref
+
+    @classmethod
+    def from_csv(cls, path, n_bins=N_BINS):
+        from shared_data import load_dataset
+
+        X, _ = load_dataset(path)
+        return cls.from_matrix(X, n_bins)
+
+    @classmethod
+    def load(cls, path=REFERENCE_PATH):
+        with np.load(path) as z:
+            return cls(z["edges"], z["counts"])
+
+    def save(self, path=REFERENCE_PATH):
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, edges=self.edges, counts=self.counts)
+        os.replace(tmp, path)
+
+    def bins(self, X):
+        """``(n, N_FEATURES)`` flat counter index of every value in ``X``."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, schema.N_FEATURES)
+        b = (X[:, :, None] >= self.edges[None]).sum(axis=2)
+        return b + self._offset
+
+    def histogram(self, X):
+        """``(N_FEATURES, max_bins)`` counts of the rows of ``X``."""
+        flat = self.bins(X).ravel()
+        size = schema.N_FEATURES * self.max_bins
+        return np.bincount(flat, minlength=size).reshape(schema.N_FEATURES, self.max_bins)
+
+
+# ============================================================
+# LIVE COUNTS
+# ============================================================
+class DriftMonitor:
+    """Thread-safe live histograms in a ring of time slots."""
+
+    def __init__(self, reference, slot_seconds=SLOT_SECONDS, slots=SLOTS, inbox=INBOX_DIR):
+        self.reference    = reference
+        self.slot_seconds = slot_seconds
+        self.inbox        = inbox
+        self.observed     = 0
+        self._ids         = np.full(slots, -1, dtype=np.int64)
+        self._counts      = np.zeros((slots, schema.N_FEATURES, reference.max_bins), dtype=np.int64)
+        self._lock        = threading.Lock()
+        self._absorbed_at = 0.0
+
+    @property
+    def nbytes(self):
+        return self._counts.nbytes + self._ids.nbytes
+
+    def _slot(self, ts):
+        """Ring position for time ``ts``, cleared if it held an older slot; ``None`` if too old."""
+        sid = int(ts // self.slot_seconds)
+        i = sid % len(self._ids)
+        if self._ids[i] != sid:
+            if self._ids[i] > sid:
+                return None
+            self._ids[i] = sid
+            self._counts[i] = 0
+        return i
+
+    # ── Updates ──
+    def observe(self, features, ts=None):
+        """Count one assessment: 14 counter increments."""
+        flat = self.reference.bins(features)[0]
+        with self._lock:
+            i = self._slot(time.time() if ts is None else ts)
+            if i is not None:
+                self._counts[i].ravel()[flat] += 1
+                self.observed += 1
+
+    def observe_batch(self, X, ts=None):
+        """Count a batch of valid rows with one histogram."""
+        if not len(X):
+            return
+        hist = self.reference.histogram(X)
+        self.merge([int((time.time() if ts is None else ts) // self.slot_seconds)], hist[None])
+
+    def merge(self, slot_ids, counts):
+        with self._lock:
+            for sid, c in zip(slot_ids, counts):
+                i = self._slot(sid * self.slot_seconds)
+                if i is not None:
+                    self._counts[i] += c
+                    self.observed += int(c[0].sum())
+
+    # ── Other processes ──
+    def export(self, inbox=None):
+        """Write this monitor's counts as a file for the app to absorb; return its path."""
+        inbox = inbox or self.inbox
+        os.makedirs(inbox, exist_ok=True)
+        with self._lock:
+            used = self._ids >= 0
+            ids, counts = self._ids[used].copy(), self._counts[used].copy()
+        name = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        tmp = os.path.join(inbox, f".{name}.tmp.npz")
+        np.savez(tmp, digest=np.array(self.reference.digest), ids=ids, counts=counts)
+        path = os.path.join(inbox, f"{name}.npz")
+        os.replace(tmp, path)
+        return path
+
+    def absorb(self, inbox=None, force=False):
+        """Merge and delete exported count files (at most every ``ABSORB_SECONDS``)."""
+        inbox = inbox or self.inbox
+        now = time.monotonic()
+        if not force and now - self._absorbed_at < ABSORB_SECONDS:
+            return 0
+        self._absorbed_at = now
+        if not os.path.isdir(inbox):
+            return 0
+        merged = 0
+        for name in sorted(os.listdir(inbox)):
+            if not name.endswith(".npz") or name.startswith("."):
+                continue
+            path = os.path.join(inbox, name)
+            try:
+                with np.load(path) as z:
+                    if str(z["digest"]) == self.reference.digest:
+                        self.merge(z["ids"].tolist(), z["counts"])
+                    else:
+                        log.warning("drift counts %s were binned on another reference; skipped", name)
+                os.remove(path)
+                merged += 1
+            except (OSError, ValueError, KeyError):
+                log.exception("could not absorb drift counts %s", name)
+        return merged
+
+    # ── Reading ──
+    def counts(self, window=None, now=None):
+        """Live ``(N_FEATURES, max_bins)`` counts of the last ``window`` seconds (``None``: all kept)."""
+        now = time.time() if now is None else now
+        current = int(now // self.slot_seconds)
+        oldest = current - len(self._ids) + 1
+        if window is not None:
+            oldest = max(oldest, current - int(np.ceil(window / self.slot_seconds)) + 1)
+        with self._lock:
+            keep = (self._ids >= oldest) & (self._ids <= current)
+            return self._counts[keep].sum(axis=0)
+
+    def report(self, window=None, now=None):
+        """Per-feature drift of a window against the reference, as a DataFrame."""
+        import pandas as pd
+
+        live = self.counts(window, now)
+        psi_v, ks_v, p_v = compare(self.reference.counts, live)
+        n = int(live[0].sum())
+        return pd.DataFrame({
+            "Feature": [f.label for f in schema.FEATURES],
+            "Live n":  n,
+            "PSI":     np.round(psi_v, 4),
+            "KS":      np.round(ks_v, 4),
+            "KS p":    np.round(p_v, 4),
+            "Status":  [status(v, n) for v in psi_v],
+        })
+
+
+# ============================================================
+# STATISTICS
+# ============================================================
+def compare(ref_counts, live_counts):
+    """``(psi, ks, p_value)`` per feature from two ``(features, bins)`` count arrays."""
+    from scipy.special import kolmogorov
+
+    ref  = np.asarray(ref_counts, dtype=np.float64)
+    live = np.asarray(live_counts, dtype=np.float64)
+    n_ref  = ref.sum(axis=1, keepdims=True)
+    n_live = live.sum(axis=1, keepdims=True)
+    p = ref / np.maximum(n_ref, 1)
+    q = live / np.maximum(n_live, 1)
+
+    pf, qf = np.maximum(p, EPS), np.maximum(q, EPS)
+    psi = ((qf - pf) * np.log(qf / pf)).sum(axis=1)
+
+    ks = np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)).max(axis=1)
+    en = (n_ref * n_live / np.maximum(n_ref + n_live, 1)).ravel()
+    p_value = kolmogorov(np.sqrt(en) * ks)
+
+    empty = n_live.ravel() == 0
+    psi[empty] = ks[empty] = np.nan
+    p_value[empty] = np.nan
+    return psi, ks, p_value
+
+
+def status(psi, n):
+    if n < MIN_LIVE or not np.isfinite(psi):
+        return "collecting"
+    if psi > PSI_MAJOR:
+        return "major shift"
+    if psi >= PSI_MODERATE:
+        return "moderate shift"
+    return "stable"
+
+
+def load_monitor(path=REFERENCE_PATH, csv_path=DATASET_CSV, build=True):
+    """A ``DriftMonitor`` on the saved reference, building it from ``csv_path`` if needed.
+
+    Returns ``None`` when there is neither a reference nor a dataset to build one.
+    """
+    if not os.path.exists(path):
+        if not (build and os.path.exists(csv_path)):
+            log.info("no drift reference at %s; drift monitoring is off", path)
+            return None
+        Reference.from_csv(csv_path).save(path)
+    return DriftMonitor(Reference.load(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the HRIP input-drift reference.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="bin the training CSV into reference histograms")
+    b.add_argument("--csv", default=DATASET_CSV)
+    b.add_argument("--out", default=REFERENCE_PATH)
+    b.add_argument("--bins", type=int, default=N_BINS)
+    args = parser.parse_args(argv)
+
+    ref = Reference.from_csv(args.csv, args.bins)
+    ref.save(args.out)
+    print(f"reference {ref.digest}: {ref.n:,} rows, {int(ref.n_bins.sum())} bins -> {args.out}")
+    for feat, k in zip(schema.FEATURES, ref.n_bins):
+        print(f"  {feat.name:<16} {k:>2} bins")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Assessment History
+# Fixed-capacity ring buffer of compact typed rows per session
+# ============================================================
+"""Per-session record of past assessments with bounded memory.
+
+Every prediction appends one row to a preallocated NumPy structured array:
+sequence number, timestamp, risk, verdict, short model hash and the 14
+inputs as ``float32``.  That is 85 bytes a row, so the default capacity of
+100 costs 8.5 kB per session however long it stays open.  When the
+buffer is full the oldest row is overwritten; nothing is ever reallocated.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import schema
+
+CAPACITY = int(os.environ.get("HRIP_HISTORY_SIZE", "100"))
+
+ROW_DTYPE = np.dtype([
+    ("seq",        "<u4"),
+    ("ts",         "<f8"),
+    ("risk",       "<f4"),               # positive-class probability, 0-1
+    ("prediction", "u1"),
+    ("model",      "S12"),               # ModelVersion.short
+    ("features",   "<f4", (schema.N_FEATURES,)),
+])
+
+
+class AssessmentHistory:
+    """Ring buffer of ``ROW_DTYPE`` rows, oldest first when read."""
+
+    def __init__(self, capacity=CAPACITY):
+        self._rows  = np.zeros(capacity, dtype=ROW_DTYPE)
+        self._next  = 0
+        self._count = 0
+        self.total  = 0          # assessments ever appended; also a change counter
+
+    @property
+    def capacity(self):
+        return len(self._rows)
+
+    @property
+    def nbytes(self):
+        return self._rows.nbytes
+
+    def __len__(self):
+        return self._count
+
+    def append(self, features, risk, prediction, model_short, ts=None):
+        row = self._rows[self._next]
+        self.total += 1
+        row["seq"]        = self.total
+        row["ts"]         = time.time() if ts is None else ts
+        row["risk"]       = risk
+        row["prediction"] = prediction
+        row["model"]      = model_short.encode()[:12]
+        row["features"]   = np.asarray(features, dtype=np.float32).ravel()
+        self._next  = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def rows(self):
+        """Stored rows in chronological order (a copy once the buffer has wrapped)."""
+        if self._count < self.capacity:
+            return self._rows[:self._count]
+        return np.concatenate((self._rows[self._next:], self._rows[:self._next]))
+
+    def get(self, seq):
+        """The row with sequence number ``seq``, or ``None`` if it was overwritten."""
+        rows = self.rows()
+        hit = np.flatnonzero(rows["seq"] == seq)
+        return rows[hit[0]] if len(hit) else None
+
+    def label(self, row):
+        stamp = time.strftime("%H:%M:%S", time.localtime(float(row["ts"])))
+        return f"#{int(row['seq'])} · {stamp} · {float(row['risk']) * 100:.1f}%"
+
+    def diff(self, before, after):
+        """Feature-by-feature comparison of two rows as a DataFrame."""
+        import pandas as pd
+
+        a = before["features"].astype(np.float64)
+        b = after["features"].astype(np.float64)
+        return pd.DataFrame({
+            "Feature": [f.label for f in schema.FEATURES],
+            "Before":  [_display(f, v) for f, v in zip(schema.FEATURES, a)],
+            "After":   [_display(f, v) for f, v in zip(schema.FEATURES, b)],
+            "Change":  [_delta(f, x, y) for f, x, y in zip(schema.FEATURES, a, b)],
+        })
+
+
+def _display(feat, value):
+    if feat.categorical:
+        return feat.decode(round(value))
+    return f"{value:.1f}" if feat.kind == "float" else f"{round(value):,}"
+
+
+def _delta(feat, before, after):
+    if feat.categorical:
+        return "" if round(before) == round(after) else "changed"
+    d = after - before
+    if abs(d) < 1e-4:
+        return ""
+    return f"{d:+.1f}" if feat.kind == "float" else f"{round(d):+,}"
@@ -0,0 +1,256 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Permutation Importance
+# Holdout score drop per feature, vectorised and cached
+# ============================================================
+"""How much holdout performance each feature is worth to the active model.
+
+    python importance.py                          # notebook's 33% holdout, 10 repeats
+    python importance.py --holdout holdout.csv --repeats 30 --workers 4
+
+Impurity importance (``feature_importances_``) is measured on the training
+data, is zero for every feature a shallow tree never splits on and favours
+high-cardinality inputs.  Permutation importance is the drop in a holdout
+score when one feature's column is shuffled, repeated ``N_REPEATS`` times;
+the spread of the repeats gives a t-based 95% confidence interval.  The
+default score is ROC AUC of the risk probability: the shipped tree never
+puts a leaf above 50% risk, so its accuracy, and every accuracy drop, is
+the same whatever is shuffled (``--metric accuracy`` is still available).
+
+The holdout is ``$HRIP_HOLDOUT_CSV`` if set, otherwise the notebook's test
+split of ``health_lifestyle_dataset.csv`` (33%, ``random_state=42``).
+
+All permuted copies of one feature are stacked into a single matrix and
+scored with one model call (split only above ``MAX_BATCH_ROWS``).
+Features go to a process pool whose workers receive the model and holdout
+once.  A feature a tree never splits on cannot change a prediction, so it is
+reported as exactly zero without scoring.  Permutations come from
+``SeedSequence(seed).spawn``, one stream per feature, so results do not
+depend on how features are spread over workers.
+
+Results are cached as JSON in ``$HRIP_IMPORTANCE_CACHE`` under the model
+hash, the holdout hash, the metric, the repeat count and the seed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+import schema
+
+HOLDOUT_CSV    = os.environ.get("HRIP_HOLDOUT_CSV")
+DATASET_CSV    = "health_lifestyle_dataset.csv"
+CACHE_DIR      = os.environ.get("HRIP_IMPORTANCE_CACHE", "importance_cache")
+N_REPEATS      = 10
+METRICS        = ("roc_auc", "accuracy")
+METRIC         = "roc_auc"
+SEED           = 42
+CONFIDENCE     = 0.95
+MAX_BATCH_ROWS = 1 << 20
+TEST_SIZE      = 0.33          # the notebook's train_test_split
+SPLIT_SEED     = 42
+POLL_SECONDS   = 0.2           # how often a parallel run checks for cancellation
+
+
+class Holdout:
+    """Validated holdout rows plus a content hash for cache keys."""
+
+    def __init__(self, X, y, source):
+        ok = (schema.validate(X) == 0) & (y >= 0)
+        self.X      = np.ascontiguousarray(X[ok], dtype=np.float64)
+        self.y      = np.ascontiguousarray(y[ok], dtype=np.int64)
+        self.source = source
+        h = hashlib.sha256(self.X.tobytes())
+        h.update(self.y.tobytes())
+        self.digest = h.hexdigest()[:12]
+
+    def __len__(self):
+        return len(self.y)
+
+
+def load_holdout(holdout_csv=HOLDOUT_CSV, dataset_csv=DATASET_CSV):
+    """The holdout set, or ``None`` when neither CSV is available."""
+    from shared_data import load_dataset
+
+    if holdout_csv and os.path.exists(holdout_csv):
+        X, y = load_dataset(holdout_csv)
+        return Holdout(X.astype(np.float64), y, os.path.basename(holdout_csv))
+    if os.path.exists(dataset_csv):
+        from sklearn.model_selection import train_test_split
+
+        X, y = load_dataset(dataset_csv)
+        _, X_test, _, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=SPLIT_SEED)
+        return Holdout(X_test.astype(np.float64), y_test, f"{os.path.basename(dataset_csv)} (test split)")
+    return None
+
+
+# ============================================================
+# COMPUTATION
+# ============================================================
+def used_features(model):
+    """Indices of features the model can react to (tree splits; all for other models)."""
+    tree = getattr(model, "tree_", None)
+    if tree is None:
+        return np.arange(schema.N_FEATURES)
+    return np.unique(tree.feature[tree.feature >= 0])
+
+
+def score(model, X, y, metric=METRIC, repeats=1):
+    """``metric`` of each of ``repeats`` stacked copies of the holdout in ``X``."""
+    n = len(y)
+    if metric == "accuracy":
+        pred = np.asarray(model.predict(X)).reshape(repeats, n)
+        return (pred == y).mean(axis=1)
+    from scipy.stats import rankdata
+
+    pos_index = list(model.classes_).index(1)
+    proba = model.predict_proba(X)[:, pos_index].reshape(repeats, n)
+    # ROC AUC per row via the Mann-Whitney rank sum (ties get average ranks)
+    ranks = rankdata(proba, axis=1)
+    pos = y == 1
+    n_pos, n_neg = int(pos.sum()), int((~pos).sum())
+    return (ranks[:, pos].sum(axis=1) - n_pos * (n_pos + 1) / 2) / max(n_pos * n_neg, 1)
+
+
+def permuted_scores(model, X, y, j, n_repeats, seed_seq, metric=METRIC):
+    """``metric`` for each of ``n_repeats`` shuffles of column ``j``, scored in stacked batches."""
+    rng = np.random.default_rng(seed_seq)
+    n = len(X)
+    per_batch = max(1, MAX_BATCH_ROWS // max(n, 1))
+    scores = []
+    for start in range(0, n_repeats, per_batch):
+        r = min(per_batch, n_repeats - start)
+        stacked = np.tile(X, (r, 1))
+        stacked[:, j] = np.concatenate([rng.permutation(X[:, j]) for _ in range(r)])
+        scores.extend(score(model, stacked, y, metric, r))
+    return np.array(scores)
+
+
+_worker = {}
+
+
+def _init_worker(model_bytes, X, y, metric):
+    import warnings
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    _worker.update(model=pickle.loads(model_bytes), X=X, y=y, metric=metric)
+
+
+def _score_feature(j, n_repeats, seed_seq):
+    w = _worker
+    return j, permuted_scores(w["model"], w["X"], w["y"], j, n_repeats, seed_seq, w["metric"])
+
+
+def compute(model_version, holdout, n_repeats=N_REPEATS, seed=SEED, workers=None, metric=METRIC, cancel=None):
+    """Permutation importance of every feature as a JSON-ready dict."""
+    from scipy import stats
+
+    t0 = time.perf_counter()
+    model, X, y = model_version.model, holdout.X, holdout.y
+    baseline = float(score(model, X, y, metric)[0])
+    seeds = np.random.SeedSequence(seed).spawn(schema.N_FEATURES)
+    used = used_features(model)
+    drops = np.zeros((schema.N_FEATURES, n_repeats))
+
+    workers = min(workers or os.cpu_count() or 1, len(used))
+    if workers <= 1:
+        for j in used:
+            if cancel is not None and cancel.is_set():
+                return None
+            drops[j] = baseline - permuted_scores(model, X, y, j, n_repeats, seeds[j], metric)
+    else:
+        import multiprocessing
+
+        # spawn: safe to start from the threaded Streamlit server.  Workers get this
+        # version's model as bytes, so a registry swap cannot change it mid-run.
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(pickle.dumps(model), X, y, metric))
+        cancelled = False
+        try:
+            pending = {pool.submit(_score_feature, j, n_repeats, seeds[j]) for j in used}
+            while pending:
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    return None
+                done, pending = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    j, scores = fut.result()
+                    drops[j] = baseline - scores
+        finally:
+            # On cancel, drop queued features and return without waiting for running ones
+            pool.shutdown(wait=not cancelled, cancel_futures=True)
+
+    mean = drops.mean(axis=1)
+    std = drops.std(axis=1, ddof=1) if n_repeats > 1 else np.zeros(schema.N_FEATURES)
+    half = stats.t.ppf(0.5 + CONFIDENCE / 2, max(n_repeats - 1, 1)) * std / np.sqrt(n_repeats)
+    return {
+        "model": model_version.digest, "data": holdout.digest, "source": holdout.source,
+        "rows": len(holdout), "metric": metric, "baseline": baseline,
+        "repeats": n_repeats, "seed": seed, "confidence": CONFIDENCE,
+        "features": schema.FEATURE_NAMES,
+        "mean": mean.tolist(), "std": std.tolist(),
+        "low": (mean - half).tolist(), "high": (mean + half).tolist(),
+        "scored_features": len(used), "seconds": time.perf_counter() - t0,
+    }
+
+
+def cache_path(model_version, holdout, n_repeats=N_REPEATS, seed=SEED, metric=METRIC, cache_dir=CACHE_DIR):
+    name = f"{model_version.short}-{holdout.digest}-{metric}-r{n_repeats}-s{seed}.json"
+    return os.path.join(cache_dir, name)
+
+
+def cached(model_version, holdout, n_repeats=N_REPEATS, seed=SEED, workers=None, metric=METRIC,
+           cache_dir=CACHE_DIR, force=False, cancel=None):
+    """``compute`` through the on-disk cache."""
+    path = cache_path(model_version, holdout, n_repeats, seed, metric, cache_dir)
+    if not force and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    result = compute(model_version, holdout, n_repeats, seed, workers, metric, cancel)
+    if result is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(result, f, indent=1)
+        os.replace(tmp, path)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Permutation importance of the active model on holdout data.")
+    parser.add_argument("--holdout", default=HOLDOUT_CSV, help="holdout CSV (default: notebook test split)")
+    parser.add_argument("--dataset", default=DATASET_CSV)
+    parser.add_argument("--repeats", type=int, default=N_REPEATS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--metric", choices=METRICS, default=METRIC)
+    parser.add_argument("--workers", type=int, help="processes (default: all CPUs)")
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    args = parser.parse_args(argv)
+
+    import warnings
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    from model_registry import ModelRegistry
+
+    holdout = load_holdout(args.holdout, args.dataset)
+    if holdout is None:
+        parser.error(f"no holdout: pass --holdout or provide {args.dataset}")
+    mv = ModelRegistry(poll_seconds=0).start().active()
+    r = cached(mv, holdout, args.repeats, args.seed, args.workers, args.metric, force=args.force)
+
+    print(f"model {mv.short} on {r['rows']:,} rows of {r['source']}: {r['metric']} {r['baseline']:.4f}, "
+          f"{r['repeats']} repeats, {r['seconds']:.2f}s")
+    order = np.argsort(r["mean"])[::-1]
+    for j in order:
+        print(f"  {r['features'][j]:<16} {r['mean'][j]:+.4f}  [{r['low'][j]:+.4f}, {r['high'][j]:+.4f}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
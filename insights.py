@@ -0,0 +1,110 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Model Insights
+# Model-derived artifacts rendered off the script thread
+# ============================================================
+"""Heavy, model-only artifacts for the MODEL INSIGHTS tab.
+
+Functions here take a model and return plain data (bytes, arrays, frames)
+so they can run in ``background.JobPool`` threads and be memoised per model
+version.  Matplotlib is driven through the object API (``Figure`` +
+``FigureCanvasAgg``) rather than ``pyplot``, whose global state is not
+thread-safe.
+
+``tree_layout`` feeds the interactive tree view in ``charts``; the PNG
+renderer stays for exports and benchmarks and imports matplotlib only when
+called, so the app never loads it.
+"""
+
+import io
+
+import numpy as np
+
+CLASS_NAMES = ["No Risk", "Risk"]
+
+
+def render_tree_png(model, feature_names, dpi=100):
+    """Draw the full decision tree and return it as PNG bytes."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from sklearn.tree import plot_tree
+
+    fig = Figure(figsize=(20, 10), facecolor="#050b14")
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_facecolor("#050b14")
+    plot_tree(
+        model,
+        filled=True,
+        feature_names=feature_names,
+        class_names=CLASS_NAMES,
+        ax=ax,
+        impurity=False,
+        proportion=True,
+        rounded=True,
+        fontsize=9,
+    )
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, facecolor=fig.get_facecolor())
+    return buf.getvalue()
+
+
+def tree_layout(model, feature_names):
+    """Node positions and labels for the interactive tree view, straight from ``model.tree_``.
+
+    Leaves sit at consecutive x positions in left-to-right order and every
+    split is centred over its children; ``y`` is minus the depth.  Returns
+    plain arrays indexed by node id plus ``parent`` for walking a path.
+    """
+    tree = model.tree_
+    n = tree.node_count
+    left, right = tree.children_left, tree.children_right
+    value = tree.value[:, 0, :]
+    pos_index = list(model.classes_).index(1) if 1 in model.classes_ else 0
+    risk = value[:, pos_index] / value.sum(axis=1)
+    share = tree.n_node_samples / tree.n_node_samples[0]
+
+    parent = np.full(n, -1)
+    depth = np.zeros(n, dtype=int)
+    for node in range(n):                      # children are numbered after their parent
+        for child in (left[node], right[node]):
+            if child != -1:
+                parent[child] = node
+                depth[child] = depth[node] + 1
+
+    x = np.zeros(n)
+    leaf_x = 0
+    stack = [(0, False)]
+    while stack:                               # post-order: leaves left to right, then parents
+        node, expanded = stack.pop()
+        if left[node] == -1:
+            x[node] = leaf_x
+            leaf_x += 1
+        elif expanded:
+            x[node] = (x[left[node]] + x[right[node]]) / 2
+        else:
+            stack += [(node, True), (right[node], False), (left[node], False)]
+
+    is_leaf = left == -1
+    label, hover = [], []
+    for node in range(n):
+        stats = f"{share[node] * 100:.1f}% of patients · risk {risk[node] * 100:.1f}%"
+        if is_leaf[node]:
+            label.append(f"{risk[node] * 100:.0f}%")
+            hover.append(f"Leaf #{node}<br>{stats}")
+        else:
+            rule = f"{feature_names[tree.feature[node]]} ≤ {tree.threshold[node]:g}"
+            label.append(rule)
+            hover.append(f"#{node} {rule}<br>{stats}<br>yes → left, no → right")
+    return {
+        "x": x, "y": -depth.astype(float), "parent": parent, "is_leaf": is_leaf,
+        "share": share, "risk": risk, "label": label, "hover": hover,
+        "edges": np.flatnonzero(parent >= 0),
+    }
+
+
+def tree_path(layout, leaf):
+    """Node ids from the root down to ``leaf``."""
+    path = [int(leaf)]
+    while layout["parent"][path[-1]] >= 0:
+        path.append(int(layout["parent"][path[-1]]))
+    return path[::-1]
@@ -0,0 +1,357 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Load Simulator
+# Concurrent sessions, rerun latency, CPU and per-session memory
+# ============================================================
+"""Simulate N users clicking through the app at the same time.
+
+    python loadtest.py                          # 1, 5, 10 and 20 concurrent sessions
+    python loadtest.py --sessions 50 --think 0  # saturate: no pause between clicks
+    python loadtest.py --sessions 1,10,40 --loops 3 --out load.json
+
+Every simulated session is a headless ``AppTest`` in its own process, driven
+through a click script modelled on a real visit: open the page, edit a few
+inputs, run a prediction, explore the partial dependence chart, adjust an
+input and predict again.  ``AppTest`` keeps process-wide state (the mock
+``Runtime``, the script cache), so two of them cannot run at once in one
+process.  Each process first does an unmeasured warm-up visit to fill its
+``st.cache_resource`` objects.  Then all sessions start together.  Sessions
+compete for the CPUs as they would on a server.  Unlike browser sessions on
+one ``streamlit run`` server, they do not share caches or the GIL.
+
+For each concurrency level the report gives
+
+* rerun latency percentiles, overall and per script step,
+* CPU of all session processes together (mean and peak, in % of one core)
+  and throughput,
+* memory: the deep size of each ``st.session_state`` key, the RSS and USS
+  of each session's process, and the RSS it gained during the measured
+  visit.  That growth also counts the test harness's copy of the rendered
+  page, so read it as an upper bound on what one session costs.
+
+All sessions use a scratch audit log, profile store and drift inbox
+(``benchmark.scratch_state``), so simulated clicks leave no records behind.
+Objects shared between sessions (the pinned ``ModelVersion``) are left out
+of the state sizes.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+
+import schema
+
+try:
+    import psutil
+except ImportError:  # CPU and RSS columns are reported as 0 without psutil
+    psutil = None
+
+APP_PATH     = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+STATE_KEYS   = ("prediction", "probabilities", "input_features", "history")
+SHARED_KEYS  = ("model_version",)
+EDIT_FEATURES = [f for f in schema.FEATURES if not f.categorical]
+SAMPLE_SECONDS = 0.25
+
+
+# ============================================================
+# MEMORY ACCOUNTING
+# ============================================================
+def deep_sizeof(obj, seen=None):
+    """Bytes held by ``obj`` and everything it references, counted once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray):
+        return size if obj.base is None else size + deep_sizeof(obj.base, seen)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def state_footprint(at):
+    """``{key: bytes}`` for the user-visible session state of one ``AppTest``."""
+    sizes = {}
+    for key, value in at.session_state.items():
+        if key in SHARED_KEYS:
+            continue
+        name = key if key in STATE_KEYS else "widgets"
+        sizes[name] = sizes.get(name, 0) + deep_sizeof(value)
+    return sizes
+
+
+def _memory():
+    """``(rss, uss)`` of this process in bytes; USS falls back to RSS where unavailable."""
+    if not psutil:
+        return 0, 0
+    try:
+        info = psutil.Process().memory_full_info()
+        return info.rss, info.uss
+    except psutil.AccessDenied:
+        rss = psutil.Process().memory_info().rss
+        return rss, rss
+
+
+def _cpu_seconds():
+    if not psutil:
+        return 0.0
+    t = psutil.Process().cpu_times()
+    return t.user + t.system
+
+
+class CpuSampler(threading.Thread):
+    """Samples the summed CPU % of processes ``pids`` every ``SAMPLE_SECONDS`` until stopped."""
+
+    def __init__(self, pids):
+        super().__init__(name="loadtest-cpu", daemon=True)
+        self.pids = pids
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        if not psutil:
+            return
+        procs = [psutil.Process(pid) for pid in self.pids]
+        for proc in procs:
+            proc.cpu_percent(None)
+        while not self._stop_event.wait(SAMPLE_SECONDS):
+            total = 0.0
+            for proc in procs:
+                try:
+                    total += proc.cpu_percent(None)
+                except psutil.NoSuchProcess:
+                    pass
+            self.samples.append(total)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+# ============================================================
+# CLICK SCRIPT
+# ============================================================
+class Session:
+    """One simulated browser tab: an ``AppTest`` plus its timing log."""
+
+    def __init__(self, rng, think, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng     = rng
+        self.think   = think
+        self.at      = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.timings = []      # (step, seconds)
+        self.errors  = []
+
+    def _rerun(self, step, action=None):
+        if self.think:
+            time.sleep(self.rng.expovariate(1.0 / self.think))
+        if action is not None:
+            action()
+        t0 = time.perf_counter()
+        self.at.run()
+        self.timings.append((step, time.perf_counter() - t0))
+        if self.at.exception:
+            self.errors.append(f"{step}: {self.at.exception[0].message}")
+
+    def _edit(self):
+        feat = self.rng.choice(EDIT_FEATURES)
+        value = self.rng.uniform(feat.lo, feat.hi)
+        value = round(value) if feat.kind == "int" else round(value, 1)
+        self.at.number_input(key=f"in_{feat.name}").set_value(value)
+
+    def _toggle(self):
+        feat = self.rng.choice([f for f in schema.FEATURES if f.categorical])
+        self.at.selectbox(key=f"in_{feat.name}").select(self.rng.choice(feat.choices)[0])
+
+    def _predict(self):
+        self.at.button(key="predict").click()
+
+    def _explore(self):
+        self.at.selectbox(key="pdp_feature").select(self.rng.choice(schema.FEATURE_NAMES))
+
+    def visit(self, loops):
+        try:
+            self._script(loops)
+        except Exception as exc:  # noqa: BLE001 - a broken page must not kill the run
+            self.errors.append(f"script aborted: {exc!r}")
+
+    def _script(self, loops):
+        self._rerun("open")
+        for _ in range(loops):
+            for _ in range(3):
+                self._rerun("edit", self._edit)
+            self._rerun("edit", self._toggle)
+            self._rerun("predict", self._predict)
+            self._rerun("explore", self._explore)
+            self._rerun("explore", self._explore)
+            self._rerun("edit", self._edit)
+            self._rerun("predict", self._predict)
+
+
+# ============================================================
+# LOAD LEVELS
+# ============================================================
+def _percentiles(seconds):
+    ms = np.asarray(seconds) * 1e3
+    if not len(ms):
+        return {}
+    p50, p90, p95, p99 = np.percentile(ms, [50, 90, 95, 99])
+    return {"n": int(len(ms)), "p50": p50, "p90": p90, "p95": p95, "p99": p99, "max": float(ms.max())}
+
+
+def _session_process(index, seed, loops, think, timeout, ready, start, conn):
+    """Child process: warm up, wait for the common start, run one measured visit, report."""
+    warnings.filterwarnings("ignore")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    Session(random.Random(-1 - index), 0, timeout).visit(1)   # fill this process's caches
+    gc.collect()
+    rss0, _ = _memory()
+    ready.release()
+    start.wait()
+
+    session = Session(random.Random(seed * 100_003 + index), think, timeout)
+    cpu0 = _cpu_seconds()
+    session.visit(loops)
+    cpu = _cpu_seconds() - cpu0
+    gc.collect()
+    rss, uss = _memory()
+    conn.send({
+        "timings": session.timings, "errors": session.errors, "cpu_s": cpu,
+        "state": state_footprint(session.at), "rss": rss, "uss": uss, "rss_gain": rss - rss0,
+    })
+    conn.close()
+
+
+def run_level(n_sessions, loops, think, timeout, seed):
+    """Run ``n_sessions`` concurrent visits, one process each, and summarise them."""
+    ctx = multiprocessing.get_context("spawn")
+    ready, start = ctx.Semaphore(0), ctx.Event()
+    procs, conns = [], []
+    for i in range(n_sessions):
+        parent, child = ctx.Pipe(duplex=False)
+        p = ctx.Process(target=_session_process, name=f"loadtest-{i}",
+                        args=(i, seed, loops, think, timeout, ready, start, child))
+        p.start()
+        child.close()
+        procs.append(p)
+        conns.append(parent)
+    waiting = n_sessions
+    while waiting:
+        if ready.acquire(timeout=1.0):
+            waiting -= 1
+        elif not all(p.is_alive() for p in procs):
+            break          # a session died while warming up; reported below
+
+    sampler = CpuSampler([p.pid for p in procs])
+    sampler.start()
+    t0 = time.perf_counter()
+    start.set()
+    reports, errors = [], []
+    for i, conn in enumerate(conns):
+        try:
+            reports.append(conn.recv())
+        except EOFError:
+            errors.append(f"session {i}: process exited with code {procs[i].exitcode}")
+    wall = time.perf_counter() - t0
+    samples = sampler.stop()
+    for p in procs:
+        p.join()
+
+    timings = [t for r in reports for t in r["timings"]]
+    steps = {}
+    for step, seconds in timings:
+        steps.setdefault(step, []).append(seconds)
+    footprints = [r["state"] for r in reports]
+    state_bytes = {k: statistics.mean(fp.get(k, 0) for fp in footprints)
+                   for k in sorted({k for fp in footprints for k in fp})}
+    errors += [e for r in reports for e in r["errors"]]
+
+    def mean(key):
+        return statistics.mean(r[key] for r in reports) if reports else 0
+
+    return {
+        "sessions": n_sessions,
+        "reruns": len(timings),
+        "wall_s": wall,
+        "reruns_per_s": len(timings) / wall,
+        "cpu_mean_pct": 100 * sum(r["cpu_s"] for r in reports) / wall,
+        "cpu_peak_pct": max(samples, default=0.0),
+        "latency_ms": _percentiles([s for _, s in timings]),
+        "latency_ms_by_step": {k: _percentiles(v) for k, v in steps.items()},
+        "state_bytes_per_session": state_bytes,
+        "state_bytes_total": sum(state_bytes.values()),
+        "rss_bytes_per_process": mean("rss"),
+        "uss_bytes_per_process": mean("uss"),
+        "rss_gain_bytes_per_session": mean("rss_gain"),
+        "errors": errors[:20],
+    }
+
+
+def print_level(r):
+    lat = r["latency_ms"]
+    print(f"\n── {r['sessions']} concurrent session(s): {r['reruns']} reruns in {r['wall_s']:.1f}s "
+          f"({r['reruns_per_s']:.1f}/s)")
+    print(f"   latency ms   p50 {lat['p50']:7.1f}  p90 {lat['p90']:7.1f}  p95 {lat['p95']:7.1f}  "
+          f"p99 {lat['p99']:7.1f}  max {lat['max']:7.1f}")
+    for step, s in r["latency_ms_by_step"].items():
+        print(f"     {step:<10} p50 {s['p50']:7.1f}  p95 {s['p95']:7.1f}  (n={s['n']})")
+    print(f"   CPU          mean {r['cpu_mean_pct']:.0f}%  peak {r['cpu_peak_pct']:.0f}% "
+          f"(of one core, {os.cpu_count()} available)")
+    state = "  ".join(f"{k} {v / 1024:.1f}" for k, v in r["state_bytes_per_session"].items())
+    print(f"   memory/sess  session_state {r['state_bytes_total'] / 1024:.1f} KiB ({state})  "
+          f"RSS +{r['rss_gain_bytes_per_session'] / 2**20:.2f} MiB during the visit")
+    print(f"   per process  RSS {r['rss_bytes_per_process'] / 2**20:.1f} MiB  "
+          f"USS {r['uss_bytes_per_process'] / 2**20:.1f} MiB")
+    for e in r["errors"]:
+        print(f"   ERROR {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent HRIP sessions.")
+    parser.add_argument("--sessions", default="1,5,10,20",
+                        help="comma-separated concurrency levels (default 1,5,10,20)")
+    parser.add_argument("--loops", type=int, default=2, help="click-script loops per session")
+    parser.add_argument("--think", type=float, default=0.2,
+                        help="mean pause before each click in seconds, exponential (default 0.2)")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    if not psutil:
+        print("psutil not installed: CPU and memory figures will read 0")
+
+    from benchmark import scratch_state
+
+    results = []
+    with scratch_state():
+        for n in (int(s) for s in args.sessions.split(",")):
+            results.append(run_level(n, args.loops, args.think, args.timeout, args.seed))
+            print_level(results[-1])
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"cpus": os.cpu_count(), "loops": args.loops, "think": args.think,
+                       "levels": results}, f, indent=2)
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Model Registry
+# Content-hashed model versions with background hot reload
+# ============================================================
+"""Watch a models directory and hot-swap verified model versions.
+
+Every pickle dropped into ``models/`` (or ``$HRIP_MODELS_DIR``) is hashed,
+loaded in a background thread, checked against a small smoke set and, if it
+passes, made the active version in a single reference assignment.  Versions
+are keyed by the SHA-256 of the file contents, so renaming or re-copying the
+same model is a no-op.
+
+Sessions pin the ``ModelVersion`` they were scored with.  The registry only
+keeps a strong reference to the active version; older versions live in a
+``WeakValueDictionary`` and disappear once the last session lets go of them.
+Anything derived from a model (positive-class index, importance tables,
+rendered trees, ...) is stored on its ``ModelVersion`` via ``memo`` and is
+therefore never shared between versions.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+import weakref
+
+import numpy as np
+
+import schema
+
+log = logging.getLogger(__name__)
+
+MODELS_DIR     = os.environ.get("HRIP_MODELS_DIR", "models")
+DEFAULT_MODEL  = "hyper.pkl"
+POLL_SECONDS   = float(os.environ.get("HRIP_MODEL_POLL_SECONDS", "5"))
+N_FEATURES     = schema.N_FEATURES
+
+# Representative patients spanning the input ranges used by the app.
+SMOKE_SET = np.array([
+    [30, 1, 25.0,  8000, 7.0, 2.0, 2200, 0, 0,  75, 120,  80, 200, 0],
+    [65, 0, 34.5,  2500, 4.5, 1.0, 3400, 1, 1,  95, 170, 110, 290, 1],
+    [45, 1, 29.0, 10500, 6.5, 2.8, 2600, 0, 1,  74, 135,  89, 224, 0],
+    [22, 0, 19.5, 18000, 9.0, 4.5, 1500, 0, 0,  55,  95,  62, 160, 1],
+    [79, 1, 40.0,  1000, 3.0, 0.5, 3999, 1, 0,  99, 179, 119, 299, 1],
+], dtype=float)
+
+
+class ModelVersion:
+    """An immutable, verified model plus the caches derived from it."""
+
+    def __init__(self, model, digest, path):
+        self.model     = model
+        self.digest    = digest
+        self.short     = digest[:12]
+        self.path      = path
+        self.loaded_at = time.time()
+        self.pos_index = list(model.classes_).index(1) if 1 in model.classes_ else 0
+        self._memo     = {}
+        self._lock     = threading.Lock()
+
+    def memo(self, key, fn):
+        """Return ``fn(self)`` computed at most once for this version."""
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = fn(self)
+        with self._lock:
+            return self._memo.setdefault(key, value)
+
+    def __repr__(self):
+        return f"ModelVersion({self.short}, {os.path.basename(self.path) if self.path else 'in memory'})"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def verify(model):
+    """Raise ``ValueError`` unless ``model`` behaves like the shipped classifier."""
+    for attr in ("predict", "predict_proba", "classes_"):
+        if not hasattr(model, attr):
+            raise ValueError(f"model has no {attr!r}")
+    n_in = getattr(model, "n_features_in_", N_FEATURES)
+    if n_in != N_FEATURES:
+        raise ValueError(f"expected {N_FEATURES} features, model takes {n_in}")
+    if 1 not in model.classes_:
+        raise ValueError(f"positive class 1 missing from classes {list(model.classes_)}")
+
+    proba = np.asarray(model.predict_proba(SMOKE_SET))
+    if proba.shape != (len(SMOKE_SET), len(model.classes_)):
+        raise ValueError(f"predict_proba returned shape {proba.shape}")
+    if not np.all(np.isfinite(proba)) or proba.min() < 0 or proba.max() > 1:
+        raise ValueError("predict_proba returned values outside [0, 1]")
+    if not np.allclose(proba.sum(axis=1), 1.0, atol=1e-6):
+        raise ValueError("predict_proba rows do not sum to 1")
+    pred = np.asarray(model.predict(SMOKE_SET))
+    if not np.array_equal(pred, np.asarray(model.classes_)[proba.argmax(axis=1)]):
+        raise ValueError("predict disagrees with predict_proba")
+
+
+class ModelRegistry:
+    """Background loader that keeps ``active()`` pointing at the newest good model."""
+
+    def __init__(self, models_dir=MODELS_DIR, fallback=DEFAULT_MODEL, poll_seconds=POLL_SECONDS):
+        self.models_dir   = models_dir
+        self.fallback     = fallback
+        self.poll_seconds = poll_seconds
+        self._active      = None
+        self._versions    = weakref.WeakValueDictionary()
+        self._stat_cache  = {}   # path -> ((mtime_ns, size), digest)
+        self._rejected    = {}   # digest -> reason
+        self._lock        = threading.Lock()
+        self._stop        = threading.Event()
+        self._thread      = None
+
+    # ── Public API ──
+    def active(self):
+        return self._active
+
+    def get(self, digest):
+        """Return a still-referenced version by hash, or ``None``."""
+        return self._versions.get(digest)
+
+    def versions(self):
+        return sorted(self._versions.values(), key=lambda v: v.loaded_at)
+
+    def rejected(self):
+        return dict(self._rejected)
+
+    def start(self):
+        """Load the initial model synchronously, then watch in the background."""
+        self.scan(initial=True)
+        if self._active is None:
+            raise RuntimeError(f"no loadable model in {self.models_dir!r} or {self.fallback!r}")
+        if self._thread is None and self.poll_seconds > 0:
+            self._thread = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ── Scanning ──
+    def candidates(self):
+        """Model files, newest first; the bundled model is the last resort."""
+        paths = []
+        if os.path.isdir(self.models_dir):
+            for name in os.listdir(self.models_dir):
+                if name.endswith(".pkl"):
+                    paths.append(os.path.join(self.models_dir, name))
+        paths.sort(key=lambda p: os.stat(p).st_mtime_ns, reverse=True)
+        if os.path.exists(self.fallback):
+            paths.append(self.fallback)
+        return paths
+
+    def scan(self, initial=False):
+        """Activate the newest candidate; on startup fall back to older ones."""
+        with self._lock:
+            for path in self.candidates():
+                try:
+                    version = self._load(path)
+                except Exception as exc:  # noqa: BLE001 - any bad pickle must not kill the watcher
+                    log.warning("model %s rejected: %s", path, exc)
+                    version = None
+                if version is not None:
+                    if self._active is None or version.digest != self._active.digest:
+                        log.info("activating %r", version)
+                        self._active = version
+                    return
+                if not initial:
+                    return
+
+    def _digest(self, path):
+        st_before = os.stat(path)
+        key = (st_before.st_mtime_ns, st_before.st_size)
+        cached = self._stat_cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = file_digest(path)
+        st_after = os.stat(path)
+        if (st_after.st_mtime_ns, st_after.st_size) != key:
+            return None  # still being written; try again next poll
+        self._stat_cache[path] = (key, digest)
+        return digest
+
+    def _load(self, path):
+        digest = self._digest(path)
+        if digest is None:
+            return None
+        if self._active is not None and digest == self._active.digest:
+            return self._active
+        known = self._versions.get(digest)
+        if known is not None:
+            return known
+        if digest in self._rejected:
+            return None
+        try:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+            verify(model)
+        except Exception as exc:
+            self._rejected[digest] = str(exc)
+            raise
+        version = ModelVersion(model, digest, path)
+        self._versions[digest] = version
+        return version
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.scan()
+            except Exception:  # noqa: BLE001
+                log.exception("model scan failed")
@@ -0,0 +1,304 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Patient Profiles
+# Indexed SQLite store behind a shared connection pool
+# ============================================================
+"""Save and reload returning patients' 14 inputs by patient ID.
+
+    python profiles.py import roster.csv --id-column patient_id
+    python profiles.py rescore
+    python profiles.py get P000123
+    python profiles.py bench --rows 1000000
+
+Profiles live in ``$HRIP_PROFILES_DB`` (default ``profiles.db``), one row
+per patient in a ``WITHOUT ROWID`` table clustered on ``patient_id``: a
+lookup is a single B-tree descent, which stays well inside single-digit
+milliseconds at a million profiles.  ``updated`` is indexed for "recently
+changed" listings.  Each row also keeps the last risk, verdict and model
+hash it was scored with; saving new inputs clears them.
+
+``ConnectionPool`` hands out a few long-lived connections (WAL mode, so
+readers never wait for the writer).  The app keeps one pool in
+``st.cache_resource``, so reruns and sessions reuse open connections
+instead of connecting per click.
+
+``import_csv`` upserts a roster in chunked transactions; ``rescore_all``
+walks the table in primary-key order, a chunk at a time, with one
+``predict_proba`` call per chunk.
+"""
+
+import argparse
+import contextlib
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+import schema
+
+PROFILES_DB  = os.environ.get("HRIP_PROFILES_DB", "profiles.db")
+POOL_SIZE    = 4
+POOL_TIMEOUT = 30.0
+CHUNK_ROWS   = 1 << 14
+ID_COLUMN    = "patient_id"
+
+_FEATURES = ", ".join(schema.FEATURE_NAMES)
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id  TEXT PRIMARY KEY,
+    updated     REAL NOT NULL,
+    {", ".join(f"{name} REAL NOT NULL" for name in schema.FEATURE_NAMES)},
+    risk        REAL,
+    prediction  INTEGER,
+    model       TEXT,
+    scored_at   REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS patients_updated ON patients (updated);
+"""
+_UPSERT = (
+    f"INSERT INTO patients (patient_id, updated, {_FEATURES}) "
+    f"VALUES ({', '.join('?' * (schema.N_FEATURES + 2))}) "
+    f"ON CONFLICT (patient_id) DO UPDATE SET updated = excluded.updated, "
+    + ", ".join(f"{name} = excluded.{name}" for name in schema.FEATURE_NAMES)
+    + ", risk = NULL, prediction = NULL, model = NULL, scored_at = NULL"
+)
+_GET      = f"SELECT {_FEATURES}, risk, prediction, model FROM patients WHERE patient_id = ?"
+_SCORE    = "UPDATE patients SET risk = ?, prediction = ?, model = ?, scored_at = ? WHERE patient_id = ?"
+_PAGE     = f"SELECT patient_id, {_FEATURES} FROM patients WHERE patient_id > ? ORDER BY patient_id LIMIT ?"
+
+
+# ============================================================
+# CONNECTION POOL
+# ============================================================
+class ConnectionPool:
+    """Up to ``size`` SQLite connections, opened lazily and reused (most recent first)."""
+
+    def __init__(self, path=PROFILES_DB, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.path    = path
+        self.size    = size
+        self.timeout = timeout
+        self._idle   = queue.LifoQueue()
+        self._opened = 0
+        self._lock   = threading.Lock()
+        with self.connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    @contextlib.contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                opening = self._opened < self.size
+                self._opened += opening
+            if not opening:
+                conn = self._idle.get(timeout=self.timeout)
+            else:
+                try:
+                    conn = self._open()
+                except BaseException:
+                    with self._lock:          # give the slot back, or it is lost for good
+                        self._opened -= 1
+                    raise
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# ============================================================
+# STORE
+# ============================================================
+class ProfileStore:
+    """Patient profiles keyed by ID."""
+
+    def __init__(self, path=PROFILES_DB, pool_size=POOL_SIZE):
+        self.pool = ConnectionPool(path, pool_size)
+
+    def get(self, patient_id):
+        """Model-ordered feature row for ``patient_id``, or ``None``."""
+        record = self.record(patient_id)
+        return None if record is None else record["features"]
+
+    def record(self, patient_id):
+        """``{"features", "risk", "prediction", "model"}`` for ``patient_id``, or ``None``."""
+        with self.pool.connection() as conn:
+            row = conn.execute(_GET, (patient_id,)).fetchone()
+        if row is None:
+            return None
+        n = schema.N_FEATURES
+        return {"features": np.array(row[:n], dtype=np.float64),
+                "risk": row[n], "prediction": row[n + 1], "model": row[n + 2]}
+
+    def save(self, patient_id, features, risk=None, prediction=None, model=None):
+        """Insert or replace one profile; ``risk`` etc. record the score it was saved with."""
+        now = time.time()
+        with self.pool.connection() as conn, conn:
+            conn.execute(_UPSERT, (patient_id, now, *(float(v) for v in np.ravel(features))))
+            if risk is not None:
+                conn.execute(_SCORE, (float(risk), None if prediction is None else int(prediction),
+                                      model, now, patient_id))
+
+    def count(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+
+    def recent(self, limit=20):
+        """Most recently saved patient IDs, newest first (``updated`` index)."""
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT patient_id FROM patients ORDER BY updated DESC LIMIT ?",
+                                (limit,)).fetchall()
+        return [r[0] for r in rows]
+
+    # ── Bulk paths ──
+    def save_many(self, patient_ids, X):
+        """Upsert many rows in one transaction."""
+        now = time.time()
+        rows = ((str(pid), now, *row) for pid, row in zip(patient_ids, np.asarray(X, dtype=np.float64).tolist()))
+        with self.pool.connection() as conn, conn:
+            conn.executemany(_UPSERT, rows)
+
+    def import_csv(self, path, id_column=ID_COLUMN, chunk_rows=CHUNK_ROWS):
+        """Upsert every valid row of a roster CSV; return ``(imported, rejected)``."""
+        import pandas as pd
+
+        imported = rejected = 0
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype={id_column: str}):
+            X = schema.to_matrix(chunk)
+            ok = (schema.validate(X) == 0) & chunk[id_column].notna().to_numpy()
+            self.save_many(chunk[id_column].to_numpy()[ok], X[ok])
+            imported += int(ok.sum())
+            rejected += int((~ok).sum())
+        return imported, rejected
+
+    def iter_chunks(self, chunk_rows=CHUNK_ROWS):
+        """``(ids, X)`` pages in primary-key order (keyset pagination, no OFFSET scans)."""
+        last = ""
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute(_PAGE, (last, chunk_rows)).fetchall()
+            if not rows:
+                return
+            ids = [r[0] for r in rows]
+            yield ids, np.array([r[1:] for r in rows], dtype=np.float64)
+            last = ids[-1]
+
+    def rescore_all(self, model_version, chunk_rows=CHUNK_ROWS):
+        """Score every profile with ``model_version``; return ``(scored, invalid)``."""
+        model, classes = model_version.model, np.asarray(model_version.model.classes_)
+        scored = invalid = 0
+        for ids, X in self.iter_chunks(chunk_rows):
+            ok = schema.validate(X) == 0
+            proba = model.predict_proba(X[ok]) if ok.any() else np.empty((0, len(classes)))
+            # Same verdict as model.predict, from the one predict_proba call
+            risk = iter(proba[:, model_version.pos_index].tolist())
+            pred = iter(classes[proba.argmax(axis=1)].tolist())
+            now = time.time()
+            rows = [(next(risk), int(next(pred)), model_version.digest, now, pid) if good
+                    else (None, None, None, now, pid) for pid, good in zip(ids, ok)]
+            with self.pool.connection() as conn, conn:
+                conn.executemany(_SCORE, rows)
+            scored  += int(ok.sum())
+            invalid += int((~ok).sum())
+        return scored, invalid
+
+    def query_plan(self):
+        with self.pool.connection() as conn:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + _GET, ("x",)).fetchall()
+        return "; ".join(r[-1] for r in rows)
+
+
+# ============================================================
+# CLI
+# ============================================================
+def bench(store, n_rows, lookups=2000, seed=0):
+    """Fill ``store`` to ``n_rows`` synthetic profiles and time random lookups by ID."""
+    rng = np.random.default_rng(seed)
+    have = store.count()
+    t0 = time.perf_counter()
+    for start in range(have, n_rows, 100_000):
+        stop = min(start + 100_000, n_rows)
+        X = rng.uniform(schema.LOWER, schema.UPPER, (stop - start, schema.N_FEATURES))
+        X[:, schema.INTEGRAL] = np.round(X[:, schema.INTEGRAL])
+        store.save_many([f"P{i:07d}" for i in range(start, stop)], X)
+    if n_rows > have:
+        print(f"inserted {n_rows - have:,} profiles in {time.perf_counter() - t0:.1f}s")
+
+    total = store.count()
+    ids = [f"P{i:07d}" for i in rng.integers(0, total, lookups)]
+    ms = []
+    for pid in ids:
+        t = time.perf_counter()
+        store.get(pid)
+        ms.append((time.perf_counter() - t) * 1e3)
+    p50, p99 = np.percentile(ms, [50, 99])
+    print(f"{lookups:,} lookups over {total:,} profiles: p50 {p50:.3f} ms  p99 {p99:.3f} ms  max {max(ms):.3f} ms")
+    print(store.query_plan())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage HRIP patient profiles.")
+    parser.add_argument("--db", default=PROFILES_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="upsert a roster CSV")
+    imp.add_argument("csv")
+    imp.add_argument("--id-column", default=ID_COLUMN)
+    sub.add_parser("rescore", help="score every profile with the active model")
+    get = sub.add_parser("get", help="print one profile")
+    get.add_argument("patient_id")
+    b = sub.add_parser("bench", help="fill with synthetic profiles and time lookups")
+    b.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.db)
+    if args.cmd == "import":
+        t0 = time.perf_counter()
+        imported, rejected = store.import_csv(args.csv, args.id_column)
+        print(f"imported {imported:,} profiles ({rejected:,} rejected) in {time.perf_counter() - t0:.1f}s")
+    elif args.cmd == "rescore":
+        from model_registry import ModelRegistry
+
+        mv = ModelRegistry(poll_seconds=0).start().active()
+        t0 = time.perf_counter()
+        scored, invalid = store.rescore_all(mv)
+        wall = time.perf_counter() - t0
+        print(f"rescored {scored:,} profiles with model {mv.short} in {wall:.1f}s "
+              f"({scored / max(wall, 1e-9):,.0f}/s, {invalid:,} invalid)")
+    elif args.cmd == "get":
+        record = store.record(args.patient_id)
+        if record is None:
+            print(f"no profile {args.patient_id!r}")
+            return 1
+        for feat, v in zip(schema.FEATURES, record["features"]):
+            print(f"  {feat.label:<26} {v:g}")
+        if record["risk"] is not None:
+            print(f"  risk {record['risk'] * 100:.1f}% (model {record['model'][:12]})")
+    else:
+        bench(store, args.rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Bulk Patient Reports
+# Static HTML report per patient, rendered across a process pool
+# ============================================================
+"""Write one self-contained HTML report for every patient in a roster.
+
+    python reports.py roster.csv reports/                 # CSV with a patient_id column
+    python reports.py --profiles profiles.db reports/     # every saved profile
+    python reports.py roster.csv reports/ --workers 8 --chunk 512
+
+A report holds the verdict and confidence, the gauge value, the radar
+profile values, the decision path with the patient's value at every split,
+and each feature's contribution to the risk: the change in the positive-
+class share at every split on the path, summed per split feature, so that
+baseline + contributions = risk.  Charts are inline SVG; a report is a few
+kB and needs no scripts.
+
+The roster is read in chunks in the parent process and each chunk goes to
+a ``ProcessPoolExecutor`` worker.  Workers receive the parent's model
+(pickled bytes, so a registry hot swap mid-run cannot change it) and load
+the ``assets/report.html`` template once, in their initializer, then score a
+whole chunk with one ``predict_proba`` and one ``decision_path`` call.
+Contributions come from one sparse product of the path matrix with a
+per-edge table.
+
+Reports are written atomically, so an existing file is always complete.
+``run.json`` in the output directory records the model the run uses.
+Rerunning the same command skips patients whose report already exists,
+which resumes an interrupted run.  Use ``--restart`` after changing model.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import pickle
+import re
+import string
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+import schema
+
+APP_DIR    = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE   = os.path.join(APP_DIR, "assets", "report.html")
+CHUNK_ROWS = 256
+ID_COLUMN  = "patient_id"
+RUN_FILE   = "run.json"
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def report_name(patient_id):
+    """File name for ``patient_id``; IDs that need escaping get a hash of the raw ID.
+
+    ``~`` never survives escaping, so escaped names cannot collide with plain
+    ones, and the hash keeps e.g. ``P/1`` and ``P:1`` apart.
+    """
+    raw = str(patient_id)
+    safe = _SAFE_NAME.sub("_", raw)
+    if safe != raw:
+        safe += "~" + hashlib.sha256(raw.encode()).hexdigest()[:12]
+    return safe + ".html"
+
+
+# ============================================================
+# MODEL-DERIVED TABLES
+# ============================================================
+def tree_tables(model, pos_index):
+    """Per-node positive share, and the ``(nodes, features)`` contribution of entering each node."""
+    from scipy import sparse
+
+    tree = model.tree_
+    value = tree.value[:, 0, :]
+    share = value[:, pos_index] / value.sum(axis=1)
+    parent = np.full(tree.node_count, -1)
+    for node in range(tree.node_count):
+        for child in (tree.children_left[node], tree.children_right[node]):
+            if child != -1:
+                parent[child] = node
+    child = np.flatnonzero(parent >= 0)
+    edges = sparse.csr_matrix(
+        (share[child] - share[parent[child]], (child, tree.feature[parent[child]])),
+        shape=(tree.node_count, schema.N_FEATURES),
+    )
+    return share, edges
+
+
+# ============================================================
+# SVG
+# ============================================================
+def _arc(cx, cy, r, a0, a1):
+    x0, y0 = cx + r * np.cos(a0), cy - r * np.sin(a0)
+    x1, y1 = cx + r * np.cos(a1), cy - r * np.sin(a1)
+    return f"M{x0:.1f},{y0:.1f} A{r},{r} 0 0 1 {x1:.1f},{y1:.1f}"
+
+
+def gauge_svg(risk_pct):
+    """Half-circle meter with the app's 40/70 bands and a needle at ``risk_pct``."""
+    bands = ((0, 40, "#00ff9f"), (40, 70, "#ff9f00"), (70, 100, "#ff3864"))
+    parts = [
+        f'<path d="{_arc(150, 140, 110, np.pi * (1 - lo / 100), np.pi * (1 - hi / 100))}" '
+        f'stroke="{color}" stroke-opacity="0.35" stroke-width="26" fill="none"/>'
+        for lo, hi, color in bands
+    ]
+    a = np.pi * (1 - risk_pct / 100)
+    parts.append(f'<line x1="150" y1="140" x2="{150 + 100 * np.cos(a):.1f}" y2="{140 - 100 * np.sin(a):.1f}" '
+                 f'stroke="#00d4ff" stroke-width="4" stroke-linecap="round"/>')
+    parts.append(f'<text x="150" y="130" text-anchor="middle" font-size="30" fill="#00d4ff" '
+                 f'font-family="Orbitron,sans-serif">{risk_pct:.1f}%</text>')
+    return f'<svg viewBox="0 0 300 160" width="100%">{"".join(parts)}</svg>'
+
+
+def radar_svg(values, labels):
+    """Closed polygon of 0-100 ``values`` on ``len(labels)`` axes."""
+    n = len(values)
+    angles = np.pi / 2 - 2 * np.pi * np.arange(n) / n
+    cx = cy = 150
+    rings = "".join(
+        f'<polygon points="{_points(np.full(n, level), angles, cx, cy)}" fill="none" '
+        f'stroke="rgba(0,212,255,0.15)"/>' for level in (25, 50, 75, 100)
+    )
+    axes = "".join(
+        f'<text x="{cx + 128 * np.cos(a):.1f}" y="{cy - 128 * np.sin(a) + 4:.1f}" text-anchor="middle" '
+        f'font-size="10" fill="rgba(0,212,255,0.7)">{html.escape(label)}</text>'
+        for a, label in zip(angles, labels)
+    )
+    shape = (f'<polygon points="{_points(values, angles, cx, cy)}" fill="rgba(0,212,255,0.12)" '
+             f'stroke="#00d4ff" stroke-width="2"/>')
+    return f'<svg viewBox="0 0 300 300" width="100%">{rings}{axes}{shape}</svg>'
+
+
+def _points(values, angles, cx, cy, radius=100):
+    r = np.asarray(values, dtype=np.float64) / 100 * radius
+    return " ".join(f"{cx + x:.1f},{cy - y:.1f}" for x, y in zip(r * np.cos(angles), r * np.sin(angles)))
+
+
+# ============================================================
+# RENDERING
+# ============================================================
+def _fmt(feat, value):
+    if feat.categorical:
+        return feat.decode(round(value))
+    return f"{value:.1f}" if feat.kind == "float" else f"{round(value):,}"
+
+
+def _path_rows(tree, nodes, x, share):
+    rows = []
+    for depth, node in enumerate(nodes):
+        if tree.children_left[node] == -1:
+            rows.append(f'<tr class="leaf"><td>#{node}</td><td>Leaf ({tree.n_node_samples[node]:,} training '
+                        f'patients)</td><td></td><td class="num">{share[node] * 100:.1f}%</td></tr>')
+            continue
+        feat = schema.FEATURES[tree.feature[node]]
+        goes_left = nodes[depth + 1] == tree.children_left[node]
+        op = "&le;" if goes_left else "&gt;"
+        rows.append(f"<tr><td>#{node}</td><td>{html.escape(feat.label)} {op} {tree.threshold[node]:g}</td>"
+                    f"<td>{_fmt(feat, x[tree.feature[node]])}</td>"
+                    f'<td class="num">{share[node] * 100:.1f}%</td></tr>')
+    return "\n      ".join(rows)
+
+
+def _contrib_rows(contrib):
+    order = np.argsort(-np.abs(contrib), kind="stable")
+    top = max(float(np.abs(contrib).max()), 1e-12)
+    rows = []
+    for j in order:
+        c = contrib[j] * 100
+        if abs(c) < 1e-9:
+            continue
+        width = abs(contrib[j]) / top * 120
+        rows.append(f"<tr><td>{html.escape(schema.FEATURES[j].label)}</td><td class=\"num\">{c:+.2f}</td>"
+                    f'<td><span class="bar {"up" if c > 0 else "down"}" style="width:{width:.0f}px"></span></td></tr>')
+    rows.append(f'<tr><td colspan="3" class="meta">{schema.N_FEATURES - len(rows)} other features: no effect on this path</td></tr>')
+    return "\n      ".join(rows)
+
+
+def render_chunk(ids, X, model, pos_index, model_short, template, tables, generated):
+    """``[(patient_id, html)]`` for one chunk, scored with vectorised calls."""
+    share, edges = tables
+    tree = model.tree_
+    proba = model.predict_proba(X)
+    risk = proba[:, pos_index]
+    pred = np.asarray(model.classes_)[proba.argmax(axis=1)]
+    paths = model.decision_path(X).tocsr()
+    contrib = np.asarray((paths @ edges).todense())
+    radar = schema.normalise(X, list(schema.RADAR_FEATURES))
+    radar_idx = [schema.FEATURE_NAMES.index(n) for n in schema.RADAR_FEATURES]
+    radar_labels = [schema.BY_NAME[n].label for n in schema.RADAR_FEATURES]
+    baseline = share[0] * 100
+
+    out = []
+    for i, pid in enumerate(ids):
+        risk_pct = float(risk[i]) * 100
+        nodes = paths.indices[paths.indptr[i]:paths.indptr[i + 1]]
+        radar_of = dict(zip(radar_idx, radar[i]))
+        out.append((pid, template.substitute(
+            patient_id=html.escape(str(pid)),
+            generated=generated,
+            model=model_short,
+            verdict_class="risk" if pred[i] == 1 else "safe",
+            verdict="HEALTH RISK DETECTED" if pred[i] == 1 else "NO SIGNIFICANT HEALTH RISK",
+            risk_pct=f"{risk_pct:.1f}",
+            confidence=f"{float(proba[i].max()) * 100:.1f}",
+            baseline=f"{baseline:.1f}",
+            gauge_svg=gauge_svg(risk_pct),
+            radar_svg=radar_svg(radar[i], radar_labels),
+            path_rows=_path_rows(tree, np.sort(nodes), X[i], share),
+            contrib_rows=_contrib_rows(contrib[i]),
+            input_rows="\n  ".join(
+                f"<tr><td>{html.escape(f.label)}</td><td class=\"num\">{_fmt(f, X[i, j])}</td>"
+                f"<td class=\"num\">{'' if j not in radar_of else f'{radar_of[j]:.0f}'}</td></tr>"
+                for j, f in enumerate(schema.FEATURES)
+            ),
+        )))
+    return out
+
+
+# ============================================================
+# WORKERS
+# ============================================================
+_worker = {}
+
+
+def _init_worker(model_bytes, digest, template_path, generated):
+    """Unpickle the parent's model and load the template once per process."""
+    import warnings
+
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    from model_registry import ModelVersion
+
+    model = pickle.loads(model_bytes)
+    mv = ModelVersion(model, digest, None)
+    with open(template_path, encoding="utf-8") as f:
+        template = string.Template(f.read())
+    _worker.update(mv=mv, template=template, tables=tree_tables(model, mv.pos_index), generated=generated)
+
+
+def _write(path, text):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _work(ids, X, out_dir):
+    w = _worker
+    n_bytes = 0
+    for pid, text in render_chunk(ids, X, w["mv"].model, w["mv"].pos_index, w["mv"].short,
+                                  w["template"], w["tables"], w["generated"]):
+        data = text.encode("utf-8")
+        _write(os.path.join(out_dir, report_name(pid)), text)
+        n_bytes += len(data)
+    return len(ids), n_bytes
+
+
+# ============================================================
+# DRIVER
+# ============================================================
+def roster_chunks(csv_path=None, profiles_db=None, id_column=ID_COLUMN, chunk_rows=CHUNK_ROWS):
+    """``(ids, X, n_invalid)`` chunks from a roster CSV or the profile store."""
+    if profiles_db is not None:
+        from profiles import ProfileStore
+
+        for ids, X in ProfileStore(profiles_db).iter_chunks(chunk_rows):
+            ok = schema.validate(X) == 0
+            yield [p for p, good in zip(ids, ok) if good], X[ok], int((~ok).sum())
+        return
+    import pandas as pd
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, dtype={id_column: str}):
+        X = schema.to_matrix(chunk)
+        ok = (schema.validate(X) == 0) & chunk[id_column].notna().to_numpy()
+        yield chunk[id_column].to_numpy()[ok].tolist(), X[ok], int((~ok).sum())
+
+
+def _check_run(out_dir, mv, restart):
+    """Record the model in ``run.json``; refuse to mix models in one directory."""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, RUN_FILE)
+    if os.path.exists(path) and not restart:
+        with open(path) as f:
+            run = json.load(f)
+        if run["model"] != mv.digest:
+            raise SystemExit(f"{out_dir} holds reports from model {run['model'][:12]}, "
+                             f"active model is {mv.short}; pass --restart to regenerate")
+        return run
+    if restart:
+        for name in os.listdir(out_dir):
+            if name.endswith(".html"):
+                os.remove(os.path.join(out_dir, name))
+    run = {"model": mv.digest, "started": time.strftime("%Y-%m-%d %H:%M:%S")}
+    _write(path, json.dumps(run, indent=2))
+    return run
+
+
+def generate(chunks, out_dir, mv, workers=None, restart=False):
+    """Render every chunk not already on disk; return a stats dict."""
+    run = _check_run(out_dir, mv, restart)
+    done = {n for n in os.listdir(out_dir) if n.endswith(".html")}
+    workers = workers or os.cpu_count() or 1
+    stats = dict.fromkeys(("written", "skipped", "invalid", "bytes"), 0)
+    t0 = time.perf_counter()
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(pickle.dumps(mv.model), mv.digest, TEMPLATE, run["started"])) as pool:
+        pending = set()
+        for ids, X, n_invalid in chunks:
+            stats["invalid"] += n_invalid
+            todo = [k for k, pid in enumerate(ids) if report_name(pid) not in done]
+            stats["skipped"] += len(ids) - len(todo)
+            if not todo:
+                continue
+            pending.add(pool.submit(_work, [ids[k] for k in todo], X[todo], out_dir))
+            if len(pending) >= 2 * workers:           # bound what sits in memory
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(finished, stats)
+        _collect(wait(pending)[0], stats)
+
+    stats["wall_s"] = time.perf_counter() - t0
+    stats["per_s"] = stats["written"] / stats["wall_s"] if stats["wall_s"] else 0.0
+    stats["workers"] = workers
+    return stats
+
+
+def _collect(futures, stats):
+    for fut in futures:
+        n, n_bytes = fut.result()
+        stats["written"] += n
+        stats["bytes"] += n_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render an HTML risk report per patient.")
+    parser.add_argument("roster", nargs="?", help="CSV with a patient ID column and the 14 inputs")
+    parser.add_argument("out_dir")
+    parser.add_argument("--profiles", metavar="DB", help="report on every saved profile instead")
+    parser.add_argument("--id-column", default=ID_COLUMN)
+    parser.add_argument("--workers", type=int, help="processes (default: all CPUs)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="patients per task")
+    parser.add_argument("--restart", action="store_true", help="delete existing reports first")
+    args = parser.parse_args(argv)
+    if (args.roster is None) == (args.profiles is None):
+        parser.error("give either a roster CSV or --profiles")
+
+    from model_registry import ModelRegistry
+
+    mv = ModelRegistry(poll_seconds=0).start().active()
+    if not hasattr(mv.model, "tree_"):
+        parser.error(f"model {mv.short} is not a single decision tree")
+    chunks = roster_chunks(args.roster, args.profiles, args.id_column, args.chunk)
+    s = generate(chunks, args.out_dir, mv, args.workers, args.restart)
+    print(f"{s['written']:,} reports written, {s['skipped']:,} already done, {s['invalid']:,} invalid rows "
+          f"skipped, model {mv.short}")
+    print(f"{s['wall_s']:.1f}s on {s['workers']} workers: {s['per_s']:,.0f} reports/s, "
+          f"{s['bytes'] / max(s['written'], 1) / 1024:.1f} kB each")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
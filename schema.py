@@ -0,0 +1,191 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Input Schema
+# Single source of truth for the 14 model features
+# ============================================================
+"""Feature declarations shared by the UI, charts, batch scoring and loaders.
+
+``FEATURES`` is in model column order.  Each entry carries the model name,
+the training-CSV column, the widget label, the value kind, the valid bounds
+(also the ``st.number_input`` limits), the UI default/step, the encoding of
+categorical choices and the range used for normalised displays such as the
+radar chart.
+
+``validate`` checks any number of rows without a Python-level loop: it works
+through the matrix in cache-sized chunks with preallocated boolean buffers
+and packs the per-feature failures of each row into a ``uint16`` bitmask
+(bit ``i`` set means feature ``i`` is invalid; 0 means the row is clean).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    column: str
+    label: str
+    kind: str              # "int", "float" or "binary"
+    lo: float
+    hi: float
+    default: float
+    step: float = 1
+    choices: tuple = ()    # (ui_label, code) pairs for binary features, UI order
+    display: tuple = None  # (lo, hi) for normalised views; defaults to bounds
+    section: int = 0       # input column in the PREDICTION ENGINE tab
+
+    @property
+    def categorical(self):
+        return self.kind == "binary"
+
+    @property
+    def display_range(self):
+        return self.display or (self.lo, self.hi)
+
+    def encode(self, choice):
+        return dict(self.choices)[choice]
+
+    def decode(self, code):
+        return {c: label for label, c in self.choices}[int(code)]
+
+
+YES_NO = (("No", 0), ("Yes", 1))
+
+FEATURES = (
+    Feature("age",            "age",               "Age",                      "int",    1,    120,   30,               section=0),
+    Feature("gender",         "gender",            "Gender",                   "binary", 0,    1,     1, choices=(("Male", 1), ("Female", 0)), section=0),
+    Feature("bmi",            "bmi",               "BMI",                      "float",  10.0, 50.0,  25.0,  step=0.1,  section=0),
+    Feature("daily_steps",    "daily_steps",       "Daily Steps",              "int",    0,    30000, 8000,  step=100,  section=0),
+    Feature("sleep_hours",    "sleep_hours",       "Sleep Hours",              "float",  0.0,  12.0,  7.0,   step=0.5,  section=0),
+    Feature("water_intake",   "water_intake_l",    "Water Intake (L)",         "float",  0.0,  10.0,  2.0,   step=0.1,  section=1),
+    Feature("calories",       "calories_consumed", "Calories Consumed",        "int",    1000, 6000,  2200,  step=50,   section=1),
+    Feature("smoker",         "smoker",            "Smoker",                   "binary", 0,    1,     0, choices=YES_NO, section=1),
+    Feature("alcohol",        "alcohol",           "Alcohol",                  "binary", 0,    1,     0, choices=YES_NO, section=1),
+    Feature("resting_hr",     "resting_hr",        "Resting Heart Rate (bpm)", "int",    40,   150,   75,               section=1),
+    Feature("systolic_bp",    "systolic_bp",       "Systolic BP",              "int",    80,   200,   120,              section=2),
+    Feature("diastolic_bp",   "diastolic_bp",      "Diastolic BP",             "int",    50,   130,   80,               section=2),
+    Feature("cholesterol",    "cholesterol",       "Cholesterol (mg/dL)",      "int",    100,  400,   200,              section=2),
+    Feature("family_history", "family_history",    "Family History",           "binary", 0,    1,     0, choices=YES_NO, section=2),
+)
+
+FEATURE_NAMES   = [f.name for f in FEATURES]
+DATASET_COLUMNS = [f.column for f in FEATURES]
+TARGET          = "disease_risk"
+BY_NAME         = {f.name: f for f in FEATURES}
+N_FEATURES      = len(FEATURES)
+
+LOWER    = np.array([f.lo for f in FEATURES], dtype=np.float64)
+UPPER    = np.array([f.hi for f in FEATURES], dtype=np.float64)
+DEFAULTS = np.array([f.default for f in FEATURES], dtype=np.float64)
+INTEGRAL = np.array([f.kind != "float" for f in FEATURES])
+DISPLAY  = np.array([f.display_range for f in FEATURES], dtype=np.float64)
+
+# Axes of the patient radar (app tab 2 and bulk reports)
+RADAR_FEATURES = ("age", "bmi", "daily_steps", "sleep_hours", "water_intake",
+                  "resting_hr", "systolic_bp", "cholesterol")
+
+CHUNK_ROWS = 1 << 13
+
+
+# ============================================================
+# DISPLAY HELPERS
+# ============================================================
+def normalise(X, names=None):
+    """Scale features to 0-100 of their display range, clipped."""
+    idx = [FEATURE_NAMES.index(n) for n in names] if names else slice(None)
+    lo, hi = DISPLAY[idx, 0], DISPLAY[idx, 1]
+    X = np.asarray(X, dtype=np.float64)[..., idx]
+    return np.clip((X - lo) / (hi - lo) * 100, 0.0, 100.0)
+
+
+def pdp_grid(name, base_value, n=40):
+    """Values to sweep for a partial dependence plot around ``base_value``."""
+    f = BY_NAME[name]
+    if f.categorical:
+        return np.array(sorted(code for _, code in f.choices), dtype=np.float64)
+    lo, hi = (base_value * 0.5, base_value * 1.5) if base_value != 0 else (f.lo, f.hi)
+    lo, hi = max(min(lo, hi), f.lo), min(max(lo, hi), f.hi)
+    return np.linspace(lo, hi, n)
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+def as_float(X):
+    """``X`` as a float array (float32 kept); entries that are not numbers become NaN."""
+    X = np.asarray(X)
+    if X.dtype.kind == "f":
+        return X
+    try:
+        return X.astype(np.float64)
+    except (TypeError, ValueError):
+        import pandas as pd
+
+        flat = pd.to_numeric(pd.Series(X.ravel()), errors="coerce")
+        return flat.to_numpy(dtype=np.float64, na_value=np.nan).reshape(X.shape)
+
+
+def validate(X, chunk_rows=CHUNK_ROWS):
+    """Return a ``uint16`` error bitmask per row of the ``(n, 14)`` matrix ``X``.
+
+    A feature is invalid when it is NaN (including anything that is not a
+    number), outside its bounds, or non-integral for integer and binary
+    features.
+    """
+    X = as_float(X)
+    if X.ndim == 1:
+        X = X[None, :]
+    if X.ndim != 2 or X.shape[1] != N_FEATURES:
+        raise ValueError(f"expected an (n, {N_FEATURES}) matrix, got shape {X.shape}")
+
+    n = len(X)
+    codes = np.empty(n, dtype=np.uint16)
+    lower, upper = LOWER.astype(X.dtype, copy=False), UPPER.astype(X.dtype, copy=False)
+    bad  = np.empty((min(chunk_rows, n), N_FEATURES), dtype=bool)
+    tmp  = np.empty_like(bad)
+    fbuf = np.empty(bad.shape, dtype=X.dtype)
+
+    for start in range(0, n, chunk_rows):
+        xs = X[start:start + chunk_rows]
+        m  = len(xs)
+        b, t, f = bad[:m], tmp[:m], fbuf[:m]
+        np.less(xs, lower, out=b)
+        np.greater(xs, upper, out=t)
+        b |= t
+        np.isnan(xs, out=t)
+        b |= t
+        np.floor(xs, out=f)
+        np.not_equal(xs, f, out=t)
+        t &= INTEGRAL
+        b |= t
+        packed = np.packbits(b, axis=1, bitorder="little")
+        codes[start:start + m] = packed.view("<u2").ravel()
+    return codes
+
+
+def describe_errors(code):
+    """Names of the features flagged in a single row's error code."""
+    return [f.name for i, f in enumerate(FEATURES) if int(code) >> i & 1]
+
+
+def error_counts(codes):
+    """Number of invalid rows per feature, as ``{name: count}``."""
+    codes = np.asarray(codes, dtype=np.uint16)
+    return {f.name: int(np.count_nonzero(codes & (1 << i))) for i, f in enumerate(FEATURES)}
+
+
+def to_matrix(df):
+    """Model-ordered float matrix from a frame keyed by feature names or CSV columns."""
+    import pandas as pd
+
+    cols = []
+    for f in FEATURES:
+        col = f.name if f.name in df else f.column
+        s = df[col]
+        if f.categorical and not pd.api.types.is_numeric_dtype(s):
+            s = s.map(dict(f.choices))
+        elif not pd.api.types.is_numeric_dtype(s):
+            s = pd.to_numeric(s, errors="coerce")      # stray text in an upload: invalid, not a crash
+        cols.append(s.to_numpy(dtype=np.float64, na_value=np.nan))
+    return np.column_stack(cols)
@@ -0,0 +1,277 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Shared Reference Data
+# Publish once, attach read-only from every server process
+# ============================================================
+"""Reference arrays shared between Streamlit processes via memory-mapped files.
+
+A single loader process (``python shared_data.py publish ...``) reads the
+training CSV, scores it with the active model and builds a nearest-neighbour
+table.  Everything is written as plain ``.npy`` files into a versioned
+directory under ``$HRIP_SHARED_DIR`` (``/dev/shm/hrip`` by default, i.e.
+RAM-backed), and a ``CURRENT`` pointer is swapped in with ``os.replace``.
+
+App processes call ``SharedReference().current()``, which maps the arrays with
+``np.load(mmap_mode="r")``: the page cache holds one copy per host and every
+worker sees it without copying.  A reload publishes a new directory and flips
+the pointer; readers pick it up on their next call while arrays they already
+hold stay valid (unlinked files remain mapped until released).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+import schema
+
+DEFAULT_ROOT = "/dev/shm/hrip" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "hrip")
+SHARED_ROOT  = os.environ.get("HRIP_SHARED_DIR", DEFAULT_ROOT)
+POINTER      = "CURRENT"
+KEEP_VERSIONS = 2
+N_NEIGHBOURS  = 10
+
+
+# ============================================================
+# READ SIDE
+# ============================================================
+class ReferenceData:
+    """One published version; all arrays are read-only memory maps."""
+
+    ARRAYS = ("X", "y", "scores", "sorted_scores", "Z", "Z_norm", "neighbours")
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.version      = self.meta["version"]
+        self.model_digest = self.meta["model_digest"]
+        self.center       = np.asarray(self.meta["center"])
+        self.scale        = np.asarray(self.meta["scale"])
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.X)
+
+    def risk_percentile(self, risk):
+        """Share of the reference population scored strictly below ``risk`` (0-1)."""
+        n = len(self.sorted_scores)
+        return float(np.searchsorted(self.sorted_scores, risk, side="left")) / max(n, 1)
+
+    def nearest(self, x, k=N_NEIGHBOURS):
+        """Row indices of the ``k`` reference patients closest to feature vector ``x``."""
+        q = ((np.asarray(x, dtype=np.float64).ravel() - self.center) / self.scale).astype(np.float32)
+        # |z - q|^2 = |z|^2 - 2 z.q + |q|^2 with the row norms published alongside Z:
+        # one pass over the map and no (rows, features) temporaries
+        d = self.Z_norm - 2 * (self.Z @ q) + float(q @ q)
+        k = min(k, len(d))
+        idx = np.argpartition(d, k - 1)[:k]
+        return idx[np.argsort(d[idx])]
+
+
+class SharedReference:
+    """Follows the ``CURRENT`` pointer; cheap enough to call on every rerun."""
+
+    def __init__(self, root=SHARED_ROOT):
+        self.root     = root
+        self._pointer = os.path.join(root, POINTER)
+        self._stamp   = None
+        self._data    = None
+
+    def current(self):
+        try:
+            st = os.stat(self._pointer)
+        except FileNotFoundError:
+            return self._data
+        stamp = (st.st_mtime_ns, st.st_ino)
+        if stamp != self._stamp:
+            with open(self._pointer) as f:
+                version = json.load(f)["version"]
+            if self._data is None or self._data.version != version:
+                self._data = ReferenceData(os.path.join(self.root, version))
+            self._stamp = stamp
+        return self._data
+
+
+# ============================================================
+# WRITE SIDE (loader process)
+# ============================================================
+def load_dataset(csv_path):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    X = schema.to_matrix(df).astype(np.float32)
+    y = df[schema.TARGET].to_numpy(dtype=np.int8) if schema.TARGET in df else np.full(len(df), -1, np.int8)
+    return X, y
+
+
+def build_arrays(X, y, model_version, k=N_NEIGHBOURS):
+    from sklearn.neighbors import NearestNeighbors
+
+    scores = model_version.model.predict_proba(X.astype(np.float64))[:, model_version.pos_index]
+    center = X.mean(axis=0, dtype=np.float64)
+    scale  = X.std(axis=0, dtype=np.float64)
+    scale[scale == 0] = 1.0
+    Z = ((X - center) / scale).astype(np.float32)
+    k = min(k + 1, len(Z))
+    _, nn = NearestNeighbors(n_neighbors=k).fit(Z).kneighbors(Z)
+    arrays = {
+        "X": X, "y": y, "scores": scores.astype(np.float32), "sorted_scores": np.sort(scores), "Z": Z,
+        "Z_norm": np.einsum("ij,ij->i", Z, Z),
+        "neighbours": nn[:, 1:].astype(np.int32),   # drop self-match
+    }
+    return arrays, center, scale
+
+
+def publish(csv_path, model_version, root=SHARED_ROOT, keep=KEEP_VERSIONS):
+    """Write a new version directory and atomically point ``CURRENT`` at it."""
+    os.makedirs(root, exist_ok=True)
+    h = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    version = f"{h.hexdigest()[:12]}-{model_version.short}"
+    final = os.path.join(root, version)
+
+    if not os.path.isdir(final):
+        X, y = load_dataset(csv_path)
+        arrays, center, scale = build_arrays(X, y, model_version)
+        tmp = os.path.join(root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arr))
+        meta = {
+            "version": version, "model_digest": model_version.digest,
+            "source": os.path.abspath(csv_path), "rows": int(len(X)),
+            "center": center.tolist(), "scale": scale.tolist(),
+            "published_at": time.time(),
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.rename(tmp, final)
+
+    ptr_tmp = os.path.join(root, f".{POINTER}.{uuid.uuid4().hex}")
+    with open(ptr_tmp, "w") as f:
+        json.dump({"version": version}, f)
+    os.replace(ptr_tmp, os.path.join(root, POINTER))
+    _prune(root, keep, version)
+    return version
+
+
+def _prune(root, keep, current):
+    dirs = [
+        os.path.join(root, d) for d in os.listdir(root)
+        if not d.startswith(".") and os.path.isdir(os.path.join(root, d))
+    ]
+    dirs.sort(key=os.path.getmtime, reverse=True)
+    stale = [d for d in dirs if os.path.basename(d) != current][max(keep - 1, 0):]
+    for d in stale:
+        # Readers that still map these files keep their pages until they let go
+        shutil.rmtree(d, ignore_errors=True)
+
+
+# ============================================================
+# RSS COMPARISON
+# ============================================================
+def _private_worker(root, conn):
+    """What each process does today: its own cache_resource copy of every array."""
+    ref = SharedReference(root).current()
+    arrays = {a: np.load(os.path.join(ref.path, f"{a}.npy")) for a in ReferenceData.ARRAYS}
+    checksum = sum(float(arr.sum(dtype=np.float64)) for arr in arrays.values())
+    conn.send(_memory(checksum))
+    conn.recv()
+
+
+def _shared_worker(root, conn):
+    ref = SharedReference(root).current()
+    checksum = sum(float(getattr(ref, a).sum(dtype=np.float64)) for a in ReferenceData.ARRAYS)
+    conn.send(_memory(checksum))
+    conn.recv()
+
+
+def _memory(checksum):
+    import psutil
+
+    info = psutil.Process().memory_full_info()
+    return {"rss": info.rss, "pss": getattr(info, "pss", info.rss), "uss": info.uss, "checksum": checksum}
+
+
+def measure_rss(root, workers):
+    import multiprocessing as mp
+
+    ctx = mp.get_context("spawn")
+    results = {}
+    for label, target in (("private", _private_worker), ("shared", _shared_worker)):
+        procs, conns = [], []
+        for _ in range(workers):
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=target, args=(root, child))
+            p.start()
+            procs.append(p)
+            conns.append(parent)
+        # Hold every worker alive until all have reported, so PSS reflects sharing
+        stats = [c.recv() for c in conns]
+        for c in conns:
+            c.send("done")
+        for p in procs:
+            p.join()
+        results[label] = stats
+    return results
+
+
+def _mb(n):
+    return f"{n / 2**20:8.1f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=SHARED_ROOT)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_pub = sub.add_parser("publish", help="publish reference arrays for the active model")
+    p_pub.add_argument("--csv", default="health_lifestyle_dataset.csv")
+    p_pub.add_argument("--watch", action="store_true", help="republish whenever the active model changes")
+
+    p_rss = sub.add_parser("rss", help="compare per-worker memory: private copies vs shared maps")
+    p_rss.add_argument("--csv", default="health_lifestyle_dataset.csv")
+    p_rss.add_argument("--workers", type=int, default=4)
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "publish":
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry().start()
+        published = None
+        while True:
+            mv = registry.active()
+            if published != mv.digest:
+                print(f"published {publish(args.csv, mv, args.root)} -> {args.root}")
+                published = mv.digest
+            if not args.watch:
+                return 0
+            time.sleep(registry.poll_seconds)
+
+    if args.cmd == "rss":
+        from model_registry import ModelRegistry
+
+        publish(args.csv, ModelRegistry(poll_seconds=0).start().active(), args.root)
+        results = measure_rss(args.root, args.workers)
+        print(f"{'mode':<8} {'worker':>6} {'RSS':>11} {'PSS':>11} {'USS':>11}")
+        for label, stats in results.items():
+            for i, s in enumerate(stats):
+                print(f"{label:<8} {i:>6} {_mb(s['rss'])} {_mb(s['pss'])} {_mb(s['uss'])}")
+            total_pss = sum(s["pss"] for s in stats)
+            print(f"{label:<8} {'total':>6} {'':>11} {_mb(total_pss)}")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
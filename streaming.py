@@ -0,0 +1,491 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Wearable Feed Scoring
+# asyncio ingestion, threshold-aware rescoring, risk-change events
+# ============================================================
+"""Keep remote-monitoring patients scored as their wearable data arrives.
+
+    python streaming.py tail feed.jsonl --events-out risk_events.jsonl
+    python streaming.py serve --port 8765 --events-out risk_events.jsonl
+    python streaming.py bench --patients 5000 --events 500000
+
+Updates are JSON lines holding a patient ID and any subset of the features,
+typically the wearable ones::
+
+    {"patient": "P00042", "daily_steps": 8123, "sleep_hours": 6.5, "resting_hr": 71}
+
+They are read from a tailed file or a TCP socket, validated field by field
+against ``schema`` and merged into the patient's latest profile.  Profiles
+live in one float matrix indexed by patient, next to each patient's risk,
+verdict and tree leaf.
+
+A decision tree only changes its answer when an input crosses a split on
+the patient's own path.  Each leaf's path defines a box of feature bounds,
+computed once per ``ModelVersion``; an update that stays inside the box is
+merged without scoring.  Updates are handled in micro-batches of whatever
+has queued up (at most ``BATCH_EVENTS``): parsed into flat arrays, checked
+and merged with vectorised NumPy, and every patient whose profile left its
+box is rescored in a single ``predict_proba`` call.  When a patient's risk changes a risk-change event
+is published to every subscriber queue and to the optional JSON-lines sink.
+Models that are not single trees are rescored on every update.
+
+``bench`` replays a synthetic feed for thousands of patients as fast as the
+pipeline will take it and reports sustained events per second, with and
+without the threshold check.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+import schema
+
+log = logging.getLogger(__name__)
+
+WEARABLE_FIELDS = ("daily_steps", "sleep_hours", "resting_hr")
+BATCH_EVENTS    = 2048
+QUEUE_MAX       = 256            # chunks of lines, not events
+READ_BYTES      = 1 << 16
+POLL_SECONDS    = 0.2
+INITIAL_ROWS    = 1024
+
+FEATURE_INDEX = {f.name: i for i, f in enumerate(schema.FEATURES)}
+FEATURE_INDEX.update({f.column: i for i, f in enumerate(schema.FEATURES)})
+
+
+# ============================================================
+# TREE BOXES
+# ============================================================
+def leaf_boxes(model):
+    """``(lo, hi)`` per node: inputs with ``lo < x <= hi`` on every feature reach that node.
+
+    ``None`` for models that are not a single fitted tree.
+    """
+    tree = getattr(model, "tree_", None)
+    if tree is None:
+        return None
+    n = tree.node_count
+    lo = np.full((n, schema.N_FEATURES), -np.inf)
+    hi = np.full((n, schema.N_FEATURES), np.inf)
+    # scikit-learn numbers children after their parent, so one forward pass suffices
+    for node in range(n):
+        left, right = tree.children_left[node], tree.children_right[node]
+        if left == -1:
+            continue
+        f, t = tree.feature[node], tree.threshold[node]
+        lo[left], hi[left] = lo[node], hi[node]
+        lo[right], hi[right] = lo[node], hi[node]
+        hi[left, f] = min(hi[node, f], t)
+        lo[right, f] = max(lo[node, f], t)
+    return lo, hi
+
+
+# ============================================================
+# PROFILES AND SCORING
+# ============================================================
+class FeedScorer:
+    """Latest profile, risk and leaf per patient; rescores only what left its leaf."""
+
+    def __init__(self, model_version, initial=None, threshold_check=True):
+        self.initial         = initial          # patient -> row or None; default schema.DEFAULTS
+        self.threshold_check = threshold_check
+        self.ids    = []
+        self._index = {}
+        self.X      = np.empty((INITIAL_ROWS, schema.N_FEATURES))
+        self.risk   = np.full(INITIAL_ROWS, np.nan, dtype=np.float32)
+        self.pred   = np.zeros(INITIAL_ROWS, dtype=np.int8)
+        self.leaf   = np.zeros(INITIAL_ROWS, dtype=np.int32)
+        self.stats  = dict.fromkeys(("updates", "rejected", "merged", "rescored", "events"), 0)
+        self.model_version = None
+        self.set_model(model_version)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def set_model(self, model_version):
+        """Switch model; every known patient is rescored against it."""
+        self.model_version = model_version
+        self.boxes = model_version.memo("leaf_boxes", lambda mv: leaf_boxes(mv.model))
+        return self._rescore(np.arange(len(self.ids)), "model")
+
+    def _grow(self, need):
+        size = len(self.X)
+        if need <= size:
+            return
+        size = max(need, 2 * size)
+        self.X    = np.resize(self.X, (size, schema.N_FEATURES))
+        self.risk = np.resize(self.risk, size)
+        self.pred = np.resize(self.pred, size)
+        self.leaf = np.resize(self.leaf, size)
+
+    def _row(self, patient):
+        i = self._index.get(patient)
+        if i is None:
+            i = self._index[patient] = len(self.ids)
+            self.ids.append(patient)
+            self._grow(i + 1)
+            start = self.initial(patient) if self.initial is not None else None
+            self.X[i] = schema.DEFAULTS if start is None else start
+            self.risk[i] = np.nan
+        return i
+
+    def seed(self, patients, X):
+        """Bulk-load starting profiles and score them once."""
+        X = np.asarray(X, dtype=np.float64)
+        rows = np.array([self._row(p) for p in patients], dtype=np.int64)
+        self.X[rows] = X
+        return self._rescore(rows, "seed")
+
+    def profile(self, patient):
+        i = self._index.get(patient)
+        return None if i is None else self.X[i].copy()
+
+    def apply(self, batch):
+        """Merge a parsed ``Batch`` in arrival order; return the risk-change events."""
+        if not len(batch.patients):
+            return []
+        cols, vals = batch.cols, batch.vals
+        bad = np.isnan(vals) | (vals < schema.LOWER[cols]) | (vals > schema.UPPER[cols]) \
+            | (schema.INTEGRAL[cols] & (vals != np.round(vals)))
+        ok_event = np.bincount(batch.event[bad], minlength=len(batch.patients)) == 0
+        self.stats["updates"]  += len(batch.patients)
+        self.stats["rejected"] += int((~ok_event).sum())
+
+        rows = np.full(len(batch.patients), -1, dtype=np.int64)
+        for k in np.flatnonzero(ok_event):
+            rows[k] = self._row(batch.patients[k])
+        keep = ok_event[batch.event]
+        r, cols, vals = rows[batch.event[keep]], cols[keep], vals[keep]
+        # Later updates of the same field win
+        _, last = np.unique((r * schema.N_FEATURES + cols)[::-1], return_index=True)
+        last = len(r) - 1 - last
+        self.X[r[last], cols[last]] = vals[last]
+
+        touched = np.unique(r)
+        dirty = touched
+        if self.threshold_check and self.boxes is not None:
+            lo, hi = self.boxes
+            leaf = self.leaf[touched]
+            x = self.X[touched].astype(np.float32)         # trees compare float32 inputs
+            inside = ((x > lo[leaf]) & (x <= hi[leaf])).all(axis=1) & ~np.isnan(self.risk[touched])
+            dirty = touched[~inside]
+        self.stats["merged"] += int(np.count_nonzero(~np.isin(rows[ok_event], dirty)))
+        return self._rescore(dirty, "update")
+
+    def _rescore(self, rows, reason):
+        if not len(rows):
+            return []
+        mv = self.model_version
+        X = self.X[rows]
+        proba = mv.model.predict_proba(X)
+        risk = proba[:, mv.pos_index].astype(np.float32)
+        pred = np.asarray(mv.model.classes_)[proba.argmax(axis=1)].astype(np.int8)
+        if self.boxes is not None:
+            self.leaf[rows] = mv.model.apply(X)
+        old = self.risk[rows]
+        changed = np.flatnonzero(~(old == risk))     # NaN (new patient) counts as changed
+        now = time.time()
+        events = [
+            {
+                "patient": self.ids[rows[k]], "ts": now, "reason": reason, "model": mv.short,
+                "risk": round(float(risk[k]), 6),
+                "previous": None if np.isnan(old[k]) else round(float(old[k]), 6),
+                "prediction": int(pred[k]), "previous_prediction": None if np.isnan(old[k]) else int(self.pred[rows[k]]),
+            }
+            for k in changed
+        ]
+        self.risk[rows] = risk
+        self.pred[rows] = pred
+        self.stats["rescored"] += len(rows)
+        self.stats["events"] += len(events)
+        return events
+
+
+class Batch:
+    """Parsed updates as flat arrays: ``event`` indexes ``patients`` for every ``(cols, vals)`` field."""
+
+    def __init__(self, patients, event, cols, vals):
+        self.patients = patients
+        self.event    = np.asarray(event, dtype=np.intp)
+        self.cols     = np.asarray(cols, dtype=np.intp)
+        self.vals     = np.asarray(vals, dtype=np.float64)
+
+
+def parse(lines):
+    """``(Batch, bad_lines)`` from raw JSON lines; lines without a patient or feature are bad."""
+    patients, event, cols, vals = [], [], [], []
+    bad = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            msg = json.loads(line)
+            patient = msg.pop("patient")
+            fields = [(FEATURE_INDEX[k], float(v)) for k, v in msg.items()
+                      if k in FEATURE_INDEX and v is not None]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            bad += 1
+            continue
+        if patient is None or not fields:
+            bad += 1
+            continue
+        k = len(patients)
+        patients.append(str(patient))
+        for j, v in fields:
+            event.append(k)
+            cols.append(j)
+            vals.append(v)
+    return Batch(patients, event, cols, vals), bad
+
+
+# ============================================================
+# ASYNC PIPELINE
+# ============================================================
+class FeedService:
+    """Sources put chunks of lines on a bounded queue; one consumer scores micro-batches."""
+
+    def __init__(self, scorer, registry=None, sink=None, batch_events=BATCH_EVENTS, queue_max=QUEUE_MAX):
+        self.scorer       = scorer
+        self.registry     = registry         # follow hot model swaps when given
+        self.sink         = sink             # file object for JSON-lines events
+        self.batch_events = batch_events
+        self.queue        = asyncio.Queue(maxsize=queue_max)
+        self.bad_lines    = 0
+        self._subscribers = []
+
+    def subscribe(self, maxsize=10_000):
+        """A queue that receives every risk-change event; full queues drop events."""
+        q = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.append(q)
+        return q
+
+    def publish(self, events):
+        if self.sink is not None and events:
+            self.sink.write("".join(json.dumps(e) + "\n" for e in events))
+            self.sink.flush()
+        for q in self._subscribers:
+            for e in events:
+                if q.full():
+                    break
+                q.put_nowait(e)
+
+    # ── Sources ──
+    async def _feed_stream(self, read):
+        """Split whatever ``read()`` returns into complete lines and queue them."""
+        tail = b""
+        while True:
+            data = await read()
+            if data is None:
+                break
+            if not data:
+                continue
+            lines = (tail + data).split(b"\n")
+            tail = lines.pop()
+            if lines:
+                await self.queue.put(lines)
+        if tail.strip():
+            await self.queue.put([tail])
+
+    async def feed_file(self, path, follow=True, poll=POLL_SECONDS):
+        """Tail ``path`` (from its start); with ``follow=False`` stop at end of file."""
+        with open(path, "rb") as f:
+            async def read():
+                data = f.read(READ_BYTES)
+                if data:
+                    return data
+                if not follow:
+                    return None
+                await asyncio.sleep(poll)
+                return b""
+            await self._feed_stream(read)
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        """Accept newline-delimited JSON updates over TCP."""
+        async def handle(reader, writer):
+            async def read():
+                data = await reader.read(READ_BYTES)
+                return data or None
+            try:
+                await self._feed_stream(read)
+            finally:
+                writer.close()
+        return await asyncio.start_server(handle, host, port)
+
+    # ── Consumer ──
+    def _take_batch(self, first):
+        chunks, n = [first], len(first)
+        while n < self.batch_events:
+            try:
+                chunk = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            chunks.append(chunk)
+            if chunk is None:
+                break
+            n += len(chunk)
+        return chunks
+
+    async def run(self):
+        """Consume until a ``None`` sentinel is queued (see ``stop``)."""
+        while True:
+            first = await self.queue.get()
+            if first is None:
+                return
+            chunks = self._take_batch(first)
+            stop = chunks[-1] is None
+            lines = [line for chunk in chunks if chunk is not None for line in chunk]
+            for start in range(0, len(lines), self.batch_events):
+                self.process(lines[start:start + self.batch_events])
+            if stop:
+                return
+
+    def process(self, lines):
+        batch, bad = parse(lines)
+        self.bad_lines += bad
+        events = []
+        if self.registry is not None:
+            active = self.registry.active()
+            if active.digest != self.scorer.model_version.digest:
+                log.info("feed switching to model %s", active.short)
+                events += self.scorer.set_model(active)
+        events += self.scorer.apply(batch)
+        self.publish(events)
+
+    async def stop(self):
+        await self.queue.put(None)
+
+
+# ============================================================
+# REPLAY BENCHMARK
+# ============================================================
+def synthetic_feed(path, n_patients, n_events, seed=0):
+    """Random-walk wearable updates for ``n_patients``; returns ``(ids, start_profiles)``."""
+    rng = np.random.default_rng(seed)
+    ids = [f"P{i:06d}" for i in range(n_patients)]
+    X = rng.uniform(schema.LOWER, schema.UPPER, (n_patients, schema.N_FEATURES))
+    X[:, schema.INTEGRAL] = np.round(X[:, schema.INTEGRAL])
+    cols = [FEATURE_INDEX[name] for name in WEARABLE_FIELDS]
+    step = np.array([400.0, 0.2, 1.0])            # per-update drift of steps, sleep, heart rate
+    cur = X[:, cols].copy()
+    who = rng.integers(0, n_patients, n_events)
+    moves = rng.normal(0, 1, (n_events, len(cols))) * step
+    with open(path, "w") as f:
+        for k in range(n_events):
+            p = who[k]
+            v = np.clip(cur[p] + moves[k], schema.LOWER[cols], schema.UPPER[cols])
+            v[0], v[2] = round(v[0]), round(v[2])
+            v[1] = round(v[1], 1)
+            cur[p] = v
+            f.write(f'{{"patient": "{ids[p]}", "daily_steps": {int(v[0])}, '
+                    f'"sleep_hours": {v[1]:.1f}, "resting_hr": {int(v[2])}}}\n')
+    return ids, X
+
+
+async def replay(path, model_version, ids, X, threshold_check=True, batch_events=BATCH_EVENTS):
+    """Feed ``path`` through a fresh pipeline; return ``(stats, final risk per patient)``."""
+    scorer = FeedScorer(model_version, threshold_check=threshold_check)
+    scorer.seed(ids, X)
+    service = FeedService(scorer, batch_events=batch_events)
+    changes = service.subscribe(maxsize=0)          # unbounded: count every event
+    t0 = time.perf_counter()
+    consumer = asyncio.create_task(service.run())
+    await service.feed_file(path, follow=False)
+    await service.stop()
+    await consumer
+    wall = time.perf_counter() - t0
+    stats = dict(scorer.stats, bad_lines=service.bad_lines, wall_s=wall,
+                 events_per_s=scorer.stats["updates"] / wall, published=changes.qsize())
+    return stats, scorer.risk[:len(scorer)].copy()
+
+
+def bench(n_patients, n_events, seed, batch_events=BATCH_EVENTS):
+    from model_registry import ModelRegistry
+
+    mv = ModelRegistry(poll_seconds=0).start().active()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "feed.jsonl")
+        ids, X = synthetic_feed(path, n_patients, n_events, seed)
+        mb = os.path.getsize(path) / 2**20
+        print(f"feed: {n_events:,} updates for {n_patients:,} patients ({mb:.1f} MiB), model {mv.short}")
+        print(f"micro-batches of up to {batch_events:,} updates")
+        results, final = {}, {}
+        for label, check in (("threshold-aware", True), ("rescore-always", False)):
+            r, final[label] = asyncio.run(replay(path, mv, ids, X, check, batch_events))
+            results[label] = r
+            print(f"  {label:<16} {r['events_per_s']:>10,.0f} updates/s  {r['wall_s']:6.2f}s  "
+                  f"rescored {r['rescored'] - n_patients:>9,}  merged {r['merged']:>9,}  "
+                  f"risk changes {r['published']:>8,}")
+        speedup = results["threshold-aware"]["events_per_s"] / results["rescore-always"]["events_per_s"]
+        same = np.array_equal(final["threshold-aware"], final["rescore-always"])
+        print(f"  threshold check: {speedup:.2f}x, final risks identical: {'yes' if same else 'NO'}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score wearable updates as they arrive.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    t = sub.add_parser("tail", help="follow a JSON-lines file")
+    t.add_argument("path")
+    t.add_argument("--no-follow", action="store_true", help="stop at end of file")
+    s = sub.add_parser("serve", help="accept JSON lines over TCP")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8765)
+    for p in (t, s):
+        p.add_argument("--events-out", help="append risk-change events here (default stdout)")
+        p.add_argument("--profiles", metavar="DB", help="start new patients from their saved profile")
+    b = sub.add_parser("bench", help="replay a synthetic feed and report throughput")
+    b.add_argument("--patients", type=int, default=5000)
+    b.add_argument("--events", type=int, default=500_000)
+    b.add_argument("--batch", type=int, default=BATCH_EVENTS, help="max updates per micro-batch")
+    b.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    if args.cmd == "bench":
+        bench(args.patients, args.events, args.seed, args.batch)
+        return 0
+
+    from model_registry import ModelRegistry
+
+    registry = ModelRegistry().start()
+    sink = open(args.events_out, "a") if args.events_out else sys.stdout
+
+    async def run():
+        initial = None
+        if args.profiles:
+            from profiles import ProfileStore
+
+            initial = ProfileStore(args.profiles).get
+        service = FeedService(FeedScorer(registry.active(), initial=initial), registry=registry, sink=sink)
+        consumer = asyncio.create_task(service.run())
+        if args.cmd == "tail":
+            await service.feed_file(args.path, follow=not args.no_follow)
+            await service.stop()
+        else:
+            server = await service.serve(args.host, args.port)
+            log.info("listening on %s:%d", args.host, args.port)
+            async with server:
+                await consumer
+        await consumer
+        log.info("%s", service.scorer.stats)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
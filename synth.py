@@ -0,0 +1,330 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Synthetic Data
+# Gaussian-copula generator for production-scale test sets
+# ============================================================
+"""Stream any number of rows shaped like ``health_lifestyle_dataset.csv``.
+
+    python synth.py synth.csv --rows 10000000                # notebook statistics, seed 0
+    python synth.py synth.parquet --rows 10000000 --fit health_lifestyle_dataset.csv
+    python synth.py synth.csv --rows 1000000 --seed 7 --workers 4
+
+The generator is a Gaussian copula over the 14 inputs plus ``disease_risk``:
+each column keeps its empirical marginal (the distinct values and their
+frequencies, after rounding to at most ``MAX_DECIMALS`` places) and the
+columns are tied together by the correlation of their normal scores, the
+same pairs the notebook's heatmap looks at.  ``--fit`` takes the statistics
+from a CSV; without one (the dataset is not shipped) they come from the
+notebook's ``df.describe()``: uniform inputs on the observed ranges, the
+observed rates of the binary columns and no correlation, which is what
+those quartiles and the tree's base-rate accuracy point to.
+
+Output has the dataset's layout (``id`` first, ``gender`` as Male/Female,
+``disease_risk`` last).  Rows are made in chunks of ``--chunk`` rows on a
+process pool; chunk ``i`` draws from ``SeedSequence(seed).spawn(...)[i]``,
+so the same ``--seed`` and ``--chunk`` give the same file whatever the
+worker count.  CSV text is gathered from per-column tables of the already
+formatted values instead of formatting each number.  Parquet (one row
+group per chunk) needs ``pyarrow``.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import schema
+
+DATASET_CSV  = "health_lifestyle_dataset.csv"
+CHUNK_ROWS   = 1 << 18
+MAX_DECIMALS = 2
+SEED         = 0
+CHECK_ROWS   = 200_000
+
+COLUMNS  = ["id", *schema.DATASET_COLUMNS, schema.TARGET]
+DECIMALS = {"bmi": 1, "sleep_hours": 1, "water_intake": 1}
+
+# From the notebook's df.describe() (100,000 rows): inclusive ranges of the
+# inputs and the rates of the binary columns ("gender" is the share of Male)
+NOTEBOOK_RANGES = {
+    "age": (18, 79), "bmi": (18.0, 40.0), "daily_steps": (1000, 19999),
+    "sleep_hours": (3.0, 10.0), "water_intake": (0.5, 5.0), "calories": (1200, 3999),
+    "resting_hr": (50, 99), "systolic_bp": (90, 179), "diastolic_bp": (60, 119),
+    "cholesterol": (150, 299),
+}
+NOTEBOOK_RATES = {
+    "gender": 0.50132, "smoker": 0.20094, "alcohol": 0.30002, "family_history": 0.29915,
+    schema.TARGET: 0.24821,
+}
+
+
+# ============================================================
+# MODEL
+# ============================================================
+class Copula:
+    """Per-column value tables plus the normal-score correlation of all 15 columns."""
+
+    def __init__(self, levels, cdf, decimals, corr, target_corr, source):
+        self.levels      = levels         # per column: sorted distinct values
+        self.cdf         = cdf            # per column: cumulative probabilities, last == 1
+        self.decimals    = decimals
+        self.corr        = corr
+        self.target_corr = target_corr    # Pearson correlation of the fitted data
+        self.source      = source
+        self.chol        = np.linalg.cholesky(corr)
+        self._tables     = None
+
+    @classmethod
+    def fit(cls, X, y, source):
+        """Fit to model-ordered inputs ``X`` and labels ``y``."""
+        from scipy.special import ndtri
+        from scipy.stats import rankdata
+
+        data = np.column_stack([X, y]).astype(np.float64)
+        levels, cdf, decimals = [], [], []
+        scores = np.empty_like(data)
+        for j in range(data.shape[1]):
+            d = _decimals(data[:, j])
+            values, counts = np.unique(np.round(data[:, j], d), return_counts=True)
+            levels.append(values)
+            cdf.append(_cumulative(counts))
+            decimals.append(d)
+            scores[:, j] = ndtri(rankdata(data[:, j]) / (len(data) + 1))
+        return cls(levels, cdf, decimals, _nearest_correlation(np.corrcoef(scores, rowvar=False)),
+                   np.corrcoef(data, rowvar=False), source)
+
+    @classmethod
+    def from_csv(cls, path):
+        from shared_data import load_dataset
+
+        X, y = load_dataset(path)
+        ok = (schema.validate(X) == 0) & (y >= 0)
+        return cls.fit(X[ok], y[ok], os.path.basename(path))
+
+    @classmethod
+    def notebook(cls):
+        """Independent columns with the notebook's ranges and rates."""
+        levels, cdf, decimals = [], [], []
+        for name in [*schema.FEATURE_NAMES, schema.TARGET]:
+            if name in NOTEBOOK_RATES:
+                levels.append(np.array([0.0, 1.0]))
+                cdf.append(np.array([1 - NOTEBOOK_RATES[name], 1.0]))
+                decimals.append(0)
+                continue
+            lo, hi = NOTEBOOK_RANGES[name]
+            d = DECIMALS.get(name, 0)
+            n = int(round((hi - lo) * 10 ** d)) + 1
+            levels.append(np.round(np.linspace(lo, hi, n), d))
+            cdf.append(_cumulative(np.ones(n)))
+            decimals.append(d)
+        eye = np.eye(len(levels))
+        return cls(levels, cdf, decimals, eye, eye, "notebook describe()")
+
+    # ── Sampling ──
+    def sample_codes(self, n, seed_seq):
+        """``(n, 15)`` indices into ``levels`` for ``n`` correlated rows."""
+        from scipy.special import ndtr
+
+        rng = np.random.default_rng(seed_seq)
+        u = ndtr(rng.standard_normal((n, len(self.levels))) @ self.chol.T)
+        codes = np.empty(u.shape, dtype=np.int32)
+        for j, cdf in enumerate(self.cdf):
+            codes[:, j] = np.minimum(np.searchsorted(cdf, u[:, j], side="right"), len(cdf) - 1)
+        return codes
+
+    def values(self, codes):
+        """Model-ordered ``X`` (float32) and ``y`` (int8), the shapes ``load_dataset`` returns."""
+        data = np.column_stack([self.levels[j][codes[:, j]] for j in range(codes.shape[1])])
+        return data[:, :-1].astype(np.float32), data[:, -1].astype(np.int8)
+
+    def sample(self, n, seed=SEED):
+        return self.values(self.sample_codes(n, np.random.SeedSequence(seed)))
+
+    # ── Output ──
+    def _format_tables(self):
+        if self._tables is None:
+            tables = []
+            for j, values in enumerate(self.levels):
+                if j < schema.N_FEATURES and schema.FEATURE_NAMES[j] == "gender":
+                    text = [schema.FEATURES[j].decode(v) for v in values]
+                else:
+                    text = [f"{v:.{self.decimals[j]}f}" for v in values]
+                table = np.array([f",{t}".encode() for t in text])       # NUL-padded "S" array
+                tables.append(table.view(np.uint8).reshape(len(table), table.itemsize))
+            self._tables = tables
+        return self._tables
+
+    def csv_chunk(self, codes, first_id):
+        """CSV lines (bytes, no header) for ``codes``, numbering rows from ``first_id``.
+
+        Each row is laid out in fixed-width, NUL-padded fields gathered from
+        the tables; dropping the NULs leaves the CSV text.
+        """
+        ids = np.arange(first_id, first_id + len(codes)).astype(bytes)
+        fields = [ids.view(np.uint8).reshape(len(ids), ids.itemsize)]
+        fields += [table[codes[:, j]] for j, table in enumerate(self._format_tables())]
+        fields.append(np.full((len(codes), 1), ord("\n"), dtype=np.uint8))
+        text = np.concatenate(fields, axis=1).ravel()
+        return text[text != 0].tobytes()
+
+    def frame_chunk(self, codes, first_id):
+        """The same rows as a DataFrame (Parquet path)."""
+        import pandas as pd
+
+        X, y = self.values(codes)
+        frame = {"id": np.arange(first_id, first_id + len(codes))}
+        for j, (feature, column) in enumerate(zip(schema.FEATURES, schema.DATASET_COLUMNS)):
+            col = X[:, j].astype(np.float64)
+            if feature.name == "gender":
+                col = np.where(col == 1, "Male", "Female")
+            elif self.decimals[j] == 0:
+                col = col.astype(np.int64)
+            else:
+                col = np.round(col, self.decimals[j])
+            frame[column] = col
+        frame[schema.TARGET] = y.astype(np.int64)
+        return pd.DataFrame(frame)
+
+
+def _decimals(col):
+    for d in range(MAX_DECIMALS + 1):
+        if np.allclose(col, np.round(col, d), rtol=0, atol=1e-9):
+            return d
+    return MAX_DECIMALS
+
+
+def _cumulative(counts):
+    cdf = np.cumsum(counts, dtype=np.float64)
+    cdf /= cdf[-1]
+    cdf[-1] = 1.0
+    return cdf
+
+
+def _nearest_correlation(corr, floor=1e-6):
+    """Clip negative eigenvalues so the matrix has a Cholesky factor."""
+    w, v = np.linalg.eigh((corr + corr.T) / 2)
+    fixed = (v * np.maximum(w, floor)) @ v.T
+    d = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(d, d)
+
+
+def load(csv_path=None):
+    """Copula fitted to ``csv_path``, else to the dataset if present, else the notebook's statistics."""
+    path = csv_path or (DATASET_CSV if os.path.exists(DATASET_CSV) else None)
+    return Copula.from_csv(path) if path else Copula.notebook()
+
+
+def check(copula, seed=SEED, n=CHECK_ROWS):
+    """Largest gaps between a sample and the fitted statistics: ``(mean in std units, correlation)``."""
+    X, y = copula.sample(n, seed)
+    data = np.column_stack([X, y]).astype(np.float64)
+    mean = np.array([lv @ np.diff(cdf, prepend=0) for lv, cdf in zip(copula.levels, copula.cdf)])
+    var = np.array([(lv - m) ** 2 @ np.diff(cdf, prepend=0)
+                    for lv, cdf, m in zip(copula.levels, copula.cdf, mean)])
+    mean_gap = np.abs(data.mean(axis=0) - mean) / np.sqrt(np.maximum(var, 1e-12))
+    corr_gap = np.abs(np.corrcoef(data, rowvar=False) - copula.target_corr)
+    return float(mean_gap.max()), float(np.nanmax(corr_gap))
+
+
+# ============================================================
+# STREAMING OUTPUT
+# ============================================================
+_worker = {}
+
+
+def _init_worker(copula, fmt):
+    _worker.update(copula=copula, fmt=fmt)
+
+
+def _make_chunk(start, n, seed_seq):
+    copula = _worker["copula"]
+    codes = copula.sample_codes(n, seed_seq)
+    if _worker["fmt"] == "csv":
+        return copula.csv_chunk(codes, start + 1)
+    return copula.frame_chunk(codes, start + 1)
+
+
+def _chunks(n_rows, chunk_rows, seed):
+    starts = range(0, n_rows, chunk_rows)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    for start, seed_seq in zip(starts, seeds):
+        yield start, min(chunk_rows, n_rows - start), seed_seq
+
+
+def write(copula, out_path, n_rows, seed=SEED, workers=None, chunk_rows=CHUNK_ROWS):
+    """Stream ``n_rows`` rows to ``out_path`` (``.csv`` or ``.parquet``); return a stats dict."""
+    fmt = "parquet" if out_path.endswith(".parquet") else "csv"
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    workers = workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+
+    writer = None
+    with open(tmp, "wb") as f:
+        def emit(chunk):
+            nonlocal writer
+            if fmt == "csv":
+                f.write(chunk)
+                return
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(f, table.schema)
+            writer.write_table(table)
+
+        if fmt == "csv":
+            f.write(",".join(COLUMNS).encode() + b"\n")
+        if workers <= 1:
+            _init_worker(copula, fmt)
+            for start, n, seed_seq in _chunks(n_rows, chunk_rows, seed):
+                emit(_make_chunk(start, n, seed_seq))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(copula, fmt)) as pool:
+                pending = deque()
+                for args in _chunks(n_rows, chunk_rows, seed):
+                    pending.append(pool.submit(_make_chunk, *args))
+                    if len(pending) >= 2 * workers:     # bound memory, keep file order
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, out_path)
+
+    wall = time.perf_counter() - t0
+    return {"rows": n_rows, "format": fmt, "workers": workers, "wall_s": wall,
+            "per_s": n_rows / wall if wall else 0.0, "bytes": os.path.getsize(out_path)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic rows shaped like the training dataset.")
+    parser.add_argument("out", help="output path ending in .csv or .parquet")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--fit", metavar="CSV", help=f"fit to this CSV (default: {DATASET_CSV} if present, "
+                                                     "else the notebook's describe())")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, help="processes (default: all CPUs)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows per task")
+    args = parser.parse_args(argv)
+    if args.out.endswith(".parquet"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("Parquet output needs pyarrow")
+
+    copula = load(args.fit)
+    mean_gap, corr_gap = check(copula, args.seed)
+    print(f"fitted to {copula.source}: sample check max |mean gap| {mean_gap:.3f} std, "
+          f"max |corr gap| {corr_gap:.3f}")
+    s = write(copula, args.out, args.rows, args.seed, args.workers, args.chunk)
+    print(f"{s['rows']:,} rows to {args.out} ({s['format']}, {s['bytes'] / 2**20:,.1f} MB) in {s['wall_s']:.1f}s "
+          f"on {s['workers']} workers: {s['per_s']:,.0f} rows/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
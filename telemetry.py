@@ -0,0 +1,193 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Rerun Telemetry
+# Named timing / memory spans, JSON lines and Prometheus text
+# ============================================================
+"""Per-rerun instrumentation for ``app.py``.
+
+Turn it on with ``HRIP_TELEMETRY=1``.  Each script run gets a ``Rerun``;
+sections are wrapped in ``with perf.span("name"):`` and nest, so a span's
+recorded name is its full path (``tab1/gauge.build``).  Every span records
+wall time and the change in process RSS.
+
+When a rerun finishes it is
+
+* kept as ``last`` for the admin sidebar panel (``?admin=1``),
+* appended as one JSON line to ``$HRIP_TELEMETRY_LOG`` if set,
+* folded into per-span histograms served in Prometheus text format on
+  ``$HRIP_METRICS_PORT`` (``/metrics``) if set, on ``$HRIP_METRICS_HOST``
+  (loopback only by default).
+
+Disabled, ``start_rerun`` returns a shared no-op whose ``span`` hands back
+one preallocated ``nullcontext``: a method call per section, nothing else.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import psutil
+except ImportError:  # memory deltas are reported as 0 without psutil
+    psutil = None
+
+ENABLED      = os.environ.get("HRIP_TELEMETRY", "") not in ("", "0")
+LOG_PATH     = os.environ.get("HRIP_TELEMETRY_LOG")
+METRICS_PORT = int(os.environ.get("HRIP_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("HRIP_METRICS_HOST", "127.0.0.1")
+
+MAX_SESSIONS = 256       # sessions whose last rerun is kept for the panel
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_SPAN = contextlib.nullcontext()
+_PROCESS   = psutil.Process() if psutil else None
+
+
+def _rss():
+    return _PROCESS.memory_info().rss if _PROCESS else 0
+
+
+class _NullRerun:
+    enabled = False
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def finish(self):
+        return None
+
+
+NULL_RERUN = _NullRerun()
+
+
+class Rerun:
+    """Spans collected during one script run."""
+
+    enabled = True
+
+    def __init__(self, recorder, session_id):
+        self.recorder   = recorder
+        self.session_id = session_id
+        self.started    = time.time()
+        self.spans      = []      # (path, seconds, rss_delta_bytes), in completion order
+        self._stack     = []
+        self._t0        = time.perf_counter()
+        self._rss0      = _rss()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        rss0 = _rss()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((path, time.perf_counter() - t0, _rss() - rss0))
+            self._stack.pop()
+
+    def finish(self):
+        total = time.perf_counter() - self._t0
+        self.spans.append(("rerun", total, _rss() - self._rss0))
+        self.recorder.observe(self)
+        return self
+
+    def as_record(self):
+        return {
+            "ts": self.started,
+            "session": self.session_id,
+            "spans": [{"name": n, "ms": round(s * 1000, 3), "rss_delta": m} for n, s, m in self.spans],
+        }
+
+
+class Recorder:
+    """Process-wide aggregation shared by all sessions."""
+
+    def __init__(self, log_path=LOG_PATH, metrics_port=METRICS_PORT, metrics_host=METRICS_HOST):
+        self.log_path  = log_path
+        self.last      = {}       # session_id -> last finished Rerun
+        self._hist     = {}       # span -> [bucket counts..., +Inf count, sum seconds]
+        self._lock     = threading.Lock()
+        self._log      = None     # line-buffered handle, opened on first use
+        self._log_lock = threading.Lock()
+        if metrics_port:
+            self._serve(metrics_host, metrics_port)
+
+    def observe(self, rerun):
+        with self._lock:
+            self.last.pop(rerun.session_id, None)
+            self.last[rerun.session_id] = rerun
+            if len(self.last) > MAX_SESSIONS:
+                del self.last[next(iter(self.last))]
+            for name, seconds, _ in rerun.spans:
+                h = self._hist.get(name)
+                if h is None:
+                    h = self._hist[name] = [0] * (len(BUCKETS) + 1) + [0.0]
+                for i, le in enumerate(BUCKETS):
+                    if seconds <= le:
+                        h[i] += 1
+                h[len(BUCKETS)] += 1
+                h[-1] += seconds
+        if self.log_path:
+            line = json.dumps(rerun.as_record()) + "\n"
+            # Own lock and one open handle: reruns never wait on the disk for the histograms
+            with self._log_lock:
+                if self._log is None:
+                    self._log = open(self.log_path, "a", buffering=1)
+                self._log.write(line)
+
+    def prometheus(self):
+        lines = [
+            "# HELP hrip_span_seconds Wall time of app.py sections per rerun.",
+            "# TYPE hrip_span_seconds histogram",
+        ]
+        with self._lock:
+            for name in sorted(self._hist):
+                h = self._hist[name]
+                for i, le in enumerate(BUCKETS):
+                    lines.append(f'hrip_span_seconds_bucket{{span="{name}",le="{le}"}} {h[i]}')
+                lines.append(f'hrip_span_seconds_bucket{{span="{name}",le="+Inf"}} {h[len(BUCKETS)]}')
+                lines.append(f'hrip_span_seconds_sum{{span="{name}"}} {h[-1]:.6f}')
+                lines.append(f'hrip_span_seconds_count{{span="{name}"}} {h[len(BUCKETS)]}')
+        return "\n".join(lines) + "\n"
+
+    def _serve(self, host, port):
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="hrip-metrics", daemon=True).start()
+
+
+_recorder      = None
+_recorder_lock = threading.Lock()
+
+
+def recorder():
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = Recorder()
+        return _recorder
+
+
+def start_rerun(session_id=None):
+    return Rerun(recorder(), session_id) if ENABLED else NULL_RERUN
@@ -0,0 +1,32 @@
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+import schema  # noqa: E402
+
+
+def random_rows(n, seed=0):
+    """``n`` valid model-ordered input rows."""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(schema.LOWER, schema.UPPER, (n, schema.N_FEATURES))
+    X[:, schema.INTEGRAL] = np.round(X[:, schema.INTEGRAL])
+    return X
+
+
+@pytest.fixture(scope="session")
+def model_version():
+    """A small fitted tree wrapped as a ``ModelVersion``."""
+    from sklearn.tree import DecisionTreeClassifier
+
+    from model_registry import ModelVersion
+
+    X = random_rows(2000)
+    y = ((X[:, 10] > 140) | (X[:, 3] < 4000)).astype(int)
+    model = DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+    return ModelVersion(model, "0123456789ab" * 5, None)
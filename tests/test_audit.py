@@ -0,0 +1,39 @@
+import numpy as np
+
+import schema
+from audit import AuditLog, query, query_plan
+
+
+def test_records_reach_disk_in_batches(tmp_path):
+    path = str(tmp_path / "audit.db")
+    log = AuditLog(path, batch_size=16, flush_seconds=0.05).start()
+    try:
+        for i in range(100):
+            log.record(schema.DEFAULTS, probability=i / 100, prediction=i % 2, model="abc",
+                       session="s", ts=1000.0 + i)
+        assert log.flush(timeout=10)
+        assert log.written == 100 and log.dropped == 0
+    finally:
+        log.close()
+
+    rows = query(1010, 1020, path=path)
+    assert rows["ts"].tolist() == [1010.0 + i for i in range(10)]
+    assert np.allclose(rows[schema.FEATURE_NAMES].to_numpy()[0], schema.DEFAULTS)
+    assert "audit_ts" in query_plan(path)
+
+
+def test_close_drains_queue(tmp_path):
+    path = str(tmp_path / "audit.db")
+    log = AuditLog(path, flush_seconds=0.05).start()
+    for i in range(10):
+        log.record(schema.DEFAULTS, 0.5, None, "abc", ts=float(i))
+    log.close()
+    rows = query(path=path)
+    assert len(rows) == 10 and rows["prediction"].isna().all()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    log = AuditLog(str(tmp_path / "audit.db"), queue_max=3)   # not started: nothing drains
+    for _ in range(5):
+        log.record(schema.DEFAULTS, 0.5, 1, "abc")
+    assert log.pending() == 3 and log.dropped == 2
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from background import JobPool
+
+
+def _settle(pool, key):
+    """Wait for the pool's done-callback, which may run after ``result()`` returns."""
+    deadline = time.monotonic() + 5
+    while key in pool._jobs and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def pool():
+    pool = JobPool(max_workers=2, reap_seconds=0)
+    yield pool
+    pool.shutdown()
+
+
+def test_same_key_shares_one_job(pool):
+    calls = []
+    gate = threading.Event()
+
+    def work(x):
+        calls.append(x)
+        gate.wait(5)
+        return x * 2
+
+    a = pool.submit("k", work, 21, session_id="s1")
+    b = pool.submit("k", work, 21, session_id="s2")
+    assert a is b
+    gate.set()
+    assert a.result(5) == 42
+    assert pool.submit("k", work, 21) is a           # served from the result cache
+    assert calls == [21]
+
+
+def test_result_cache_is_bounded(pool):
+    small = JobPool(max_workers=1, keep_results=2, reap_seconds=0)
+    for k in range(3):
+        small.submit(k, lambda k=k: k).result(5)
+        _settle(small, k)
+    assert small.peek(0) is None and small.peek(2).result() == 2
+    small.shutdown()
+
+
+def test_release_cancels_a_running_job(pool):
+    started, seen = threading.Event(), []
+
+    def work(cancel):
+        started.set()
+        seen.append(cancel.wait(5))
+        return "done"
+
+    pool.begin_run("s1")
+    future = pool.submit("k", work, session_id="s1")
+    pool.end_run("s1")
+    assert started.wait(5)
+    pool.begin_run("s1")
+    pool.end_run("s1")                               # "k" not asked for again: hold dropped
+    future.result(5)
+    _settle(pool, "k")
+    assert seen == [True]
+    assert pool.peek("k") is None                    # cancelled work is not cached
+
+
+def test_job_stays_while_another_session_holds_it(pool):
+    gate = threading.Event()
+
+    def work(cancel):
+        gate.wait(5)
+        return cancel.is_set()
+
+    future = pool.submit("k", work, session_id="s1")
+    pool.submit("k", work, session_id="s2")
+    pool.forget("s1")
+    gate.set()
+    assert future.result(5) is False
+
+
+def test_queued_job_is_dropped_on_release():
+    pool = JobPool(max_workers=1, reap_seconds=0)
+    gate = threading.Event()
+    pool.submit("busy", gate.wait, 5)
+    queued = pool.submit("k", lambda: 1, session_id="s1")
+    pool.forget("s1")
+    assert queued.cancelled()
+    gate.set()
+    pool.shutdown()
+
+
+def test_failure_is_kept_until_retry(pool):
+    calls = []
+
+    def boom():
+        calls.append(1)
+        raise ValueError("bad input")
+
+    failed = pool.submit("k", boom)
+    with pytest.raises(ValueError):
+        failed.result(5)
+    _settle(pool, "k")
+    assert pool.submit("k", boom) is failed          # the rerun reporting it does not resubmit
+    assert pool.peek("k") is failed
+    assert calls == [1]
+
+    pool.retry("k")
+    again = pool.submit("k", boom)
+    assert again is not failed
+    with pytest.raises(ValueError):
+        again.result(5)
+    assert calls == [1, 1]
+
+
+def test_failure_expires():
+    pool = JobPool(max_workers=1, reap_seconds=0, fail_seconds=0)
+
+    def boom():
+        raise ValueError("bad input")
+
+    failed = pool.submit("k", boom)
+    with pytest.raises(ValueError):
+        failed.result(5)
+    _settle(pool, "k")
+    assert pool.submit("k", boom) is not failed
+    pool.shutdown()
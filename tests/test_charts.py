@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import charts
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    charts.shared_figure.clear()
+    yield
+    charts.shared_figure.clear()
+
+
+def test_shared_figure_builds_once_per_key():
+    builds = []
+
+    def build(value):
+        builds.append(value)
+        return charts.gauge(value)
+
+    first = charts.shared_figure("gauge", 0.25, lambda: build(0.25))
+    again = charts.shared_figure("gauge", 0.25, lambda: build(0.25))     # new lambda, same key
+    other = charts.shared_figure("gauge", 0.75, lambda: build(0.75))
+    assert again is first and other is not first
+    assert builds == [0.25, 0.75]
+
+
+def test_shared_figure_keys_include_the_name():
+    probs = np.array([0.4, 0.6])
+    bar = charts.shared_figure("bar", probs.tobytes(), lambda: charts.probability_bar(probs))
+    other = charts.shared_figure("radar", probs.tobytes(), lambda: charts.probability_bar(probs))
+    assert bar is not other
+    assert charts.shared_figure("bar", np.array([0.4, 0.6]).tobytes(), pytest.fail) is bar
+
+
+def test_numeric_data_is_sent_as_typed_arrays():
+    fig = charts.probability_bar(np.array([0.4, 0.6]))
+    assert '"bdata"' in fig.to_json()
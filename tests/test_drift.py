@@ -0,0 +1,55 @@
+import numpy as np
+
+import drift
+import schema
+from conftest import random_rows
+
+
+def test_identical_counts_do_not_drift():
+    ref = drift.Reference.from_matrix(random_rows(5000))
+    psi, ks, p = drift.compare(ref.counts, ref.counts)
+    assert np.allclose(psi, 0) and np.allclose(ks, 0)
+    assert np.allclose(p, 1)
+
+
+def test_scaled_counts_do_not_drift():
+    ref = drift.Reference.from_matrix(random_rows(5000))
+    psi, ks, _ = drift.compare(ref.counts, ref.counts * 3)
+    assert np.allclose(psi, 0) and np.allclose(ks, 0)
+
+
+def test_shift_is_detected_on_the_shifted_feature_only():
+    X = random_rows(5000)
+    ref = drift.Reference.from_matrix(X)
+    live = random_rows(2000, seed=1)
+    j = schema.FEATURE_NAMES.index("bmi")
+    live[:, j] = np.minimum(live[:, j] + 8, schema.UPPER[j])
+    psi, ks, p = drift.compare(ref.counts, ref.histogram(live))
+    assert psi[j] > drift.PSI_MAJOR and p[j] < 1e-6
+    others = np.arange(schema.N_FEATURES) != j
+    assert (psi[others] < drift.PSI_MODERATE).all()
+    assert ks[j] == ks.max()
+
+
+def test_psi_matches_formula():
+    ref = np.array([[50, 30, 20]])
+    live = np.array([[20, 30, 50]])
+    p, q = ref / 100, live / 100
+    psi, ks, _ = drift.compare(ref, live)
+    assert np.isclose(psi[0], ((q - p) * np.log(q / p)).sum())
+    assert np.isclose(ks[0], 0.3)
+
+
+def test_empty_window_has_no_verdict():
+    ref = drift.Reference.from_matrix(random_rows(1000))
+    psi, ks, p = drift.compare(ref.counts, np.zeros_like(ref.counts))
+    assert np.isnan(psi).all() and np.isnan(ks).all() and np.isnan(p).all()
+    assert drift.status(psi[0], 0) == "collecting"
+
+
+def test_status_thresholds():
+    n = drift.MIN_LIVE
+    assert drift.status(0.5, n - 1) == "collecting"
+    assert drift.status(0.01, n) == "stable"
+    assert drift.status(drift.PSI_MODERATE, n) == "moderate shift"
+    assert drift.status(drift.PSI_MAJOR + 0.01, n) == "major shift"
@@ -0,0 +1,40 @@
+import numpy as np
+
+import schema
+from history import ROW_DTYPE, AssessmentHistory
+
+
+def _fill(history, n):
+    for i in range(n):
+        history.append(schema.DEFAULTS + i, risk=i / 100, prediction=i % 2, model_short="abc", ts=1000.0 + i)
+
+
+def test_rows_before_wrap():
+    h = AssessmentHistory(capacity=5)
+    _fill(h, 3)
+    assert len(h) == 3
+    assert h.rows()["seq"].tolist() == [1, 2, 3]
+
+
+def test_wrap_keeps_newest_in_order():
+    h = AssessmentHistory(capacity=4)
+    _fill(h, 10)
+    rows = h.rows()
+    assert len(h) == 4 and h.total == 10
+    assert rows["seq"].tolist() == [7, 8, 9, 10]
+    assert np.allclose(rows["ts"], [1006, 1007, 1008, 1009])
+    assert np.allclose(rows["features"][0], schema.DEFAULTS + 6)
+
+
+def test_get_after_overwrite():
+    h = AssessmentHistory(capacity=3)
+    _fill(h, 5)
+    assert h.get(2) is None
+    assert float(h.get(4)["risk"]) == np.float32(0.03)
+
+
+def test_memory_is_fixed():
+    h = AssessmentHistory(capacity=8)
+    before = h.nbytes
+    _fill(h, 50)
+    assert h.nbytes == before == 8 * ROW_DTYPE.itemsize
@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+import importance
+from conftest import random_rows
+from model_registry import ModelVersion
+
+
+@pytest.fixture(scope="module")
+def holdout():
+    rng = np.random.default_rng(14)
+    X = random_rows(600, seed=14)
+    y = ((X[:, 10] > 140) ^ (rng.random(len(X)) < 0.2)).astype(np.int64)
+    return importance.Holdout(X, y, "test")
+
+
+def test_rank_sum_auc_matches_sklearn(model_version, holdout):
+    model, X, y = model_version.model, holdout.X, holdout.y
+    rng = np.random.default_rng(15)
+    stacked = np.vstack([X] + [X[rng.permutation(len(X))] for _ in range(2)])
+    aucs = importance.score(model, stacked, y, "roc_auc", repeats=3)
+    for r, auc in enumerate(aucs):
+        proba = model.predict_proba(stacked[r * len(y):(r + 1) * len(y)])[:, model_version.pos_index]
+        assert auc == pytest.approx(roc_auc_score(y, proba))
+
+
+def test_accuracy_metric(model_version, holdout):
+    expected = accuracy_score(holdout.y, model_version.model.predict(holdout.X))
+    assert importance.score(model_version.model, holdout.X, holdout.y, "accuracy")[0] == pytest.approx(expected)
+
+
+def test_unused_features_are_exactly_zero(model_version, holdout):
+    r = importance.compute(model_version, holdout, n_repeats=3, workers=1)
+    used = set(importance.used_features(model_version.model).tolist())
+    assert r["scored_features"] == len(used)
+    assert all(r["mean"][j] == 0 for j in range(len(r["mean"])) if j not in used)
+    assert max(r["mean"]) > 0
+
+
+def test_same_result_for_any_worker_count(model_version, holdout):
+    one = importance.compute(model_version, holdout, n_repeats=4, seed=7, workers=1)
+    two = importance.compute(model_version, holdout, n_repeats=4, seed=7, workers=2)
+    for key in ("baseline", "mean", "std", "low", "high"):
+        assert one[key] == two[key]
+    other = importance.compute(model_version, holdout, n_repeats=4, seed=8, workers=1)
+    assert other["mean"] != one["mean"]
+
+
+def test_cancel_returns_nothing(model_version, holdout):
+    cancel = threading.Event()
+    cancel.set()
+    assert importance.compute(model_version, holdout, workers=1, cancel=cancel) is None
+    assert importance.compute(model_version, holdout, workers=2, cancel=cancel) is None
+
+
+def test_cache_key_covers_model_and_seed(model_version, holdout, tmp_path):
+    other = ModelVersion(model_version.model, "f" * 64, None)
+    paths = {
+        importance.cache_path(model_version, holdout, cache_dir=str(tmp_path)),
+        importance.cache_path(other, holdout, cache_dir=str(tmp_path)),
+        importance.cache_path(model_version, holdout, seed=1, cache_dir=str(tmp_path)),
+        importance.cache_path(model_version, holdout, metric="accuracy", cache_dir=str(tmp_path)),
+        importance.cache_path(model_version, holdout, n_repeats=3, cache_dir=str(tmp_path)),
+    }
+    assert len(paths) == 5
+
+
+def test_cached_reads_back(model_version, holdout, tmp_path, monkeypatch):
+    first = importance.cached(model_version, holdout, n_repeats=2, workers=1, cache_dir=str(tmp_path))
+    monkeypatch.setattr(importance, "compute", lambda *a, **k: pytest.fail("cache miss"))
+    assert importance.cached(model_version, holdout, n_repeats=2, workers=1, cache_dir=str(tmp_path)) == first
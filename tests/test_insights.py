@@ -0,0 +1,42 @@
+import numpy as np
+
+import charts
+import schema
+from conftest import random_rows
+from insights import render_tree_png, tree_layout, tree_path
+
+
+def test_layout_covers_every_node(model_version):
+    tree = model_version.model.tree_
+    layout = tree_layout(model_version.model, schema.FEATURE_NAMES)
+    assert len(layout["x"]) == len(layout["label"]) == tree.node_count
+    assert layout["is_leaf"].sum() == tree.n_leaves
+    assert len(layout["edges"]) == tree.node_count - 1
+    assert layout["share"][0] == 1.0
+    # leaves at consecutive x in left-to-right order, depth as -y
+    assert sorted(layout["x"][layout["is_leaf"]]) == list(range(tree.n_leaves))
+    assert -layout["y"].min() == model_version.model.get_depth()
+
+
+def test_leaf_path_matches_decision_path(model_version):
+    model = model_version.model
+    layout = tree_layout(model, schema.FEATURE_NAMES)
+    X = random_rows(50, seed=16)
+    paths = model.decision_path(X)
+    for i, leaf in enumerate(model.apply(X)):
+        assert tree_path(layout, leaf) == sorted(paths[i].indices.tolist())
+
+
+def test_explorer_highlights_the_path(model_version):
+    model = model_version.model
+    layout = tree_layout(model, schema.FEATURE_NAMES)
+    path = tree_path(layout, model.apply(random_rows(1, seed=17))[0])
+    assert len(charts.tree_explorer(layout).data) == 2
+    fig = charts.tree_explorer(layout, path)
+    assert len(fig.data) == 3
+    assert np.allclose(np.asarray(fig.data[2].x, dtype=float), layout["x"][path])
+
+
+def test_png_export(model_version):
+    png = render_tree_png(model_version.model, schema.FEATURE_NAMES, dpi=20)
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
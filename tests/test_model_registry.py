@@ -0,0 +1,108 @@
+import gc
+import os
+import pickle
+import shutil
+
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+import model_registry
+from conftest import random_rows
+from model_registry import ModelRegistry, ModelVersion
+
+
+def _other_model():
+    X = random_rows(500, seed=13)
+    return DecisionTreeClassifier(max_depth=1, random_state=0).fit(X, (X[:, 0] > 50).astype(int))
+
+
+def _drop(path, obj, mtime):
+    with open(path, "wb") as f:
+        pickle.dump(obj, f)
+    os.utime(path, ns=(mtime * 10**9, mtime * 10**9))
+    return str(path)
+
+
+@pytest.fixture
+def registry(tmp_path, model_version):
+    _drop(tmp_path / "a.pkl", model_version.model, 1000)
+    return ModelRegistry(str(tmp_path), fallback=str(tmp_path / "missing.pkl"), poll_seconds=0).start()
+
+
+def test_start_needs_a_model(tmp_path):
+    with pytest.raises(RuntimeError):
+        ModelRegistry(str(tmp_path), fallback=str(tmp_path / "missing.pkl"), poll_seconds=0).start()
+
+
+def test_verify_rejects_bad_models(model_version):
+    model_registry.verify(model_version.model)
+    narrow = DecisionTreeClassifier().fit(random_rows(50)[:, :3], [0, 1] * 25)
+    for bad in ({"not": "a model"}, narrow):
+        with pytest.raises(ValueError):
+            model_registry.verify(bad)
+
+
+def test_bad_pickle_is_rejected_and_active_kept(registry, tmp_path):
+    first = registry.active()
+    _drop(tmp_path / "b.pkl", {"not": "a model"}, 2000)
+    registry.scan()
+    assert registry.active() is first
+    assert list(registry.rejected().values()) == ["model has no 'predict'"]
+
+
+def test_startup_falls_back_past_a_bad_pickle(tmp_path, model_version):
+    _drop(tmp_path / "good.pkl", model_version.model, 1000)
+    _drop(tmp_path / "bad.pkl", {"not": "a model"}, 2000)
+    registry = ModelRegistry(str(tmp_path), fallback=str(tmp_path / "missing.pkl"), poll_seconds=0).start()
+    assert registry.active().path.endswith("good.pkl")
+
+
+def test_digest_is_cached_by_mtime_and_size(registry, tmp_path, monkeypatch):
+    calls = []
+    real = model_registry.file_digest
+    monkeypatch.setattr(model_registry, "file_digest", lambda p: calls.append(p) or real(p))
+    registry.scan()
+    registry.scan()
+    assert calls == []
+    _drop(tmp_path / "a.pkl", registry.active().model, 1500)     # same bytes, new mtime
+    registry.scan()
+    assert len(calls) == 1
+
+
+def test_scan_hot_swaps_to_newer_model(registry, tmp_path):
+    first = registry.active()
+    path = _drop(tmp_path / "b.pkl", _other_model(), 2000)
+    registry.scan()
+    assert registry.active() is not first and registry.active().path == path
+    assert registry.get(first.digest) is first                   # still pinned by this test
+
+    active = registry.active()
+    shutil.copy(path, tmp_path / "c.pkl")                        # newer file, same content
+    registry.scan()
+    assert registry.active() is active
+
+
+def test_old_versions_are_released(registry, tmp_path):
+    old_digest = registry.active().digest
+    _drop(tmp_path / "b.pkl", _other_model(), 2000)
+    registry.scan()
+    gc.collect()
+    assert registry.get(old_digest) is None
+    assert registry.versions() == [registry.active()]
+
+
+def test_memo_is_per_version(model_version):
+    other = ModelVersion(_other_model(), "f" * 64, None)
+    calls = []
+
+    def depth(mv):
+        calls.append(mv.short)
+        return mv.model.get_depth()
+
+    expected = model_version.model.get_depth()
+    assert expected != 1
+    assert model_version.memo("test_depth", depth) == expected
+    assert other.memo("test_depth", depth) == 1
+    assert model_version.memo("test_depth", depth) == expected
+    assert calls == [model_version.short, other.short]
+    assert repr(other) == "ModelVersion(ffffffffffff, in memory)"
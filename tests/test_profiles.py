@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+import schema
+from conftest import random_rows
+from profiles import _UPSERT, ConnectionPool, ProfileStore
+
+
+def test_pool_reuses_and_caps_connections(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "p.db"), size=2, timeout=0.2)
+    with pool.connection() as a:
+        with pool.connection() as b:
+            assert a is not b
+            with pytest.raises(Exception):        # queue.Empty once both are out
+                with pool.connection():
+                    pass
+    with pool.connection() as c:
+        assert c is a                             # most recently returned first
+    assert pool._opened == 2
+    pool.close()
+
+
+def test_failed_open_gives_the_slot_back(tmp_path, monkeypatch):
+    pool = ConnectionPool(str(tmp_path / "p.db"), size=2, timeout=0.2)
+    real_open = pool._open
+
+    def broken():
+        raise sqlite3.OperationalError("disk I/O error")
+
+    with pool.connection():
+        monkeypatch.setattr(pool, "_open", broken)
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection():
+                pass
+        assert pool._opened == 1
+        monkeypatch.setattr(pool, "_open", real_open)
+        with pool.connection() as conn:
+            assert conn.execute("SELECT 1").fetchone() == (1,)
+    assert pool._opened == 2
+    pool.close()
+
+
+def test_rollback_on_return(tmp_path):
+    store = ProfileStore(str(tmp_path / "p.db"))
+    with store.pool.connection() as conn:
+        conn.execute(_UPSERT, ("x", 0.0, *schema.DEFAULTS.tolist()))
+    assert store.count() == 0
+
+
+def test_save_get_round_trip(tmp_path):
+    store = ProfileStore(str(tmp_path / "p.db"))
+    row = random_rows(1, seed=4)[0]
+    store.save("P1", row, risk=0.25, prediction=0, model="abc")
+    record = store.record("P1")
+    assert np.array_equal(record["features"], row)
+    assert (record["risk"], record["prediction"], record["model"]) == (0.25, 0, "abc")
+    assert store.get("missing") is None
+    store.save("P1", schema.DEFAULTS)
+    assert np.array_equal(store.get("P1"), schema.DEFAULTS)
+    assert store.count() == 1
+
+
+def test_concurrent_saves(tmp_path):
+    store = ProfileStore(str(tmp_path / "p.db"), pool_size=2)
+    X = random_rows(40, seed=5)
+
+    def work(offset):
+        for i in range(offset, len(X), 4):
+            store.save(f"P{i:03d}", X[i])
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.count() == len(X)
+    assert store.pool._opened <= 2
+
+
+def test_rescore_all_matches_predict(tmp_path, model_version):
+    store = ProfileStore(str(tmp_path / "p.db"))
+    X = random_rows(500, seed=6)
+    X[7, 0] = schema.UPPER[0] + 1                 # invalid: left unscored
+    ids = [f"P{i:04d}" for i in range(len(X))]
+    store.save_many(ids, X)
+    assert store.rescore_all(model_version, chunk_rows=64) == (499, 1)
+
+    model = model_version.model
+    pred = model.predict(X)
+    risk = model.predict_proba(X)[:, model_version.pos_index]
+    for i in (0, 7, 63, 64, 499):
+        record = store.record(ids[i])
+        if i == 7:
+            assert record["risk"] is None and record["prediction"] is None
+        else:
+            assert record["prediction"] == pred[i]
+            assert record["risk"] == pytest.approx(risk[i])
+            assert record["model"] == model_version.digest
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+import reports
+from conftest import random_rows
+
+
+def test_report_name_is_injective():
+    ids = ["P1", "P/1", "P_1", "P:1", "P 1", "P_1~", "../P1", "..", "P1.html"]
+    names = [reports.report_name(pid) for pid in ids]
+    assert len(set(names)) == len(ids)
+    assert reports.report_name("P_1") == "P_1.html"
+    assert all("/" not in n and n not in (".html", "..html") for n in names)
+
+
+def test_report_name_is_stable():
+    assert reports.report_name("P/1") == reports.report_name("P/1")
+    assert reports.report_name(42) == "42.html"
+
+
+def test_generate_and_resume(tmp_path, model_version):
+    X = random_rows(6, seed=7)
+    ids = ["A", "B", "C/1", "C:1", "D", "E"]
+    out = str(tmp_path / "out")
+    chunks = lambda: iter([(ids[:3], X[:3], 0), (ids[3:], X[3:], 1)])
+
+    stats = reports.generate(chunks(), out, model_version, workers=1)   # worker gets bytes, not a path
+    assert (stats["written"], stats["invalid"]) == (6, 1)
+    assert sorted(os.listdir(out)) == sorted([reports.report_name(p) for p in ids] + [reports.RUN_FILE])
+    with open(os.path.join(out, reports.report_name("C/1")), encoding="utf-8") as f:
+        assert "C/1" in f.read()
+
+    again = reports.generate(chunks(), out, model_version, workers=1)
+    assert (again["written"], again["skipped"]) == (0, 6)
+
+
+def test_generate_refuses_other_model(tmp_path, model_version):
+    from model_registry import ModelVersion
+
+    out = str(tmp_path / "out")
+    reports.generate(iter(()), out, model_version, workers=1)
+    other = ModelVersion(model_version.model, "f" * 64, None)
+    with pytest.raises(SystemExit):
+        reports.generate(iter(()), out, other, workers=1)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import schema
+from conftest import random_rows
+
+
+def test_valid_rows_have_no_errors():
+    assert not schema.validate(random_rows(1000)).any()
+
+
+def test_each_failure_sets_its_feature_bit():
+    X = np.repeat(schema.DEFAULTS[None, :], 5, axis=0)
+    X[0, 0] = schema.UPPER[0] + 1                       # age above range
+    X[1, 2] = np.nan                                    # bmi missing
+    X[2, 3] = 100.5                                     # daily_steps not integral
+    X[3, 13] = -1                                       # family_history below range
+    X[4, [0, 13]] = np.nan
+    codes = schema.validate(X)
+    assert codes.tolist() == [1 << 0, 1 << 2, 1 << 3, 1 << 13, (1 << 0) | (1 << 13)]
+    assert schema.describe_errors(codes[4]) == ["age", "family_history"]
+
+
+def test_chunking_does_not_change_codes():
+    X = random_rows(1000)
+    X[::7, 5] = -1.0
+    assert np.array_equal(schema.validate(X, chunk_rows=64), schema.validate(X))
+
+
+def test_error_counts():
+    X = random_rows(10)
+    X[:3, 1] = 2
+    assert schema.error_counts(schema.validate(X))["gender"] == 3
+
+
+def test_rejects_wrong_shape():
+    with pytest.raises(ValueError):
+        schema.validate(np.zeros((3, 5)))
+
+
+def test_non_numeric_entries_are_invalid_not_errors():
+    X = np.repeat(schema.DEFAULTS[None, :], 3, axis=0).astype(object)
+    X[0, 2] = "n/a"
+    X[1, 5] = None
+    X[2, 0] = "45"                                      # numeric text is accepted
+    assert schema.validate(X).tolist() == [1 << 2, 1 << 5, 0]
+
+
+def test_integer_input():
+    X = np.repeat(schema.DEFAULTS[None, :], 2, axis=0).round().astype(np.int64)
+    X[1, 0] = -5
+    assert schema.validate(X).tolist() == [0, 1 << 0]
+
+
+def test_to_matrix_coerces_stray_text():
+    import pandas as pd
+
+    df = pd.DataFrame(np.repeat(schema.DEFAULTS[None, :], 3, axis=0), columns=schema.FEATURE_NAMES)
+    df["bmi"] = df["bmi"].astype(object)
+    df.loc[1, "bmi"] = "unknown"
+    X = schema.to_matrix(df)
+    assert np.isnan(X[1, 2]) and X.dtype == np.float64
+    assert schema.validate(X).tolist() == [0, 1 << 2, 0]
@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+
+import shared_data
+from conftest import random_rows
+
+
+def _reference(tmp_path, model_version, n=400):
+    X = random_rows(n).astype(np.float32)
+    y = np.zeros(n, dtype=np.int8)
+    arrays, center, scale = shared_data.build_arrays(X, y, model_version, k=5)
+    for name, arr in arrays.items():
+        np.save(tmp_path / f"{name}.npy", np.ascontiguousarray(arr))
+    meta = {"version": "t", "model_digest": model_version.digest,
+            "center": center.tolist(), "scale": scale.tolist()}
+    (tmp_path / "meta.json").write_text(json.dumps(meta))
+    return shared_data.ReferenceData(str(tmp_path))
+
+
+def test_nearest_matches_brute_force(tmp_path, model_version):
+    ref = _reference(tmp_path, model_version)
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        x = random_rows(1, seed=int(rng.integers(1 << 30)))[0]
+        q = (x - ref.center) / ref.scale
+        brute = np.argsort(((np.asarray(ref.Z, dtype=np.float64) - q) ** 2).sum(axis=1))[:5]
+        assert set(ref.nearest(x, k=5)) == set(brute)
+
+
+def test_risk_percentile_counts_lower_scores(tmp_path, model_version):
+    ref = _reference(tmp_path, model_version)
+    scores = np.asarray(ref.sorted_scores)
+    assert (np.diff(scores) >= 0).all()
+    for risk in (0.0, float(scores[0]), float(np.median(scores)), float(scores[-1]), 1.0, 1.5):
+        assert ref.risk_percentile(risk) == np.count_nonzero(scores < risk) / len(scores)
@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+
+import schema
+import streaming
+from conftest import random_rows
+
+
+def _batch(*updates):
+    return streaming.parse([json.dumps(u) for u in updates])[0]
+
+
+def _wearable_updates(n, seed=0):
+    rng = np.random.default_rng(seed)
+    updates = []
+    for _ in range(n):
+        updates.append({
+            "patient": f"P{rng.integers(50):03d}",
+            "daily_steps": int(rng.integers(0, 20000)),
+            "sleep_hours": round(float(rng.uniform(3, 10)), 1),
+            "resting_hr": int(rng.integers(45, 110)),
+        })
+    return updates
+
+
+def test_leaf_boxes_contain_every_row(model_version):
+    X = random_rows(3000, seed=2)
+    lo, hi = streaming.leaf_boxes(model_version.model)
+    leaf = model_version.model.apply(X)
+    x = X.astype(np.float32)
+    assert ((x > lo[leaf]) & (x <= hi[leaf])).all()
+
+
+def test_leaf_boxes_need_a_tree():
+    assert streaming.leaf_boxes(object()) is None
+
+
+def test_apply_rejects_nan_and_out_of_range(model_version):
+    scorer = streaming.FeedScorer(model_version)
+    j = streaming.FEATURE_INDEX["resting_hr"]
+    batch = streaming.Batch(["A", "B", "C", "D"], [0, 1, 2, 3], [j] * 4,
+                            [np.nan, schema.UPPER[j] + 1, 70.5, 70])
+    scorer.apply(batch)
+    assert scorer.stats["rejected"] == 3
+    assert scorer.ids == ["D"]
+    assert not np.isnan(scorer.X[:len(scorer)]).any()
+
+
+def test_last_update_of_a_field_wins(model_version):
+    scorer = streaming.FeedScorer(model_version)
+    scorer.apply(_batch({"patient": "A", "daily_steps": 1000}, {"patient": "A", "daily_steps": 9000}))
+    assert scorer.profile("A")[streaming.FEATURE_INDEX["daily_steps"]] == 9000
+
+
+def test_scores_match_predict_proba(model_version):
+    scorer = streaming.FeedScorer(model_version)
+    for chunk in np.array_split(np.array(_wearable_updates(2000), dtype=object), 20):
+        scorer.apply(_batch(*chunk))
+    X = scorer.X[:len(scorer)]
+    proba = model_version.model.predict_proba(X)[:, model_version.pos_index]
+    assert np.allclose(scorer.risk[:len(scorer)], proba.astype(np.float32))
+    assert scorer.stats["merged"] > 0
+
+
+def test_threshold_check_matches_rescoring_everything(model_version):
+    checked = streaming.FeedScorer(model_version)
+    always = streaming.FeedScorer(model_version, threshold_check=False)
+    checked_events, always_events = [], []
+    for chunk in np.array_split(np.array(_wearable_updates(2000, seed=3), dtype=object), 20):
+        checked_events += checked.apply(_batch(*chunk))
+        always_events += always.apply(_batch(*chunk))
+    assert checked.ids == always.ids
+    assert np.array_equal(checked.risk[:len(checked)], always.risk[:len(always)])
+    key = lambda e: (e["patient"], e["risk"], -1 if e["previous"] is None else e["previous"])
+    assert sorted(map(key, checked_events)) == sorted(map(key, always_events))
+    assert checked.stats["rescored"] < always.stats["rescored"]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import schema
+import synth
+from conftest import random_rows
+
+
+def _fitted():
+    X = random_rows(2000, seed=8)
+    return synth.Copula.fit(X, (X[:, 10] > 140).astype(np.int64), "test")
+
+
+def test_sample_is_deterministic_per_seed():
+    copula = synth.Copula.notebook()
+    X1, y1 = copula.sample(500, seed=3)
+    X2, y2 = copula.sample(500, seed=3)
+    X3, _ = copula.sample(500, seed=4)
+    assert np.array_equal(X1, X2) and np.array_equal(y1, y2)
+    assert not np.array_equal(X1, X3)
+
+
+def test_samples_pass_validation():
+    X, y = _fitted().sample(2000, seed=1)
+    assert (schema.validate(X) == 0).all()
+    assert set(np.unique(y)) <= {0, 1}
+
+
+def test_file_does_not_depend_on_worker_count(tmp_path):
+    copula = _fitted()
+    paths = []
+    for workers in (1, 2):
+        path = str(tmp_path / f"w{workers}.csv")
+        stats = synth.write(copula, path, 1000, seed=5, workers=workers, chunk_rows=128)
+        assert stats["rows"] == 1000
+        paths.append(path)
+    with open(paths[0], "rb") as a, open(paths[1], "rb") as b:
+        assert a.read() == b.read()
+
+    df = pd.read_csv(paths[0])
+    assert list(df.columns) == synth.COLUMNS
+    assert df["id"].tolist() == list(range(1, 1001))
+
+
+def test_seed_changes_the_file(tmp_path):
+    copula = synth.Copula.notebook()
+    synth.write(copula, str(tmp_path / "a.csv"), 300, seed=1, workers=1, chunk_rows=100)
+    synth.write(copula, str(tmp_path / "b.csv"), 300, seed=2, workers=1, chunk_rows=100)
+    assert (tmp_path / "a.csv").read_bytes() != (tmp_path / "b.csv").read_bytes()
@@ -0,0 +1,76 @@
+import json
+import re
+
+import telemetry
+
+
+def _rerun(recorder, session="s", spans=()):
+    rerun = telemetry.Rerun(recorder, session)
+    for path, seconds in spans:
+        rerun.spans.append((path, seconds, 0))
+    return rerun.finish()
+
+
+def test_span_paths_nest():
+    rerun = telemetry.Rerun(telemetry.Recorder(), "s")
+    with rerun.span("tab1"):
+        with rerun.span("gauge"):
+            pass
+        with rerun.span("radar"):
+            with rerun.span("build"):
+                pass
+    with rerun.span("sidebar"):
+        pass
+    rerun.finish()
+    assert [name for name, _, _ in rerun.spans] == [
+        "tab1/gauge", "tab1/radar/build", "tab1/radar", "tab1", "sidebar", "rerun",
+    ]
+
+
+def test_span_survives_exceptions():
+    rerun = telemetry.Rerun(telemetry.Recorder(), "s")
+    try:
+        with rerun.span("outer"):
+            raise KeyError
+    except KeyError:
+        pass
+    with rerun.span("next"):
+        pass
+    assert [name for name, _, _ in rerun.spans] == ["outer", "next"]
+
+
+def test_prometheus_buckets_are_cumulative():
+    recorder = telemetry.Recorder()
+    for seconds in (0.0005, 0.003, 0.003, 0.2, 30.0):
+        _rerun(recorder, spans=[("tab1", seconds)])
+    text = recorder.prometheus()
+    buckets = [(le, int(n)) for le, n in re.findall(r'span="tab1",le="([^"]+)"\} (\d+)', text)]
+    counts = [n for _, n in buckets]
+    assert counts == sorted(counts)
+    assert dict(buckets)["0.001"] == 1 and dict(buckets)["0.005"] == 3 and dict(buckets)["10.0"] == 4
+    total = int(re.search(r'hrip_span_seconds_count\{span="tab1"\} (\d+)', text).group(1))
+    assert buckets[-1] == ("+Inf", 5) and total == 5
+    assert float(re.search(r'hrip_span_seconds_sum\{span="tab1"\} ([\d.]+)', text).group(1)) == 30.2065
+
+
+def test_last_rerun_per_session_is_bounded(monkeypatch):
+    monkeypatch.setattr(telemetry, "MAX_SESSIONS", 3)
+    recorder = telemetry.Recorder()
+    for sid in ("a", "b", "c", "a", "d"):
+        _rerun(recorder, sid)
+    assert list(recorder.last) == ["c", "a", "d"]              # "b" was least recently seen
+
+
+def test_json_lines_log(tmp_path):
+    path = tmp_path / "perf.jsonl"
+    recorder = telemetry.Recorder(log_path=str(path))
+    _rerun(recorder, "a", [("tab1", 0.01)])
+    _rerun(recorder, "b")
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["session"] for r in records] == ["a", "b"]
+    assert records[0]["spans"][0] == {"name": "tab1", "ms": 10.0, "rss_delta": 0}
+
+
+def test_disabled_rerun_is_a_no_op():
+    assert telemetry.NULL_RERUN.span("x") is telemetry.NULL_RERUN.span("y")
+    assert telemetry.NULL_RERUN.finish() is None
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+import theme_assets
+
+
+@pytest.fixture
+def theme(tmp_path, monkeypatch):
+    css = tmp_path / "theme.css"
+    css.write_text("body { color: #00d4ff; }\n")
+    monkeypatch.setattr(theme_assets, "THEME_CSS", str(css))
+    return css
+
+
+def _build(tmp_path, **kwargs):
+    return theme_assets.build(out_dir=str(tmp_path / "out"), fonts_dir=str(tmp_path / "fonts"), **kwargs)
+
+
+def test_css_name_follows_content(tmp_path, theme):
+    first = _build(tmp_path)
+    assert first["css"].startswith("theme.") and first["fonts"] == []
+    assert (tmp_path / "out" / first["css"]).read_text().endswith("body { color: #00d4ff; }\n")
+    assert _build(tmp_path)["css"] == first["css"]
+
+    theme.write_text("body { color: #ff3864; }\n")
+    second = _build(tmp_path)
+    assert second["css"] != first["css"] and second["source"] != first["source"]
+    assert (tmp_path / "out" / first["css"]).exists()            # pages still loading it keep working
+    assert json.loads((tmp_path / "out" / "manifest.json").read_text()) == second
+
+
+def test_unchanged_sources_skip_the_build(tmp_path, theme, monkeypatch):
+    _build(tmp_path)
+    monkeypatch.setattr(theme_assets, "_write", lambda *a: pytest.fail("rebuilt unchanged theme"))
+    _build(tmp_path)
+
+
+def test_rebuild_after_missing_output(tmp_path, theme):
+    first = _build(tmp_path)
+    (tmp_path / "out" / first["css"]).unlink()
+    assert _build(tmp_path)["css"] == first["css"]
+    assert (tmp_path / "out" / first["css"]).exists()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+import schema
+import train
+from conftest import random_rows
+
+
+def _duplicated(n_distinct=300, copies=5, seed=9):
+    rng = np.random.default_rng(seed)
+    X = random_rows(n_distinct, seed=seed)
+    y = ((X[:, 10] > 140) ^ (rng.random(n_distinct) < 0.1)).astype(np.int64)
+    take = rng.integers(0, n_distinct, n_distinct * copies)
+    return X[take], y[take]
+
+
+def test_collapse_weights_count_rows():
+    X, y = _duplicated()
+    Xc, yc, w = train.collapse(X, y)
+    assert w.sum() == len(y)
+    assert len(np.unique(np.column_stack([Xc, yc]), axis=0)) == len(yc) < len(y)
+    for k in (0, len(yc) // 2, len(yc) - 1):
+        same = (X == Xc[k]).all(axis=1) & (y == yc[k])
+        assert same.sum() == w[k]
+
+
+def test_weighted_fit_matches_raw_fit():
+    X, y = _duplicated()
+    Xc, yc, w = train.collapse(X, y)
+    raw = DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+    weighted = DecisionTreeClassifier(max_depth=4, random_state=0).fit(Xc, yc, sample_weight=w)
+    probe = random_rows(1000, seed=10)
+    assert np.allclose(raw.predict_proba(probe), weighted.predict_proba(probe))
+
+
+def test_quantize_rounds_to_step():
+    X = random_rows(200, seed=11)
+    Q = train.quantize(X, {"bmi": 0.5, "daily_steps": 500})
+    bmi, steps = schema.FEATURE_NAMES.index("bmi"), schema.FEATURE_NAMES.index("daily_steps")
+    assert np.allclose(Q[:, bmi] * 2, np.round(Q[:, bmi] * 2))
+    assert (Q[:, steps] % 500 == 0).all()
+    assert (np.abs(Q[:, bmi] - X[:, bmi]) <= 0.25 + 1e-9).all()
+    others = np.setdiff1d(np.arange(schema.N_FEATURES), [bmi, steps])
+    assert np.array_equal(Q[:, others], X[:, others])
+
+
+def test_parse_resolution():
+    assert train.parse_resolution(["bmi=0.5", "daily_steps=500"]) == {"bmi": 0.5, "daily_steps": 500.0}
+    for bad in (["nope=1"], ["bmi"], ["bmi="]):
+        with pytest.raises(ValueError):
+            train.parse_resolution(bad)
+
+
+def test_unseen():
+    X = random_rows(10, seed=12)
+    assert train.unseen(X[:4], X[2:]).tolist() == [True, True, False, False]
+
+
+def test_weighted_search_runs():
+    X, y = _duplicated(copies=2)
+    Xc, yc, w = train.collapse(X, y)
+    found = train.search(Xc, yc, w, n_iter=3, cv=3, n_jobs=1)
+    assert found.best_estimator_.predict(X).shape == y.shape
@@ -0,0 +1,277 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Theme Assets
+# Versioned static stylesheet and self-hosted subset fonts
+# ============================================================
+"""Build the theme into content-hashed static files and link it once per session.
+
+``assets/theme.css`` is the stylesheet source.  Font files dropped into
+``assets/fonts/`` (the OFL releases of Orbitron, Rajdhani and Share Tech
+Mono, ``.ttf``/``.otf``) are subset to the characters the app can display
+and written as ``woff2`` (``woff`` without ``brotli``).  ``build`` writes
+
+    static/theme/theme.<hash>.css          @font-face rules + theme.css
+    static/theme/<font>.<hash>.woff2
+    static/theme/manifest.json             what is current, keyed by source hash
+
+Names change whenever content changes, so the files can be cached forever:
+Streamlit serves them from ``/app/static/theme/`` (``enableStaticServing`` in
+``.streamlit/config.toml``) with validators only; put a proxy or CDN in front
+(``$HRIP_ASSET_BASE_URL``) to add ``Cache-Control: immutable``.  Builds are
+skipped while the sources are unchanged and are safe to run from several
+processes at once.
+
+``inject`` adds the ``<link>`` and the background particles to the page head
+and body from a one-off script, so only a session's first run carries any
+theme payload; later reruns send nothing.
+"""
+
+import hashlib
+import html
+import io
+import json
+import logging
+import os
+import string
+import time
+
+log = logging.getLogger(__name__)
+
+APP_DIR     = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR  = os.path.join(APP_DIR, "assets")
+FONTS_DIR   = os.path.join(ASSETS_DIR, "fonts")
+THEME_CSS   = os.path.join(ASSETS_DIR, "theme.css")
+OUT_DIR     = os.path.join(APP_DIR, "static", "theme")
+BASE_URL    = os.environ.get("HRIP_ASSET_BASE_URL")   # default: Streamlit's /app/static/theme
+
+# Modules whose string literals end up on screen; their characters form the font subset
+TEXT_SOURCES = ("app.py", "schema.py", "charts.py")
+FONT_SUFFIXES = (".ttf", ".otf")
+N_PARTICLES   = 10
+KEEP_OLD_SECONDS = 24 * 3600   # superseded builds stay for pages still loading them
+
+WEIGHT_WORDS  = {"Thin", "ExtraLight", "Light", "Regular", "Medium", "SemiBold",
+                 "Bold", "ExtraBold", "Black", "Italic"}
+
+# %(href)s is a JSON string; %(css)s is JSON null unless static serving is off
+INJECT_SCRIPT = """<script>
+(function () {
+  var doc = document, href = %(href)s, css = %(css)s;
+  var old = doc.getElementById("hrip-theme");
+  if (css !== null) {
+    if (!old || old.textContent !== css) {
+      var style = doc.createElement("style");
+      style.id = "hrip-theme";
+      style.textContent = css;
+      old ? old.replaceWith(style) : doc.head.appendChild(style);
+    }
+  } else if (!old || old.getAttribute("href") !== href) {
+    var link = doc.createElement("link");
+    link.id = "hrip-theme";
+    link.rel = "stylesheet";
+    link.href = href;
+    old ? old.replaceWith(link) : doc.head.appendChild(link);
+  }
+  if (!doc.querySelector(".particles-wrap")) {
+    var wrap = doc.createElement("div");
+    wrap.className = "particles-wrap";
+    for (var i = 0; i < %(particles)d; i++) {
+      var p = doc.createElement("div");
+      p.className = "p";
+      wrap.appendChild(p);
+    }
+    doc.body.appendChild(wrap);
+  }
+})();
+</script>"""
+
+
+# ============================================================
+# BUILD
+# ============================================================
+def _short_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def font_paths(fonts_dir=FONTS_DIR):
+    if not os.path.isdir(fonts_dir):
+        return []
+    return sorted(os.path.join(fonts_dir, n) for n in os.listdir(fonts_dir)
+                  if n.lower().endswith(FONT_SUFFIXES))
+
+
+def used_text(sources=TEXT_SOURCES):
+    """Every character the app can put on screen: printable ASCII plus the sources' text."""
+    chars = set(string.printable)
+    for name in sources:
+        path = os.path.join(APP_DIR, name)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                chars.update(html.unescape(f.read()))
+    return "".join(sorted(c for c in chars if c.isprintable()))
+
+
+def source_digest(fonts, text):
+    h = hashlib.sha256()
+    with open(THEME_CSS, "rb") as f:
+        h.update(f.read())
+    for path in fonts:
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    h.update(text.encode())
+    return h.hexdigest()
+
+
+def _flavor():
+    try:
+        import brotli  # noqa: F401 - fontTools needs it for woff2
+    except ImportError:
+        return "woff"
+    return "woff2"
+
+
+def _family(font):
+    """Typographic family ("Rajdhani", not "Rajdhani SemiBold") for one static or variable font."""
+    names = font["name"]
+    family = names.getDebugName(16)
+    if not family:
+        words = (names.getDebugName(1) or "").split()
+        while len(words) > 1 and words[-1] in WEIGHT_WORDS:
+            words.pop()
+        family = " ".join(words)
+    return family
+
+
+def subset_font(path, text, flavor):
+    """Return ``(font_bytes, face)`` where ``face`` holds the @font-face descriptors."""
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = flavor
+    font = subset.load_font(path, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+
+    face = {"family": _family(font), "style": "normal", "weight": "400"}
+    if "OS/2" in font:
+        os2 = font["OS/2"]
+        face["weight"] = str(os2.usWeightClass)
+        if os2.fsSelection & 1:
+            face["style"] = "italic"
+    if "fvar" in font:
+        for axis in font["fvar"].axes:
+            if axis.axisTag == "wght":
+                face["weight"] = f"{axis.minValue:g} {axis.maxValue:g}"
+
+    buf = io.BytesIO()
+    subset.save_font(font, buf, options)
+    return buf.getvalue(), face
+
+
+def _font_face(face, filename, flavor):
+    return (
+        "@font-face {\n"
+        f"    font-family: '{face['family']}';\n"
+        f"    font-style: {face['style']};\n"
+        f"    font-weight: {face['weight']};\n"
+        "    font-display: swap;\n"
+        f"    src: local('{face['family']}'), url('{filename}') format('{flavor}');\n"
+        "}\n"
+    )
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def read_manifest(out_dir=OUT_DIR):
+    try:
+        with open(os.path.join(out_dir, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build(out_dir=OUT_DIR, fonts_dir=FONTS_DIR, force=False):
+    """Write the versioned stylesheet and fonts if the sources changed; return the manifest."""
+    fonts = font_paths(fonts_dir)
+    text = used_text()
+    digest = source_digest(fonts, text)
+    manifest = read_manifest(out_dir)
+    if not force and manifest and manifest.get("source") == digest \
+            and os.path.exists(os.path.join(out_dir, manifest["css"])):
+        return manifest
+
+    os.makedirs(out_dir, exist_ok=True)
+    flavor = _flavor()
+    faces, files = [], []
+    for path in fonts:
+        try:
+            data, face = subset_font(path, text, flavor)
+        except ImportError:
+            log.warning("fontTools not installed; %s not self-hosted", os.path.basename(path))
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        filename = f"{stem}.{_short_hash(data)}.{flavor}"
+        _write(os.path.join(out_dir, filename), data)
+        faces.append(_font_face(face, filename, flavor))
+        files.append(filename)
+
+    with open(THEME_CSS, encoding="utf-8") as f:
+        css = ("\n".join(faces) + "\n" + f.read()).encode("utf-8")
+    css_name = f"theme.{_short_hash(css)}.css"
+    _write(os.path.join(out_dir, css_name), css)
+
+    manifest = {"source": digest, "css": css_name, "fonts": files,
+                "bytes": len(css) + sum(os.path.getsize(os.path.join(out_dir, n)) for n in files)}
+    _write(os.path.join(out_dir, "manifest.json"), json.dumps(manifest, indent=2).encode())
+    _prune(out_dir, {css_name, "manifest.json", *files})
+    log.info("theme built: %s (%d fonts, %d bytes)", css_name, len(files), manifest["bytes"])
+    return manifest
+
+
+def _prune(out_dir, keep):
+    cutoff = time.time() - KEEP_OLD_SECONDS
+    for name in os.listdir(out_dir):
+        path = os.path.join(out_dir, name)
+        if name not in keep and not name.endswith(".tmp") and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+
+
+# ============================================================
+# STREAMLIT HELPERS
+# ============================================================
+def stylesheet_url(manifest, base_url=BASE_URL):
+    import streamlit as st
+
+    if base_url is None:
+        prefix = (st.get_option("server.baseUrlPath") or "").strip("/")
+        base_url = f"/{prefix}/app/static/theme" if prefix else "/app/static/theme"
+    return f"{base_url.rstrip('/')}/{manifest['css']}"
+
+
+def inject(manifest, base_url=BASE_URL):
+    """Link the theme into the page on the session's first run only."""
+    import streamlit as st
+
+    if st.session_state.get("theme_css") == manifest["css"]:
+        return
+    css = None
+    if base_url is None and not st.get_option("server.enableStaticServing"):
+        # Nothing serves static/: ship the stylesheet inline, still only once per session
+        with open(os.path.join(OUT_DIR, manifest["css"]), encoding="utf-8") as f:
+            css = f.read()
+    href = stylesheet_url(manifest, base_url)
+    st.html(INJECT_SCRIPT % {"href": json.dumps(href), "css": json.dumps(css), "particles": N_PARTICLES},
+            unsafe_allow_javascript=True)
+    st.session_state.theme_css = manifest["css"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    m = build(force=True)
+    print(json.dumps(m, indent=2))
@@ -0,0 +1,203 @@
+# ============================================================
+# 🏥 Health Risk Intelligence Platform — Model Training
+# The notebook's randomized search, optionally on collapsed rows
+# ============================================================
+"""Re-run the notebook's hyperparameter search, optionally on deduplicated rows.
+
+    python train.py health_lifestyle_dataset.csv --out models/tree.pkl
+    python train.py data.csv --collapse --resolution bmi=0.5 --resolution daily_steps=500
+    python train.py data.csv --compare                  # raw vs collapsed: rows, time, accuracy
+
+The search is the notebook's: a 33% holdout (``random_state=42``) and
+``RandomizedSearchCV`` over criterion, depth and split/leaf sizes with 100
+draws and 5-fold CV.
+
+``--collapse`` merges identical (inputs, label) rows of the training split
+into one row weighted by its count, after rounding the features named in
+``--resolution`` to that step.  The search and its CV folds then run on the
+smaller matrix; weights reach ``DecisionTreeClassifier.fit`` and the
+accuracy scorer through scikit-learn metadata routing.  The result is not
+identical to the raw fit: CV folds split distinct rows rather than raw rows
+(so copies of a row never straddle a fold), and ``min_samples_split`` /
+``min_samples_leaf`` count distinct rows, not their weight.  ``--compare``
+(implies ``--collapse``) runs both searches and scores both winners on the
+same raw holdout; when holdout rows also occur in training, accuracy on the
+unseen rows alone is shown too, because the raw search's CV can reward
+memorising copies.
+
+``--out`` pickles the winning tree, e.g. into ``models/`` for the registry.
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+import schema
+
+DATASET_CSV = "health_lifestyle_dataset.csv"
+TEST_SIZE   = 0.33
+SPLIT_SEED  = 42
+PARAM_GRID  = {
+    "criterion": ["gini", "entropy"],
+    "max_depth": [3, 4, 5, 6, None],
+    "min_samples_split": [2, 4, 5, 6, 10],
+    "min_samples_leaf": [1, 2, 4, 6],
+}
+N_ITER      = 100
+CV_FOLDS    = 5
+SEARCH_SEED = 42
+
+
+# ============================================================
+# DATA
+# ============================================================
+def load_split(csv_path):
+    """The notebook's train/test split of a labelled CSV, rows failing validation dropped."""
+    from sklearn.model_selection import train_test_split
+    from shared_data import load_dataset
+
+    X, y = load_dataset(csv_path)
+    ok = (schema.validate(X) == 0) & (y >= 0)
+    return train_test_split(X[ok].astype(np.float64), y[ok].astype(np.int64),
+                            test_size=TEST_SIZE, random_state=SPLIT_SEED)
+
+
+def parse_resolution(items):
+    """``["bmi=0.5", ...]`` -> ``{"bmi": 0.5}``."""
+    resolution = {}
+    for item in items or ():
+        name, _, step = item.partition("=")
+        if name not in schema.BY_NAME or not step:
+            raise ValueError(f"expected FEATURE=STEP with a feature from the schema, got {item!r}")
+        resolution[name] = float(step)
+    return resolution
+
+
+def quantize(X, resolution):
+    """Copy of ``X`` with each feature in ``resolution`` rounded to a multiple of its step."""
+    X = np.array(X, dtype=np.float64)
+    for name, step in resolution.items():
+        j = schema.FEATURE_NAMES.index(name)
+        X[:, j] = np.round(X[:, j] / step) * step
+    return X
+
+
+def _row_keys(X):
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    return X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+
+
+def unseen(X_test, X_train):
+    """Mask of holdout rows whose inputs never occur in the training split."""
+    return ~np.isin(_row_keys(X_test), _row_keys(X_train))
+
+
+def collapse(X, y):
+    """Distinct (row, label) pairs of ``X``/``y`` and how often each occurs."""
+    rows, counts = np.unique(np.column_stack([X, y]), axis=0, return_counts=True)
+    return rows[:, :-1], rows[:, -1].astype(np.int64), counts.astype(np.float64)
+
+
+# ============================================================
+# SEARCH
+# ============================================================
+def search(X, y, sample_weight=None, n_iter=N_ITER, cv=CV_FOLDS, n_jobs=-1):
+    """Fitted ``RandomizedSearchCV``; ``sample_weight`` is routed to the tree and the scorer."""
+    import sklearn
+    from sklearn.metrics import accuracy_score, make_scorer
+    from sklearn.model_selection import RandomizedSearchCV
+    from sklearn.tree import DecisionTreeClassifier
+
+    tree = DecisionTreeClassifier(random_state=SEARCH_SEED)
+    scoring = "accuracy"
+    with sklearn.config_context(enable_metadata_routing=sample_weight is not None):
+        if sample_weight is not None:
+            tree = tree.set_fit_request(sample_weight=True)
+            scoring = make_scorer(accuracy_score).set_score_request(sample_weight=True)
+        rand_search = RandomizedSearchCV(
+            estimator=tree, param_distributions=PARAM_GRID, n_iter=n_iter, scoring=scoring,
+            n_jobs=n_jobs, cv=cv, random_state=SEARCH_SEED,
+        )
+        fit_params = {} if sample_weight is None else {"sample_weight": sample_weight}
+        rand_search.fit(X, y, **fit_params)
+    return rand_search
+
+
+def train(X_train, y_train, collapse_rows=False, resolution=None, n_iter=N_ITER, cv=CV_FOLDS, n_jobs=-1):
+    """Run one search; return ``(search, stats)``."""
+    resolution = resolution or {}
+    X = quantize(X_train, resolution) if resolution else X_train
+    weight = None
+    if collapse_rows:
+        X, y, weight = collapse(X, y_train)
+    else:
+        y = y_train
+    t0 = time.perf_counter()
+    result = search(X, y, weight, n_iter, cv, n_jobs)
+    return result, {"rows": len(y_train), "fit_rows": len(y), "seconds": time.perf_counter() - t0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the HRIP decision tree with the notebook's search.")
+    parser.add_argument("csv", nargs="?", default=DATASET_CSV, help=f"labelled CSV (default: {DATASET_CSV})")
+    parser.add_argument("--collapse", action="store_true", help="merge duplicate rows into weights")
+    parser.add_argument("--resolution", action="append", metavar="FEATURE=STEP",
+                        help="round FEATURE to STEP before collapsing (repeatable)")
+    parser.add_argument("--compare", action="store_true",
+                        help="run the raw and the collapsed search and compare (implies --collapse)")
+    parser.add_argument("--n-iter", type=int, default=N_ITER)
+    parser.add_argument("--cv", type=int, default=CV_FOLDS)
+    parser.add_argument("--jobs", type=int, default=-1, help="search processes (default: all CPUs)")
+    parser.add_argument("--out", help="pickle the best tree here")
+    args = parser.parse_args(argv)
+    args.collapse = args.collapse or args.compare
+    if not os.path.exists(args.csv):
+        parser.error(f"no such CSV: {args.csv}")
+    try:
+        resolution = parse_resolution(args.resolution)
+    except ValueError as e:
+        parser.error(str(e))
+    if resolution and not args.collapse:
+        parser.error("--resolution only applies with --collapse")
+
+    from sklearn.metrics import accuracy_score
+
+    X_train, X_test, y_train, y_test = load_split(args.csv)
+    runs = [("collapsed" if args.collapse else "raw", args.collapse)]
+    if args.compare:
+        runs.insert(0, ("raw", False))
+
+    # Duplicated datasets leak copies of training rows into the holdout; report those apart
+    fresh = unseen(X_test, X_train)
+    if not fresh.all():
+        print(f"{(~fresh).sum():,} of {len(fresh):,} holdout rows also occur in training")
+
+    results = {}
+    for name, collapse_rows in runs:
+        found, stats = train(X_train, y_train, collapse_rows, resolution, args.n_iter, args.cv, args.jobs)
+        pred = found.best_estimator_.predict(X_test)
+        stats["accuracy"] = accuracy_score(y_test, pred)
+        unseen_acc = f"  unseen {accuracy_score(y_test[fresh], pred[fresh]):.4f}" if not fresh.all() else ""
+        results[name] = (found, stats)
+        print(f"{name:<9} {stats['fit_rows']:>9,} of {stats['rows']:,} rows  {stats['seconds']:7.1f}s  "
+              f"holdout accuracy {stats['accuracy']:.4f}{unseen_acc}  {found.best_params_}")
+
+    if len(results) == 2:
+        raw, comp = results["raw"][1], results["collapsed"][1]
+        print(f"compression {raw['fit_rows'] / comp['fit_rows']:.2f}x, "
+              f"speed-up {raw['seconds'] / comp['seconds']:.2f}x, "
+              f"accuracy change {comp['accuracy'] - raw['accuracy']:+.4f}")
+    if args.out:
+        best = results[runs[-1][0]][0].best_estimator_
+        with open(args.out, "wb") as f:
+            pickle.dump(best, f)
+        print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())